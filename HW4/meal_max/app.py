@@ -1,329 +1,789 @@
+import functools
+import io
+import math
+import sqlite3
+import time
+from typing import Callable
+import zlib
+
 from dotenv import load_dotenv
-from flask import Flask, jsonify, make_response, Response, request
+from flask import Flask, g, jsonify, make_response, Response, request
+from flask.logging import default_handler
+from werkzeug.routing import BaseConverter
 # from flask_cors import CORS
 
 from meal_max.models import kitchen_model
-from meal_max.models.battle_model import BattleModel
+from meal_max.models.arena_store import ARENA_ID_REGEX, DEFAULT_ARENA, create_arena_store
+from meal_max.models.simulation_model import SimulationModel
+from meal_max.models.tournament_model import TournamentModel
+from meal_max.utils.compress_utils import COMPRESS_RESPONSES, compress_response
+from meal_max.utils.ingest_utils import encode_csv, encode_ndjson, iter_csv, iter_ndjson, join_chunks
+from meal_max.utils import metrics
+from meal_max.utils.json_utils import JSON_PROVIDER, create_json_provider
+from meal_max.utils.logger import configure_logger
+from meal_max.utils.migrations import apply_migrations
 from meal_max.utils.sql_utils import check_database_connection, check_table_exists
 
 
 # Load environment variables from .env file
 load_dotenv()
 
-app = Flask(__name__)
-# This bypasses standard security stuff we'll talk about later
-# If you get errors that use words like cross origin or flight,
-# uncomment this
-# CORS(app)
-
-# Initialize the BattleModel
-battle_model = BattleModel()
 
-####################################################
-#
-# Healthchecks
-#
-####################################################
+class ArenaIdConverter(BaseConverter):
+    """Matches arena IDs in URLs; anything else is a 404."""
+    regex = ARENA_ID_REGEX
 
 
-@app.route('/api/health', methods=['GET'])
-def healthcheck() -> Response:
-    """
-    Health check route to verify the service is running.
-
-    Returns:
-        JSON response indicating the health status of the service.
+def create_app() -> Flask:
     """
-    app.logger.info('Health check')
-    return make_response(jsonify({'status': 'healthy'}), 200)
+    Builds the Flask application with all routes registered.
 
-@app.route('/api/db-check', methods=['GET'])
-def db_check() -> Response:
-    """
-    Route to check if the database connection and meals table are functional.
+    Used directly by WSGI servers (gunicorn 'app:create_app()') and by the
+    development server below.
 
     Returns:
-        JSON response indicating the database health status.
-    Raises:
-        404 error if there is an issue with the database.
+        Flask: The configured application.
     """
+    app = Flask(__name__)
+    # Send the app's own log lines through the shared meal_max handler
+    app.logger.removeHandler(default_handler)
+    configure_logger(app.logger)
+    # jsonify goes through orjson when it is installed (JSON_PROVIDER=auto)
+    app.json = create_json_provider(app, JSON_PROVIDER)
+
+    # This bypasses standard security stuff we'll talk about later
+    # If you get errors that use words like cross origin or flight,
+    # uncomment this
+    # CORS(app)
+
+    # Bring the database schema up to date
     try:
-        app.logger.info("Checking database connection...")
-        check_database_connection()
-        app.logger.info("Database connection is OK.")
-        app.logger.info("Checking if meals table exists...")
-        check_table_exists("meals")
-        app.logger.info("meals table exists.")
-        return make_response(jsonify({'database_status': 'healthy'}), 200)
+        apply_migrations()
     except Exception as e:
-        return make_response(jsonify({'error': str(e)}), 404)
-
-
-##########################################################
-#
-# Meals
-#
-##########################################################
+        app.logger.error("Failed to apply database migrations: %s", str(e))
 
+    # Write back battle stats journaled by a process that died before flushing them
+    if kitchen_model.STATS_WRITE_BEHIND:
+        try:
+            kitchen_model.stats_buffer.recover()
+        except Exception as e:
+            app.logger.error("Failed to replay battle stats journals: %s", str(e))
+
+    app.url_map.converters['arena_id'] = ArenaIdConverter
+
+    # Each arena has its own BattleModel; ARENA_STORE=sqlite shares them across workers
+    arena_store = create_arena_store()
+    app.extensions['arena_store'] = arena_store
+
+    if metrics.METRICS_ENABLED:
+        @app.before_request
+        def start_request_timer() -> None:
+            g.request_start = time.perf_counter()
+
+        @app.after_request
+        def record_request_duration(response: Response) -> Response:
+            start = g.pop('request_start', None)
+            if start is not None:
+                # Label by route template, not path, to keep the number of series bounded
+                route = request.url_rule.rule if request.url_rule is not None else 'unmatched'
+                metrics.http_request_duration.observe(time.perf_counter() - start,
+                                                      request.method, route, str(response.status_code))
+            return response
+
+    def conditional_get(*names: str) -> Callable:
+        """
+        Makes a GET route answer conditional requests from the change counters of the
+        data it reads ('meals', 'meal_stats'; see kitchen_model.get_data_version).
+
+        Successful responses carry a weak ETag and Last-Modified, with
+        Cache-Control: no-cache so clients and proxies revalidate every time. A request
+        whose If-None-Match still matches gets a 304 without the view running. The
+        ETag alone decides: Last-Modified has whole seconds, too coarse to tell apart
+        writes within the same second, so If-Modified-Since is not honoured. If the
+        counters cannot be read, the view is served without validators.
+        """
+        def decorator(view: Callable) -> Callable:
+            @functools.wraps(view)
+            def wrapper(*args, **kwargs) -> Response:
+                try:
+                    etag, last_modified = kitchen_model.get_data_version(names)
+                except (sqlite3.Error, ValueError) as e:
+                    app.logger.error("Could not read data versions for %s: %s", request.path, e)
+                    return view(*args, **kwargs)
+
+                # One counter covers every meal, page and sort, so the tag also names
+                # the resource: the path, the view arguments and the query string
+                resource = f"{request.path}|{sorted(kwargs.items())}|".encode() + request.query_string
+                etag = f"{etag}-{zlib.crc32(resource):08x}"
+
+                if request.if_none_match and request.if_none_match.contains_weak(etag):
+                    response = make_response('', 304)
+                else:
+                    response = make_response(view(*args, **kwargs))
+                    if response.status_code != 200:
+                        return response
+                response.set_etag(etag, weak=True)
+                # HTTP dates have whole seconds; round up so it is never before the change
+                response.last_modified = math.ceil(last_modified)
+                response.headers['Cache-Control'] = 'no-cache'
+                return response
+
+            return wrapper
+
+        return decorator
+
+    if COMPRESS_RESPONSES:
+        @app.after_request
+        def compress_body(response: Response) -> Response:
+            return compress_response(response, request.accept_encodings)
+
+    ####################################################
+    #
+    # Healthchecks
+    #
+    ####################################################
+
+
+    @app.route('/api/health', methods=['GET'])
+    def healthcheck() -> Response:
+        """
+        Health check route to verify the service is running.
+
+        Returns:
+            JSON response indicating the health status of the service.
+        """
+        app.logger.info('Health check')
+        return make_response(jsonify({'status': 'healthy'}), 200)
+
+    @app.route('/api/metrics', methods=['GET'])
+    def get_metrics() -> Response:
+        """
+        Route to expose request, database and external call metrics for Prometheus.
+
+        Returns:
+            The metrics of this worker process in the Prometheus text format.
+        """
+        response = make_response(metrics.registry.render(), 200)
+        response.headers['Content-Type'] = 'text/plain; version=0.0.4; charset=utf-8'
+        return response
+
+    @app.route('/api/db-check', methods=['GET'])
+    def db_check() -> Response:
+        """
+        Route to check if the database connection and meals table are functional.
+
+        Returns:
+            JSON response indicating the database health status.
+        Raises:
+            404 error if there is an issue with the database.
+        """
+        try:
+            app.logger.info("Checking database connection...")
+            check_database_connection()
+            app.logger.info("Database connection is OK.")
+            app.logger.info("Checking if meals table exists...")
+            check_table_exists("meals")
+            app.logger.info("meals table exists.")
+            return make_response(jsonify({'database_status': 'healthy'}), 200)
+        except Exception as e:
+            return make_response(jsonify({'error': str(e)}), 404)
+
+
+    ##########################################################
+    #
+    # Meals
+    #
+    ##########################################################
+
+
+    @app.route('/api/create-meal', methods=['POST'])
+    def add_meal() -> Response:
+        """
+        Route to add a new meal to the database.
+
+        Expected JSON Input:
+            - meal (str): The name of the combatant (meal).
+            - cuisine (str): The cuisine type of the combatant (e.g., Italian, Chinese).
+            - price (float): The price of the combatant.
+            - difficulty (str): The preparation difficulty (HIGH, MED, LOW).
+
+        Returns:
+            JSON response indicating the success of the combatant addition.
+        Raises:
+            400 error if input validation fails.
+            500 error if there is an issue adding the combatant to the database.
+        """
+        app.logger.info('Creating new meal')
+        try:
+            # Get the JSON data from the request
+            data = request.get_json()
+
+            # Extract and validate required fields
+            meal = data.get('meal')
+            cuisine = data.get('cuisine')
+            price = data.get('price')
+            difficulty = data.get('difficulty')
+
+            if not meal or not cuisine or price is None or difficulty not in ['HIGH', 'MED', 'LOW']:
+                return make_response(jsonify({'error': 'Invalid input, all fields are required with valid values'}), 400)
+
+            # Check that price is a float and has at most two decimal places
+            try:
+                price = float(price)
+                if round(price, 2) != price:
+                    raise ValueError("Price has more than two decimal places")
+            except ValueError as e:
+                return make_response(jsonify({'error': 'Price must be a valid float with at most two decimal places'}), 400)
+
+            # Call the kitchen_model function to add the combatant to the database
+            app.logger.info('Adding meal: %s, %s, %.2f, %s', meal, cuisine, price, difficulty)
+            kitchen_model.create_meal(meal, cuisine, price, difficulty)
+
+            app.logger.info("Combatant added: %s", meal)
+            return make_response(jsonify({'status': 'success', 'combatant': meal}), 201)
+        except Exception as e:
+            app.logger.error("Failed to add combatant: %s", str(e))
+            return make_response(jsonify({'error': str(e)}), 500)
 
-@app.route('/api/create-meal', methods=['POST'])
-def add_meal() -> Response:
-    """
-    Route to add a new meal to the database.
+    @app.route('/api/create-meals', methods=['POST'])
+    def add_meals() -> Response:
+        """
+        Route to add many meals to the database in one transaction.
+
+        Accepted bodies (chosen by Content-Type):
+            - application/json: An array of objects with meal, cuisine, price and difficulty.
+            - application/x-ndjson: One such object per line, read as a stream.
+            - text/csv: A header row naming meal, cuisine, price and difficulty, read as a stream.
+
+        Returns:
+            JSON response with the number of meals created and the duplicate and invalid rows.
+        Raises:
+            400 error if the body is malformed.
+            415 error if the content type is not supported.
+            500 error if there is an issue adding the meals to the database.
+        """
+        app.logger.info('Creating meals in bulk')
+        try:
+            content_type = request.mimetype
+            if content_type == 'application/json':
+                rows = request.get_json()
+                if not isinstance(rows, list):
+                    return make_response(jsonify({'error': 'Expected a JSON array of meals'}), 400)
+            elif content_type in ['application/x-ndjson', 'application/jsonl']:
+                rows = iter_ndjson(io.TextIOWrapper(request.stream, encoding='utf-8'))
+            elif content_type == 'text/csv':
+                rows = iter_csv(io.TextIOWrapper(request.stream, encoding='utf-8', newline=''))
+            else:
+                return make_response(jsonify({'error': f'Unsupported content type: {content_type}'}), 415)
+
+            result = kitchen_model.create_meals(rows)
+
+            app.logger.info("Bulk load added %d meals", result['created'])
+            return make_response(jsonify({'status': 'success', **result}), 201)
+        except ValueError as e:
+            app.logger.error("Invalid bulk meal body: %s", str(e))
+            return make_response(jsonify({'error': str(e)}), 400)
+        except Exception as e:
+            app.logger.error("Failed to add meals: %s", str(e))
+            return make_response(jsonify({'error': str(e)}), 500)
 
-    Expected JSON Input:
-        - meal (str): The name of the combatant (meal).
-        - cuisine (str): The cuisine type of the combatant (e.g., Italian, Chinese).
-        - price (float): The price of the combatant.
-        - difficulty (str): The preparation difficulty (HIGH, MED, LOW).
+    @app.route('/api/clear-meals', methods=['DELETE'])
+    def clear_catalog() -> Response:
+        """
+        Route to clear all meals (recreates the table).
 
-    Returns:
-        JSON response indicating the success of the combatant addition.
-    Raises:
-        400 error if input validation fails.
-        500 error if there is an issue adding the combatant to the database.
-    """
-    app.logger.info('Creating new meal')
-    try:
-        # Get the JSON data from the request
-        data = request.get_json()
+        Returns:
+            JSON response indicating success of the operation or error message.
+        """
+        try:
+            app.logger.info("Clearing the meals")
+            kitchen_model.clear_meals()
+            return make_response(jsonify({'status': 'success'}), 200)
+        except Exception as e:
+            app.logger.error(f"Error clearing catalog: {e}")
+            return make_response(jsonify({'error': str(e)}), 500)
 
-        # Extract and validate required fields
-        meal = data.get('meal')
-        cuisine = data.get('cuisine')
-        price = data.get('price')
-        difficulty = data.get('difficulty')
+    @app.route('/api/delete-meal/<int:meal_id>', methods=['DELETE'])
+    def delete_meal(meal_id: int) -> Response:
+        """
+        Route to delete a meal by its ID. This performs a soft delete by marking it as deleted.
 
-        if not meal or not cuisine or price is None or difficulty not in ['HIGH', 'MED', 'LOW']:
-            return make_response(jsonify({'error': 'Invalid input, all fields are required with valid values'}), 400)
+        Path Parameter:
+            - meal_id (int): The ID of the meal to delete.
 
-        # Check that price is a float and has at most two decimal places
+        Returns:
+            JSON response indicating success of the operation or error message.
+        """
         try:
-            price = float(price)
-            if round(price, 2) != price:
-                raise ValueError("Price has more than two decimal places")
-        except ValueError as e:
-            return make_response(jsonify({'error': 'Price must be a valid float with at most two decimal places'}), 400)
+            app.logger.info(f"Deleting meal by ID: {meal_id}")
 
-        # Call the kitchen_model function to add the combatant to the database
-        app.logger.info('Adding meal: %s, %s, %.2f, %s', meal, cuisine, price, difficulty)
-        kitchen_model.create_meal(meal, cuisine, price, difficulty)
+            kitchen_model.delete_meal(meal_id)
+            return make_response(jsonify({'status': 'success'}), 200)
+        except Exception as e:
+            app.logger.error(f"Error deleting meal: {e}")
+            return make_response(jsonify({'error': str(e)}), 500)
 
-        app.logger.info("Combatant added: %s", meal)
-        return make_response(jsonify({'status': 'success', 'combatant': meal}), 201)
-    except Exception as e:
-        app.logger.error("Failed to add combatant: %s", str(e))
-        return make_response(jsonify({'error': str(e)}), 500)
+    @app.route('/api/get-meal-by-id/<int:meal_id>', methods=['GET'])
+    @conditional_get('meals')
+    def get_meal_by_id(meal_id: int) -> Response:
+        """
+        Route to get a meal by its ID.
 
-@app.route('/api/clear-meals', methods=['DELETE'])
-def clear_catalog() -> Response:
-    """
-    Route to clear all meals (recreates the table).
+        Path Parameter:
+            - meal_id (int): The ID of the meal.
 
-    Returns:
-        JSON response indicating success of the operation or error message.
-    """
-    try:
-        app.logger.info("Clearing the meals")
-        kitchen_model.clear_meals()
-        return make_response(jsonify({'status': 'success'}), 200)
-    except Exception as e:
-        app.logger.error(f"Error clearing catalog: {e}")
-        return make_response(jsonify({'error': str(e)}), 500)
+        Returns:
+            JSON response with the meal details or error message, or 304 if the
+            client's copy is still current.
+        """
+        try:
+            app.logger.info(f"Retrieving meal by ID: {meal_id}")
 
-@app.route('/api/delete-meal/<int:meal_id>', methods=['DELETE'])
-def delete_meal(meal_id: int) -> Response:
-    """
-    Route to delete a meal by its ID. This performs a soft delete by marking it as deleted.
+            meal = kitchen_model.get_meal_by_id(meal_id)
+            return make_response(jsonify({'status': 'success', 'meal': meal}), 200)
+        except Exception as e:
+            app.logger.error(f"Error retrieving meal by ID: {e}")
+            return make_response(jsonify({'error': str(e)}), 500)
 
-    Path Parameter:
-        - meal_id (int): The ID of the meal to delete.
+    @app.route('/api/get-meal-by-name/<string:meal_name>', methods=['GET'])
+    @conditional_get('meals')
+    def get_meal_by_name(meal_name: str) -> Response:
+        """
+        Route to get a meal by its name.
 
-    Returns:
-        JSON response indicating success of the operation or error message.
-    """
-    try:
-        app.logger.info(f"Deleting meal by ID: {meal_id}")
+        Path Parameter:
+            - meal_name (str): The name of the meal.
 
-        kitchen_model.delete_meal(meal_id)
-        return make_response(jsonify({'status': 'success'}), 200)
-    except Exception as e:
-        app.logger.error(f"Error deleting meal: {e}")
-        return make_response(jsonify({'error': str(e)}), 500)
+        Returns:
+            JSON response with the meal details or error message, or 304 if the
+            client's copy is still current.
+        """
+        try:
+            app.logger.info(f"Retrieving meal by name: {meal_name}")
 
-@app.route('/api/get-meal-by-id/<int:meal_id>', methods=['GET'])
-def get_meal_by_id(meal_id: int) -> Response:
-    """
-    Route to get a meal by its ID.
+            if not meal_name:
+                return make_response(jsonify({'error': 'Meal name is required'}), 400)
 
-    Path Parameter:
-        - meal_id (int): The ID of the meal.
+            meal = kitchen_model.get_meal_by_name(meal_name)
+            return make_response(jsonify({'status': 'success', 'meal': meal}), 200)
+        except Exception as e:
+            app.logger.error(f"Error retrieving meal by name: {e}")
+            return make_response(jsonify({'error': str(e)}), 500)
 
-    Returns:
-        JSON response with the meal details or error message.
-    """
-    try:
-        app.logger.info(f"Retrieving meal by ID: {meal_id}")
+    @app.route('/api/meals', methods=['GET'])
+    @conditional_get('meals', 'meal_stats')
+    def list_meals() -> Response:
+        """
+        Route to browse the meal catalog a page at a time, in ID order.
+
+        Query Parameters:
+            - cuisine (str): Only include meals of this cuisine.
+            - difficulty (str): Only include meals of this difficulty (LOW, MED, HIGH).
+            - min_price, max_price (float): Only include meals in this price range.
+            - deleted (str): 'false' (default) for active meals, 'true' for deleted ones, 'any' for both.
+            - cursor (int): The next_cursor of the previous page. Omit for the first page.
+            - limit (int): Meals per page, from 1 to 1000. Default is 50.
+
+        Returns:
+            JSON response with the page of meals and next_cursor (null on the last page),
+            or 304 if the client's copy is still current.
+        Raises:
+            400 error if a parameter is invalid.
+            500 error if there is an issue retrieving the meals.
+        """
+        try:
+            deleted = request.args.get('deleted', 'false')
+            if deleted not in ['false', 'true', 'any']:
+                return make_response(jsonify({'error': f"Invalid deleted: {deleted}. Must be 'false', 'true' or 'any'."}), 400)
+            try:
+                min_price = request.args.get('min_price')
+                min_price = float(min_price) if min_price is not None else None
+                max_price = request.args.get('max_price')
+                max_price = float(max_price) if max_price is not None else None
+            except ValueError:
+                return make_response(jsonify({'error': 'min_price and max_price must be numbers'}), 400)
+            try:
+                after = int(request.args.get('cursor', 0))
+                limit = int(request.args.get('limit', 50))
+            except ValueError:
+                return make_response(jsonify({'error': 'cursor and limit must be integers'}), 400)
+            app.logger.info("Listing meals after ID %d (limit=%d)", after, limit)
+
+            page = kitchen_model.list_meals(
+                cuisine=request.args.get('cuisine'), difficulty=request.args.get('difficulty'),
+                min_price=min_price, max_price=max_price, deleted=None if deleted == 'any' else deleted == 'true',
+                after=after, limit=limit)
+
+            return make_response(jsonify({'status': 'success', **page}), 200)
+        except ValueError as e:
+            app.logger.error(f"Invalid meal listing request: {e}")
+            return make_response(jsonify({'error': str(e)}), 400)
+        except Exception as e:
+            app.logger.error(f"Error listing meals: {e}")
+            return make_response(jsonify({'error': str(e)}), 500)
 
-        meal = kitchen_model.get_meal_by_id(meal_id)
-        return make_response(jsonify({'status': 'success', 'meal': meal}), 200)
-    except Exception as e:
-        app.logger.error(f"Error retrieving meal by ID: {e}")
-        return make_response(jsonify({'error': str(e)}), 500)
+    @app.route('/api/meals/lookup', methods=['POST'])
+    def lookup_meals() -> Response:
+        """
+        Route to get many meals by ID or by name in one request, e.g. a page of a menu.
+
+        Expected JSON Input:
+            - ids (List[int]): The IDs of the meals, or
+            - names (List[str]): The names of the meals.
+
+        Returns:
+            JSON response with the active meals found, in request order, and the
+            keys that were not found or belong to deleted meals.
+        Raises:
+            400 error if the input is invalid.
+            500 error if there is an issue retrieving the meals.
+        """
+        try:
+            data = request.get_json()
+            if not isinstance(data, dict) or ('ids' in data) == ('names' in data):
+                return make_response(jsonify({'error': 'Provide either ids or names'}), 400)
+
+            if 'ids' in data:
+                meal_ids = data['ids']
+                if not isinstance(meal_ids, list) or not all(isinstance(meal_id, int) for meal_id in meal_ids):
+                    return make_response(jsonify({'error': 'ids must be a list of integers'}), 400)
+                app.logger.info("Looking up %d meals by ID", len(meal_ids))
+                result = kitchen_model.get_meals_by_ids(meal_ids)
+            else:
+                names = data['names']
+                if not isinstance(names, list) or not all(isinstance(name, str) for name in names):
+                    return make_response(jsonify({'error': 'names must be a list of strings'}), 400)
+                app.logger.info("Looking up %d meals by name", len(names))
+                result = kitchen_model.get_meals_by_names(names)
+
+            return make_response(jsonify({'status': 'success', **result}), 200)
+        except Exception as e:
+            app.logger.error(f"Error looking up meals: {e}")
+            return make_response(jsonify({'error': str(e)}), 500)
 
-@app.route('/api/get-meal-by-name/<string:meal_name>', methods=['GET'])
-def get_meal_by_name(meal_name: str) -> Response:
-    """
-    Route to get a meal by its name.
 
-    Path Parameter:
-        - meal_name (str): The name of the meal.
+    ############################################################
+    #
+    # Battle
+    #
+    ############################################################
 
-    Returns:
-        JSON response with the meal details or error message.
-    """
-    try:
-        app.logger.info(f"Retrieving meal by name: {meal_name}")
 
-        if not meal_name:
-            return make_response(jsonify({'error': 'Meal name is required'}), 400)
+    @app.route('/api/battle', methods=['GET'], defaults={'arena_id': DEFAULT_ARENA})
+    @app.route('/api/arenas/<arena_id:arena_id>/battle', methods=['GET'])
+    def battle(arena_id: str) -> Response:
+        """
+        Route to initiate a battle between the two currently prepared meals of an arena.
 
-        meal = kitchen_model.get_meal_by_name(meal_name)
-        return make_response(jsonify({'status': 'success', 'meal': meal}), 200)
-    except Exception as e:
-        app.logger.error(f"Error retrieving meal by name: {e}")
-        return make_response(jsonify({'error': str(e)}), 500)
+        Path Parameter:
+            - arena_id (str): The arena to battle in. The unprefixed route uses the default arena.
 
+        Returns:
+            JSON response indicating the result of the battle and the winner.
+        Raises:
+            500 error if there is an issue during the battle.
+        """
+        try:
+            app.logger.info('Two meals enter, one meal leaves! (arena %s)', arena_id)
 
-############################################################
-#
-# Battle
-#
-############################################################
+            with arena_store.arena(arena_id) as battle_model:
+                winner = battle_model.battle()
 
+            return make_response(jsonify({'status': 'success', 'winner': winner}), 200)
+        except Exception as e:
+            app.logger.error(f"Battle error: {e}")
+            return make_response(jsonify({'error': str(e)}), 500)
 
-@app.route('/api/battle', methods=['GET'])
-def battle() -> Response:
-    """
-    Route to initiate a battle between the two currently prepared meals.
+    @app.route('/api/clear-combatants', methods=['POST'], defaults={'arena_id': DEFAULT_ARENA})
+    @app.route('/api/arenas/<arena_id:arena_id>/clear-combatants', methods=['POST'])
+    def clear_combatants(arena_id: str) -> Response:
+        """
+        Route to clear the list of combatants for the battle in an arena.
 
-    Returns:
-        JSON response indicating the result of the battle and the winner.
-    Raises:
-        500 error if there is an issue during the battle.
-    """
-    try:
-        app.logger.info('Two meals enter, one meal leaves!')
+        Path Parameter:
+            - arena_id (str): The arena to clear. The unprefixed route uses the default arena.
 
-        winner = battle_model.battle()
+        Returns:
+            JSON response indicating success of the operation.
+        Raises:
+            500 error if there is an issue clearing combatants.
+        """
+        try:
+            app.logger.info('Clearing all combatants in arena %s...', arena_id)
+            with arena_store.arena(arena_id) as battle_model:
+                battle_model.clear_combatants()
+            app.logger.info('Combatants cleared.')
+            return make_response(jsonify({'status': 'success'}), 200)
+        except Exception as e:
+            app.logger.error("Failed to clear combatants: %s", str(e))
+            return make_response(jsonify({'error': str(e)}), 500)
 
-        return make_response(jsonify({'status': 'success', 'winner': winner}), 200)
-    except Exception as e:
-        app.logger.error(f"Battle error: {e}")
-        return make_response(jsonify({'error': str(e)}), 500)
+    @app.route('/api/get-combatants', methods=['GET'], defaults={'arena_id': DEFAULT_ARENA})
+    @app.route('/api/arenas/<arena_id:arena_id>/get-combatants', methods=['GET'])
+    def get_combatants(arena_id: str) -> Response:
+        """
+        Route to get the list of combatants for the battle in an arena.
 
-@app.route('/api/clear-combatants', methods=['POST'])
-def clear_combatants() -> Response:
-    """
-    Route to clear the list of combatants for the battle.
+        Path Parameter:
+            - arena_id (str): The arena to read. The unprefixed route uses the default arena.
 
-    Returns:
-        JSON response indicating success of the operation.
-    Raises:
-        500 error if there is an issue clearing combatants.
-    """
-    try:
-        app.logger.info('Clearing all combatants...')
-        battle_model.clear_combatants()
-        app.logger.info('Combatants cleared.')
-        return make_response(jsonify({'status': 'success'}), 200)
-    except Exception as e:
-        app.logger.error("Failed to clear combatants: %s", str(e))
-        return make_response(jsonify({'error': str(e)}), 500)
+        Returns:
+            JSON response with the list of combatants.
+        """
+        try:
+            app.logger.info('Getting combatants in arena %s...', arena_id)
+            with arena_store.arena(arena_id) as battle_model:
+                combatants = list(battle_model.get_combatants())
+            return make_response(jsonify({'status': 'success', 'combatants': combatants}), 200)
+        except Exception as e:
+            app.logger.error("Failed to get combatants: %s", str(e))
+            return make_response(jsonify({'error': str(e)}), 500)
 
-@app.route('/api/get-combatants', methods=['GET'])
-def get_combatants() -> Response:
-    """
-    Route to get the list of combatants for the battle.
+    @app.route('/api/prep-combatant', methods=['POST'], defaults={'arena_id': DEFAULT_ARENA})
+    @app.route('/api/arenas/<arena_id:arena_id>/prep-combatant', methods=['POST'])
+    def prep_combatant(arena_id: str) -> Response:
+        """
+        Route to prepare a prep a meal making it a combatant for a battle in an arena.
 
-    Returns:
-        JSON response with the list of combatants.
-    """
-    try:
-        app.logger.info('Getting combatants...')
-        combatants = battle_model.get_combatants()
-        return make_response(jsonify({'status': 'success', 'combatants': combatants}), 200)
-    except Exception as e:
-        app.logger.error("Failed to get combatants: %s", str(e))
-        return make_response(jsonify({'error': str(e)}), 500)
+        Path Parameter:
+            - arena_id (str): The arena to prep in. The unprefixed route uses the default arena.
 
-@app.route('/api/prep-combatant', methods=['POST'])
-def prep_combatant() -> Response:
-    """
-    Route to prepare a prep a meal making it a combatant for a battle.
+        Parameters:
+            - meal (str): The name of the meal
 
-    Parameters:
-        - meal (str): The name of the meal
+        Returns:
+            JSON response indicating the success of combatant preparation.
+        Raises:
+            500 error if there is an issue preparing combatants.
+        """
+        try:
+            data = request.json
+            meal = data.get('meal')
+            app.logger.info("Preparing combatant: %s (arena %s)", meal, arena_id)
+
+            if not meal:
+                return make_response(jsonify({'error': 'You must name a combatant'}), 400)
+
+            try:
+                meal = kitchen_model.get_meal_by_name(meal)
+                with arena_store.arena(arena_id) as battle_model:
+                    battle_model.prep_combatant(meal)
+                    combatants = list(battle_model.get_combatants())
+            except Exception as e:
+                app.logger.error("Failed to prepare combatant: %s", str(e))
+                return make_response(jsonify({'error': str(e)}), 500)
+            return make_response(jsonify({'status': 'success', 'combatants': combatants}), 200)
 
-    Returns:
-        JSON response indicating the success of combatant preparation.
-    Raises:
-        500 error if there is an issue preparing combatants.
-    """
-    try:
-        data = request.json
-        meal = data.get('meal')
-        app.logger.info("Preparing combatant: %s", meal)
+        except Exception as e:
+            app.logger.error("Failed to prepare combatants: %s", str(e))
+            return make_response(jsonify({'error': str(e)}), 500)
 
-        if not meal:
-            return make_response(jsonify({'error': 'You must name a combatant'}), 400)
+    @app.route('/api/arenas/<arena_id:arena_id>', methods=['DELETE'])
+    def delete_arena(arena_id: str) -> Response:
+        """
+        Route to delete an arena and its combatants.
 
+        Path Parameter:
+            - arena_id (str): The arena to delete.
+
+        Returns:
+            JSON response indicating success of the operation.
+        Raises:
+            500 error if there is an issue deleting the arena.
+        """
         try:
-            meal = kitchen_model.get_meal_by_name(meal)
-            battle_model.prep_combatant(meal)
-            combatants = battle_model.get_combatants()
+            app.logger.info("Deleting arena %s", arena_id)
+            arena_store.delete(arena_id)
+            return make_response(jsonify({'status': 'success'}), 200)
         except Exception as e:
-            app.logger.error("Failed to prepare combatant: %s", str(e))
+            app.logger.error("Failed to delete arena: %s", str(e))
             return make_response(jsonify({'error': str(e)}), 500)
-        return make_response(jsonify({'status': 'success', 'combatants': combatants}), 200)
 
-    except Exception as e:
-        app.logger.error("Failed to prepare combatants: %s", str(e))
-        return make_response(jsonify({'error': str(e)}), 500)
 
+    @app.route('/api/tournament', methods=['POST'])
+    def tournament() -> Response:
+        """
+        Route to run a whole tournament between many meals in one request.
 
-############################################################
-#
-# Leaderboard
-#
-############################################################
+        Expected JSON Input:
+            - meal_ids (List[int]): The IDs of the competing meals, in seeding order.
+            - format (str): single_elimination (default), round_robin or swiss.
+            - rounds (int, optional): The number of Swiss rounds.
 
+        Returns:
+            JSON response with the champion, the number of bouts and the standings.
+        Raises:
+            400 error if the input is invalid or a meal cannot compete.
+            500 error if there is an issue running the tournament.
+        """
+        try:
+            data = request.get_json()
+            meal_ids = data.get('meal_ids')
+            format = data.get('format', 'single_elimination')
+            rounds = data.get('rounds')
 
-@app.route('/api/leaderboard', methods=['GET'])
-def get_leaderboard() -> Response:
-    """
-    Route to get the leaderboard of meals sorted by wins, battles, or win percentage.
+            if not isinstance(meal_ids, list) or not all(isinstance(meal_id, int) for meal_id in meal_ids):
+                return make_response(jsonify({'error': 'meal_ids must be a list of integers'}), 400)
+            if rounds is not None and not isinstance(rounds, int):
+                return make_response(jsonify({'error': 'rounds must be an integer'}), 400)
 
-    Query Parameters:
-        - sort (str): The field to sort by ('wins', 'battles', or 'win_pct'). Default is 'wins'.
+            app.logger.info("Running %s tournament with %d meals", format, len(meal_ids))
+            result = TournamentModel().run_tournament(meal_ids, format=format, rounds=rounds)
 
-    Returns:
-        JSON response with a sorted leaderboard of meals.
-    Raises:
-        500 error if there is an issue generating the leaderboard.
-    """
-    try:
-        sort_by = request.args.get('sort', 'wins')  # Default sort by wins
-        app.logger.info("Generating leaderboard sorted by %s", sort_by)
+            return make_response(jsonify({'status': 'success', **result}), 200)
+        except ValueError as e:
+            app.logger.error("Invalid tournament: %s", str(e))
+            return make_response(jsonify({'error': str(e)}), 400)
+        except Exception as e:
+            app.logger.error("Tournament error: %s", str(e))
+            return make_response(jsonify({'error': str(e)}), 500)
 
-        leaderboard_data = kitchen_model.get_leaderboard(sort_by)
 
-        return make_response(jsonify({'status': 'success', 'leaderboard': leaderboard_data}), 200)
-    except Exception as e:
-        app.logger.error(f"Error generating leaderboard: {e}")
-        return make_response(jsonify({'error': str(e)}), 500)
+    @app.route('/api/simulate', methods=['POST'])
+    def simulate() -> Response:
+        """
+        Route to estimate battle outcomes without recording anything.
+
+        Expected JSON Input:
+            - meal_ids (List[int], optional): The meals to include, each at most once. Defaults to
+              every active meal.
+            - battles (int, optional): How many random battles to simulate, at most
+              MAX_SIMULATED_BATTLES. Default is 10000.
+            - seed (int, optional): Seed for a replayable simulation.
+            - matrix (bool, optional): Also return the pairwise win probability matrix.
+
+        Returns:
+            JSON response with simulated battles and wins per meal, ranked by win rate, and
+            optionally the matrix of probabilities that each meal beats each other when listed first.
+        Raises:
+            400 error if the input is invalid or asks for too many battles.
+            500 error if there is an issue running the simulation.
+        """
+        try:
+            data = request.get_json(silent=True) or {}
+            meal_ids = data.get('meal_ids')
+            num_battles = data.get('battles', 10000)
+            seed = data.get('seed')
+
+            if meal_ids is not None and (not isinstance(meal_ids, list)
+                                         or not all(isinstance(meal_id, int) for meal_id in meal_ids)):
+                return make_response(jsonify({'error': 'meal_ids must be a list of integers'}), 400)
+            if not isinstance(num_battles, int) or (seed is not None and not isinstance(seed, int)):
+                return make_response(jsonify({'error': 'battles and seed must be integers'}), 400)
+
+            app.logger.info("Simulating %d battles", num_battles)
+            model = SimulationModel.from_database()
+            response = {'status': 'success', 'meals': model.summarize(num_battles, meal_ids, seed)}
+            if data.get('matrix'):
+                ids = meal_ids if meal_ids is not None else model.ids.tolist()
+                response['matrix'] = {'ids': ids, 'win_probability': model.win_probability_matrix(meal_ids).tolist()}
+
+            return make_response(jsonify(response), 200)
+        except ValueError as e:
+            app.logger.error("Invalid simulation: %s", str(e))
+            return make_response(jsonify({'error': str(e)}), 400)
+        except Exception as e:
+            app.logger.error("Simulation error: %s", str(e))
+            return make_response(jsonify({'error': str(e)}), 500)
+
+
+    ############################################################
+    #
+    # Leaderboard
+    #
+    ############################################################
+
+
+    @app.route('/api/leaderboard', methods=['GET'])
+    @conditional_get('meals', 'meal_stats')
+    def get_leaderboard() -> Response:
+        """
+        Route to get the leaderboard of meals sorted by wins, battles, or win percentage.
+
+        Query Parameters:
+            - sort (str): The field to sort by ('wins', 'battles', or 'win_pct'). Default is 'wins'.
+            - limit (int): The maximum number of meals to return. Default is all.
+            - offset (int): The number of top-ranked meals to skip. Default is 0.
+            - top (int): Shorthand for limit=top&offset=0.
+
+        Returns:
+            JSON response with a sorted leaderboard of meals, or 304 if the client's
+            copy (If-None-Match with its ETag) is still current.
+        Raises:
+            400 error if sort, limit, offset or top is invalid.
+            500 error if there is an issue generating the leaderboard.
+        """
+        try:
+            sort_by = request.args.get('sort', 'wins')  # Default sort by wins
+            try:
+                limit = request.args.get('limit')
+                limit = int(limit) if limit is not None else None
+                offset = int(request.args.get('offset', 0))
+                if 'top' in request.args:
+                    limit, offset = int(request.args['top']), 0
+            except ValueError:
+                return make_response(jsonify({'error': 'limit, offset and top must be integers'}), 400)
+            app.logger.info("Generating leaderboard sorted by %s (limit=%s, offset=%s)", sort_by, limit, offset)
+
+            leaderboard_data = kitchen_model.get_leaderboard(sort_by, limit=limit, offset=offset)
+
+            return make_response(jsonify({'status': 'success', 'leaderboard': leaderboard_data}), 200)
+        except ValueError as e:
+            app.logger.error(f"Invalid leaderboard request: {e}")
+            return make_response(jsonify({'error': str(e)}), 400)
+        except Exception as e:
+            app.logger.error(f"Error generating leaderboard: {e}")
+            return make_response(jsonify({'error': str(e)}), 500)
+
+    @app.route('/api/leaderboard/export', methods=['GET'])
+    def export_leaderboard() -> Response:
+        """
+        Route to download the whole leaderboard as a stream, for catalogs too large for /api/leaderboard.
+
+        Query Parameters:
+            - format (str): 'ndjson' (one JSON object per line) or 'csv'. Default is 'ndjson'.
+            - sort (str): The field to sort by ('wins' or 'win_pct'). Default is 'wins'.
+            - cuisine (str): Only include meals of this cuisine.
+            - difficulty (str): Only include meals of this difficulty (LOW, MED, HIGH).
+            - batch_size (int): Rows fetched from the database at a time. Default is 1000.
+
+        Returns:
+            A streamed NDJSON or CSV attachment of leaderboard entries in rank order.
+        Raises:
+            400 error if a parameter is invalid.
+            500 error if the export cannot be started.
+        """
+        try:
+            export_format = request.args.get('format', 'ndjson')
+            if export_format not in ['ndjson', 'csv']:
+                return make_response(jsonify({'error': f"Invalid format: {export_format}. Must be 'ndjson' or 'csv'."}), 400)
+            try:
+                batch_size = int(request.args.get('batch_size', 1000))
+            except ValueError:
+                return make_response(jsonify({'error': 'batch_size must be an integer'}), 400)
+            sort_by = request.args.get('sort', 'wins')
+            app.logger.info("Exporting leaderboard as %s sorted by %s", export_format, sort_by)
+
+            rows = kitchen_model.iter_leaderboard(sort_by, cuisine=request.args.get('cuisine'),
+                                                  difficulty=request.args.get('difficulty'), batch_size=batch_size)
+
+            if export_format == 'csv':
+                body, mimetype = encode_csv(rows, kitchen_model.LEADERBOARD_FIELDS), 'text/csv'
+            else:
+                body, mimetype = encode_ndjson(rows), 'application/x-ndjson'
+            response = Response(join_chunks(body), mimetype=mimetype)
+            response.headers['Content-Disposition'] = f'attachment; filename=leaderboard.{export_format}'
+            return response
+        except ValueError as e:
+            app.logger.error(f"Invalid leaderboard export request: {e}")
+            return make_response(jsonify({'error': str(e)}), 400)
+        except Exception as e:
+            app.logger.error(f"Error exporting leaderboard: {e}")
+            return make_response(jsonify({'error': str(e)}), 500)
 
+    return app
 
 
 if __name__ == '__main__':
+    app = create_app()
     app.run(debug=True, host='0.0.0.0', port=5000)
\ No newline at end of file
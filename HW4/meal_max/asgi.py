@@ -0,0 +1,320 @@
+"""
+ASGI entrypoint. Battles are handled by coroutines; every other route is the
+Flask app from app.py, run on a thread pool by ThreadedWsgiApp.
+
+    uvicorn --factory asgi:create_asgi_app --host 0.0.0.0 --port 5000
+
+A battle awaits its random number on a shared httpx client and hands the
+database work to a bounded thread pool, so a single worker can keep hundreds
+of battles in flight while they wait on random.org.
+"""
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+import io
+import json
+import logging
+import os
+import re
+import sys
+import time
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Tuple
+
+import httpx
+from flask import Flask
+
+from meal_max.models.arena_store import ARENA_ID_REGEX, DEFAULT_ARENA, ArenaStore
+from meal_max.utils import metrics
+from meal_max.utils.async_utils import BoundedExecutor
+from meal_max.utils.logger import configure_logger
+from meal_max.utils.random_utils import AsyncRandomProvider, RANDOM_PROVIDER, create_async_random_provider
+
+
+logger = logging.getLogger(__name__)
+configure_logger(logger)
+
+
+# keep-alive connections the shared httpx client holds open to random.org
+ASYNC_HTTP_MAX_CONNECTIONS = int(os.getenv("ASYNC_HTTP_MAX_CONNECTIONS", "20"))
+# threads running the Flask routes; a request holds one until its response is sent
+ASGI_WSGI_THREADS = int(os.getenv("ASGI_WSGI_THREADS", "16"))
+
+BATTLE_ROUTE = '/api/battle'
+BATTLE_ARENA_ROUTE = '/api/arenas/<arena_id:arena_id>/battle'
+BATTLE_PATH = re.compile(rf"^/api(?:/arenas/(?P<arena_id>{ARENA_ID_REGEX}))?/battle$")
+
+Scope = Dict[str, Any]
+Receive = Callable[[], Awaitable[Dict[str, Any]]]
+Send = Callable[[Dict[str, Any]], Awaitable[None]]
+
+
+class _RequestBody(io.RawIOBase):
+    """
+    Readable wsgi.input that pulls request body chunks from the ASGI receive channel
+    as the application reads them.
+    """
+
+    def __init__(self, receive_chunk: Callable[[], Dict[str, Any]]):
+        self._receive_chunk = receive_chunk
+        self._chunk = b""
+        self._more = True
+
+    def readable(self) -> bool:
+        return True
+
+    def readinto(self, buffer: Any) -> int:
+        while not self._chunk and self._more:
+            message = self._receive_chunk()
+            if message['type'] != 'http.request':
+                # The client went away; treat it as the end of the body
+                self._more = False
+                break
+            self._chunk = message.get('body', b"")
+            self._more = message.get('more_body', False)
+        size = min(len(buffer), len(self._chunk))
+        buffer[:size] = self._chunk[:size]
+        self._chunk = self._chunk[size:]
+        return size
+
+
+class ThreadedWsgiApp:
+    """
+    Serves a WSGI app under ASGI, one request per pool thread.
+
+    asgiref's WsgiToAsgi runs every request on a single thread and reads the whole
+    body into memory first. Here requests run concurrently, wsgi.input streams the
+    body as the app reads it, and response chunks are sent as the app yields them,
+    so the NDJSON and CSV uploads and the leaderboard export keep streaming.
+
+    Attributes:
+        wsgi_app (Callable): The WSGI application.
+        max_workers (int): Requests served at once; later ones wait for a thread.
+    """
+
+    def __init__(self, wsgi_app: Callable, max_workers: int = ASGI_WSGI_THREADS):
+        if max_workers < 1:
+            raise ValueError(f"Invalid worker count: {max_workers}. Must be at least 1.")
+        self.wsgi_app = wsgi_app
+        self.max_workers = max_workers
+        self._executor: Optional[ThreadPoolExecutor] = None
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix="asgi-wsgi")
+        loop = asyncio.get_running_loop()
+        await loop.run_in_executor(self._executor, self._serve, scope, receive, send, loop)
+
+    def shutdown(self, wait: bool = True) -> None:
+        """
+        Stops the thread pool, waiting for running requests to finish when wait is True.
+        """
+        if self._executor is not None:
+            self._executor.shutdown(wait=wait)
+            self._executor = None
+
+    def _serve(self, scope: Scope, receive: Receive, send: Send, loop: asyncio.AbstractEventLoop) -> None:
+        def call(awaitable: Awaitable) -> Any:
+            return asyncio.run_coroutine_threadsafe(awaitable, loop).result()
+
+        response: Dict[str, Any] = {}
+
+        def start_response(status: str, headers: List[Tuple[str, str]], exc_info: Any = None) -> Callable:
+            if exc_info is not None and response.get('sent'):
+                raise exc_info[1].with_traceback(exc_info[2])
+            response['status'] = int(status.split(" ", 1)[0])
+            response['headers'] = [(name.lower().encode('latin-1'), value.encode('latin-1'))
+                                   for name, value in headers]
+            return write
+
+        def write(data: bytes) -> None:
+            if not response.get('sent'):
+                call(send({'type': 'http.response.start',
+                           'status': response['status'], 'headers': response['headers']}))
+                response['sent'] = True
+            if data:
+                call(send({'type': 'http.response.body', 'body': data, 'more_body': True}))
+
+        environ = self._environ(scope, io.BufferedReader(_RequestBody(lambda: call(receive()))))
+        result = self.wsgi_app(environ, start_response)
+        try:
+            for data in result:
+                if data:
+                    write(data)
+        finally:
+            if hasattr(result, 'close'):
+                result.close()
+        write(b"")
+        call(send({'type': 'http.response.body', 'body': b""}))
+
+    @staticmethod
+    def _environ(scope: Scope, body: io.BufferedReader) -> Dict[str, Any]:
+        """
+        Builds the PEP 3333 environ for an ASGI HTTP scope.
+        """
+        root_path = scope.get('root_path', "")
+        path = scope['path']
+        if root_path and path.startswith(root_path):
+            path = path[len(root_path):]
+        server = scope.get('server') or ("localhost", 80)
+        environ = {
+            'REQUEST_METHOD': scope['method'],
+            'SCRIPT_NAME': root_path.encode('utf-8').decode('latin-1'),
+            'PATH_INFO': path.encode('utf-8').decode('latin-1'),
+            'QUERY_STRING': scope.get('query_string', b"").decode('latin-1'),
+            'SERVER_NAME': server[0],
+            'SERVER_PORT': str(server[1]),
+            'SERVER_PROTOCOL': f"HTTP/{scope.get('http_version', '1.1')}",
+            'wsgi.version': (1, 0),
+            'wsgi.url_scheme': scope.get('scheme', 'http'),
+            'wsgi.input': body,
+            # The ASGI server ends the body itself, chunked or not
+            'wsgi.input_terminated': True,
+            'wsgi.errors': sys.stderr,
+            'wsgi.multithread': True,
+            'wsgi.multiprocess': True,
+            'wsgi.run_once': False,
+        }
+        if scope.get('client'):
+            environ['REMOTE_ADDR'] = scope['client'][0]
+            environ['REMOTE_PORT'] = str(scope['client'][1])
+        for raw_name, raw_value in scope.get('headers', []):
+            name = raw_name.decode('latin-1').upper().replace("-", "_")
+            value = raw_value.decode('latin-1')
+            if name == 'CONTENT_LENGTH' or name == 'CONTENT_TYPE':
+                key = name
+            else:
+                key = f"HTTP_{name}"
+            environ[key] = f"{environ[key]},{value}" if key in environ else value
+        return environ
+
+
+class AsyncBattleApp:
+    """
+    ASGI application that serves GET /api/battle and /api/arenas/<id>/battle
+    natively and passes every other request to a WSGI app.
+
+    Attributes:
+        wsgi_app (Callable): The Flask application for all other routes.
+        arena_store (ArenaStore): Where combatants live; shared with the Flask routes.
+        random_provider (Optional[AsyncRandomProvider]): Set up during lifespan startup.
+        executor (Optional[BoundedExecutor]): Set up during lifespan startup.
+    """
+
+    def __init__(self, wsgi_app: Callable, arena_store: ArenaStore, random_provider_name: str = RANDOM_PROVIDER):
+        self.wsgi_app = wsgi_app
+        self.arena_store = arena_store
+        self.random_provider_name = random_provider_name
+        self.random_provider: Optional[AsyncRandomProvider] = None
+        self.executor: Optional[BoundedExecutor] = None
+        self._client: Optional[httpx.AsyncClient] = None
+        self._fallback = ThreadedWsgiApp(wsgi_app)
+
+    async def startup(self) -> None:
+        """
+        Opens the shared HTTP client, the async random provider and the database executor.
+        """
+        limits = httpx.Limits(max_connections=ASYNC_HTTP_MAX_CONNECTIONS,
+                              max_keepalive_connections=ASYNC_HTTP_MAX_CONNECTIONS)
+        self._client = httpx.AsyncClient(limits=limits)
+        self.random_provider = create_async_random_provider(self.random_provider_name, self._client)
+        self.executor = BoundedExecutor()
+        logger.info("Async battle path ready (random provider %s, %d database threads).",
+                    self.random_provider_name, self.executor.max_workers)
+
+    async def shutdown(self) -> None:
+        """
+        Waits for queued database work and running Flask requests, then closes the
+        provider and the HTTP client.
+        """
+        # Joining the thread pools blocks, so do it off the event loop
+        loop = asyncio.get_running_loop()
+        if self.executor is not None:
+            await loop.run_in_executor(None, self.executor.shutdown, True)
+        await loop.run_in_executor(None, self._fallback.shutdown, True)
+        if self.random_provider is not None:
+            await self.random_provider.aclose()
+        if self._client is not None:
+            await self._client.aclose()
+        logger.info("Async battle path shut down.")
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope['type'] == 'lifespan':
+            await self._lifespan(receive, send)
+            return
+        if scope['type'] == 'http' and scope['method'] == 'GET':
+            match = BATTLE_PATH.match(scope['path'])
+            if match:
+                start = time.perf_counter()
+                arena_id = match.group('arena_id')
+                status = await self._battle(arena_id or DEFAULT_ARENA, send)
+                if metrics.METRICS_ENABLED:
+                    # Same route labels as the Flask rules these requests would have matched
+                    route = BATTLE_ARENA_ROUTE if arena_id else BATTLE_ROUTE
+                    metrics.http_request_duration.observe(time.perf_counter() - start, 'GET', route, str(status))
+                return
+        await self._fallback(scope, receive, send)
+
+    async def _lifespan(self, receive: Receive, send: Send) -> None:
+        while True:
+            message = await receive()
+            if message['type'] == 'lifespan.startup':
+                try:
+                    await self.startup()
+                except Exception as e:
+                    logger.error("Async startup failed: %s", e)
+                    await send({'type': 'lifespan.startup.failed', 'message': str(e)})
+                    return
+                await send({'type': 'lifespan.startup.complete'})
+            elif message['type'] == 'lifespan.shutdown':
+                await self.shutdown()
+                await send({'type': 'lifespan.shutdown.complete'})
+                return
+
+    async def _battle(self, arena_id: str, send: Send) -> int:
+        """
+        Async counterpart of the Flask battle route, with the same responses.
+
+        Returns:
+            int: The response status code.
+        """
+        if self.random_provider is None or self.executor is None:
+            return await self._respond(send, 503, {'error': 'Server is not ready'})
+        try:
+            logger.info('Two meals enter, one meal leaves! (arena %s)', arena_id)
+
+            # Check the arena before spending a random number on it
+            if await self.executor.run(self.arena_store.count_combatants, arena_id) < 2:
+                raise ValueError("Two combatants must be prepped for a battle.")
+
+            random_number = await self.random_provider.get_random()
+            winner = await self.executor.run(self._run_battle, arena_id, random_number)
+
+            return await self._respond(send, 200, {'status': 'success', 'winner': winner})
+        except Exception as e:
+            logger.error("Battle error: %s", e)
+            return await self._respond(send, 500, {'error': str(e)})
+
+    def _run_battle(self, arena_id: str, random_number: float) -> str:
+        with self.arena_store.arena(arena_id) as battle_model:
+            return battle_model.battle(random_number)
+
+    @staticmethod
+    async def _respond(send: Send, status: int, body: Dict[str, Any]) -> int:
+        payload = json.dumps(body, separators=(",", ":")).encode()
+        await send({
+            'type': 'http.response.start',
+            'status': status,
+            'headers': [(b'content-type', b'application/json'),
+                        (b'content-length', str(len(payload)).encode())],
+        })
+        await send({'type': 'http.response.body', 'body': payload})
+        return status
+
+
+def create_asgi_app() -> AsyncBattleApp:
+    """
+    Builds the Flask app with create_app() and wraps it with the async battle routes.
+    """
+    from app import create_app
+
+    flask_app: Flask = create_app()
+    return AsyncBattleApp(flask_app, flask_app.extensions['arena_store'])
@@ -0,0 +1,71 @@
+"""
+What holding an arena costs per battle, for each arena store.
+
+Each cycle runs the battle route's work against one arena: prep two meals in
+one hold, then battle in a second hold. The battle commits the meals' stats as
+usual. The "hold only" rows enter and leave the arena without doing anything,
+which isolates the store's own overhead (for sqlite, the lease's two write
+transactions).
+
+Usage (from HW4/meal_max):
+    python -m benchmarks.bench_arena_store --cycles 2000
+"""
+import argparse
+import json
+import logging
+import time
+from typing import Dict, List
+
+from benchmarks.common import percentile, temp_database
+from meal_max.models.arena_store import create_arena_store
+from meal_max.models.kitchen_model import get_meal_by_id
+from meal_max.utils.random_utils import SeededRandomProvider
+
+
+def run(store_name: str, cycles: int, battle: bool) -> Dict[str, float]:
+    samples: List[float] = []
+    rng = SeededRandomProvider(0)
+    with temp_database(100):
+        store = create_arena_store(store_name)
+        meals = [get_meal_by_id(1), get_meal_by_id(2)]
+        for _ in range(cycles):
+            start = time.perf_counter()
+            if battle:
+                with store.arena("bench") as battle_model:
+                    battle_model.clear_combatants()
+                    for meal in meals:
+                        battle_model.prep_combatant(meal)
+                with store.arena("bench") as battle_model:
+                    battle_model.battle(rng.get_random())
+            else:
+                with store.arena("bench"):
+                    pass
+            samples.append(time.perf_counter() - start)
+    return {
+        'store': store_name,
+        'work': 'prep + battle' if battle else 'hold only',
+        'mean_us': sum(samples) / len(samples) * 1e6,
+        'p50_us': percentile(samples, 50) * 1e6,
+        'p99_us': percentile(samples, 99) * 1e6,
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--cycles", type=int, default=2000)
+    parser.add_argument("--json", action="store_true", help="print results as JSON")
+    args = parser.parse_args()
+
+    logging.disable(logging.WARNING)
+    results = [run(store, args.cycles, battle) for battle in (False, True) for store in ("memory", "sqlite")]
+
+    if args.json:
+        print(json.dumps(results, indent=2))
+        return
+    print(f"{'store':>7} {'work':>14} {'mean us':>9} {'p50 us':>9} {'p99 us':>9}")
+    for r in results:
+        print(f"{r['store']:>7} {r['work']:>14} {r['mean_us']:>9.1f} {r['p50_us']:>9.1f} {r['p99_us']:>9.1f}")
+
+
+if __name__ == '__main__':
+    main()
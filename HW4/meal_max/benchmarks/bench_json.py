@@ -0,0 +1,93 @@
+"""
+Cost of serializing and compressing a 100k-row leaderboard.
+
+Times the JSON providers on their own (Flask's default, the stdlib provider
+and orjson), on leaderboard dicts and on Meal dataclasses. It then times whole
+GET /api/leaderboard requests through the test client with each provider and
+each Accept-Encoding, and gzip levels on the leaderboard body. Sizes are bytes
+on the wire.
+
+Usage (from HW4/meal_max):
+    python -m benchmarks.bench_json --meals 100000
+"""
+import argparse
+import gzip
+import json
+import logging
+import time
+from typing import Callable, Dict, List
+
+from flask.json.provider import DefaultJSONProvider
+
+from benchmarks.common import temp_database
+from meal_max.models import kitchen_model
+from meal_max.utils import json_utils
+from meal_max.utils.compress_utils import available_encodings
+
+
+def best_of(rounds: int, func: Callable[[], object]) -> float:
+    best = float("inf")
+    for _ in range(rounds):
+        start = time.perf_counter()
+        func()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--meals", type=int, default=100_000)
+    parser.add_argument("--rounds", type=int, default=5)
+    args = parser.parse_args()
+
+    logging.disable(logging.WARNING)
+    from app import create_app
+
+    results: Dict[str, Dict] = {'serialize_ms': {}, 'request': {}, 'gzip_level': {}}
+    with temp_database(args.meals):
+        app = create_app()
+        leaderboard = kitchen_model.get_leaderboard("wins")
+        meals = kitchen_model.get_active_meals()
+        providers = {
+            'flask_default': DefaultJSONProvider(app),
+            'stdlib': json_utils.create_json_provider(app, "stdlib"),
+        }
+        if json_utils.orjson is not None:
+            providers['orjson'] = json_utils.create_json_provider(app, "orjson")
+
+        with app.app_context():
+            for name, provider in providers.items():
+                results['serialize_ms'][name] = {
+                    'leaderboard': round(best_of(args.rounds, lambda: provider.response(
+                        {'status': 'success', 'leaderboard': leaderboard})) * 1000, 1),
+                    'meals': round(best_of(args.rounds, lambda: provider.response(
+                        {'status': 'success', 'meals': meals})) * 1000, 1),
+                }
+
+            body = providers['stdlib'].response({'status': 'success', 'leaderboard': leaderboard}).get_data()
+            for level in (1, 3, 5, 6, 9):
+                seconds = best_of(args.rounds, lambda: gzip.compress(body, compresslevel=level, mtime=0))
+                results['gzip_level'][level] = {'ms': round(seconds * 1000, 1),
+                                                'bytes': len(gzip.compress(body, compresslevel=level, mtime=0))}
+
+        client = app.test_client()
+        for name, provider in providers.items():
+            if name == 'flask_default':
+                continue
+            app.json = provider
+            for encoding in ['identity'] + available_encodings():
+                headers = {'Accept-Encoding': encoding}
+                sizes: List[int] = []
+
+                def request() -> None:
+                    response = client.get("/api/leaderboard", headers=headers)
+                    sizes.append(len(response.get_data()))
+
+                seconds = best_of(args.rounds, request)
+                results['request'][f"{name}/{encoding}"] = {'ms': round(seconds * 1000, 1), 'bytes': sizes[-1]}
+
+    print(json.dumps({'meals': args.meals, **results}, indent=2))
+
+
+if __name__ == "__main__":
+    main()
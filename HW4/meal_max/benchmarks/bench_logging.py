@@ -0,0 +1,98 @@
+"""
+Per-request logging overhead under each logging configuration.
+
+Each configuration runs in its own subprocess, because the logging settings
+are read at import time. The subprocess drives the Flask app through its
+test client against a freshly seeded temporary database. Its stderr goes to
+a real file, so log writes cost what they cost in production. A request
+cycle is prep/prep/battle in the default arena followed by two
+get-meal-by-id calls.
+
+Usage (from HW4/meal_max):
+    python -m benchmarks.bench_logging --cycles 2000
+"""
+import argparse
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import time
+
+from benchmarks.common import SCHEMA_PATH, seed_database
+
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# DEBUG inline is what every request paid before logging was centralised: every
+# module logged at DEBUG through its own synchronous stderr handler.
+CONFIGS = {
+    'debug-inline': {'LOG_LEVEL': 'DEBUG', 'LOG_QUEUE': 'false'},
+    'info-inline': {'LOG_LEVEL': 'INFO', 'LOG_QUEUE': 'false'},
+    'info-queue': {'LOG_LEVEL': 'INFO', 'LOG_QUEUE': 'true'},
+    'warning-queue': {'LOG_LEVEL': 'WARNING', 'LOG_QUEUE': 'true'},
+}
+
+
+def run_cycles(cycles: int, num_meals: int) -> dict:
+    from app import create_app
+
+    client = create_app().test_client()
+    requests_made = 0
+    start = time.perf_counter()
+    for i in range(cycles):
+        client.post('/api/clear-combatants')
+        client.post('/api/prep-combatant', json={'meal': f"Meal {i % num_meals}"})
+        client.post('/api/prep-combatant', json={'meal': f"Meal {(i + 1) % num_meals}"})
+        client.get('/api/battle')
+        client.get(f'/api/get-meal-by-id/{i % num_meals + 1}')
+        client.get(f'/api/get-meal-by-id/{(i + 7) % num_meals + 1}')
+        requests_made += 6
+    elapsed = time.perf_counter() - start
+    return {'requests': requests_made, 'us_per_request': round(elapsed / requests_made * 1e6, 1)}
+
+
+def run_config(name: str, cycles: int, num_meals: int) -> dict:
+    return run_with_env(CONFIGS[name], cycles, num_meals)
+
+
+def run_with_env(overrides: dict, cycles: int, num_meals: int, module: str = "benchmarks.bench_logging") -> dict:
+    """
+    Runs module's --worker mode in a subprocess with overrides added to its environment.
+    """
+    with tempfile.TemporaryDirectory() as tmp:
+        db_path = os.path.join(tmp, "meal_max.db")
+        seed_database(db_path, num_meals)
+        env = dict(os.environ, DB_PATH=db_path, SQL_CREATE_TABLE_PATH=SCHEMA_PATH,
+                   SQL_MIGRATIONS_PATH=os.path.join(ROOT, "sql", "migrations"),
+                   RANDOM_PROVIDER="local", ARENA_STORE="memory", **overrides)
+        log_path = os.path.join(tmp, "stderr.log")
+        with open(log_path, "w") as log:
+            output = subprocess.run(
+                [sys.executable, "-m", module, "--worker",
+                 "--cycles", str(cycles), "--meals", str(num_meals)],
+                cwd=ROOT, env=env, stderr=log, stdout=subprocess.PIPE, check=True, text=True).stdout
+        with open(log_path) as log:
+            lines = sum(1 for _ in log)
+    result = json.loads(output)
+    result['log_lines_per_request'] = round(lines / result['requests'], 2)
+    return result
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--cycles", type=int, default=2000)
+    parser.add_argument("--meals", type=int, default=100)
+    parser.add_argument("--worker", action="store_true", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.worker:
+        print(json.dumps(run_cycles(args.cycles, args.meals)))
+        return
+
+    results = {name: run_config(name, args.cycles, args.meals) for name in CONFIGS}
+    print(json.dumps(results, indent=2))
+
+
+if __name__ == "__main__":
+    main()
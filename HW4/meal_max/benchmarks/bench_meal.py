@@ -0,0 +1,121 @@
+"""
+Size and construction cost of Meal objects for a million-meal load.
+
+Compares the original dict-backed dataclass (reproduced here as LegacyMeal)
+with the slotted Meal, built three ways: the validating constructor,
+Meal.from_row, and get_active_meals' row factory reading a seeded database.
+MEAL_FROZEN is read at import time, so each setting runs in its own subprocess.
+
+Usage (from HW4/meal_max):
+    python -m benchmarks.bench_meal --meals 1000000
+"""
+import argparse
+from dataclasses import dataclass
+import gc
+import json
+import os
+import subprocess
+import sys
+import time
+import tracemalloc
+from typing import Callable, Dict, List
+
+from benchmarks.common import ROOT, temp_database
+from meal_max.utils import sql_utils
+
+
+@dataclass
+class LegacyMeal:
+    """The Meal dataclass before it was slotted."""
+    id: int
+    meal: str
+    cuisine: str
+    price: float
+    difficulty: str
+
+    def __post_init__(self):
+        if self.price < 0:
+            raise ValueError("Price must be a positive value.")
+        if self.difficulty not in ['LOW', 'MED', 'HIGH']:
+            raise ValueError("Difficulty must be 'LOW', 'MED', or 'HIGH'.")
+
+
+def legacy_get_active_meals() -> List[LegacyMeal]:
+    """get_active_meals as it was: fetchall, then a validated dataclass per row."""
+    with sql_utils.get_db_connection() as conn:
+        cursor = conn.cursor()
+        cursor.execute("SELECT id, meal, cuisine, price, difficulty FROM meals WHERE deleted = 0 ORDER BY id")
+        rows = cursor.fetchall()
+    return [LegacyMeal(id=row[0], meal=row[1], cuisine=row[2], price=row[3], difficulty=row[4]) for row in rows]
+
+
+def best_of(rounds: int, build: Callable[[], List]) -> float:
+    best = float("inf")
+    for _ in range(rounds):
+        gc.collect()
+        start = time.perf_counter()
+        result = build()
+        best = min(best, time.perf_counter() - start)
+        del result
+    return best
+
+
+def bytes_per_meal(make: Callable[[int], object], count: int = 100_000) -> float:
+    gc.collect()
+    tracemalloc.start()
+    meals = [make(i) for i in range(count)]
+    size = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    # The list itself holds one pointer per meal; strings are shared between instances.
+    return round(size / len(meals) - 8, 1)
+
+
+def run_worker(num_meals: int, rounds: int) -> Dict[str, object]:
+    from meal_max.models import kitchen_model
+    from meal_max.models.kitchen_model import Meal
+
+    rows = [(i, f"Meal {i}", "Italian", 12.5, "MED") for i in range(num_meals)]
+    timings = {
+        'legacy_init': best_of(rounds, lambda: [LegacyMeal(*row) for row in rows]),
+        'slotted_init': best_of(rounds, lambda: [Meal(*row) for row in rows]),
+        'from_row': best_of(rounds, lambda: [Meal.from_row(row) for row in rows]),
+    }
+    with temp_database(num_meals):
+        kitchen_model.get_active_meals()  # warm the page cache
+        timings['legacy_get_active_meals'] = best_of(rounds, legacy_get_active_meals)
+        timings['get_active_meals'] = best_of(rounds, kitchen_model.get_active_meals)
+
+    return {
+        'frozen': kitchen_model.MEAL_FROZEN,
+        'bytes_per_meal': {
+            'legacy': bytes_per_meal(lambda i: LegacyMeal(i, "Pasta", "Italian", 12.5, "MED")),
+            'slotted': bytes_per_meal(lambda i: Meal(i, "Pasta", "Italian", 12.5, "MED")),
+        },
+        'ns_per_meal': {name: round(seconds / num_meals * 1e9) for name, seconds in timings.items()},
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--meals", type=int, default=1_000_000)
+    parser.add_argument("--rounds", type=int, default=3)
+    parser.add_argument("--worker", action="store_true", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.worker:
+        print(json.dumps(run_worker(args.meals, args.rounds)))
+        return
+
+    results = {}
+    for frozen in ("false", "true"):
+        env = dict(os.environ, MEAL_FROZEN=frozen, LOG_LEVEL="WARNING")
+        output = subprocess.run(
+            [sys.executable, "-m", "benchmarks.bench_meal", "--worker",
+             "--meals", str(args.meals), "--rounds", str(args.rounds)],
+            cwd=ROOT, env=env, stdout=subprocess.PIPE, check=True, text=True).stdout
+        results[f"frozen={frozen}"] = json.loads(output)
+    print(json.dumps(results, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,72 @@
+"""
+Lookup latency of get_meal_by_id / get_meal_by_name with and without the meal cache.
+
+The workload is hot-key: most lookups go to a small set of popular meals, the
+rest are spread over the whole catalog, and lookups alternate between id and name.
+
+Usage (from HW4/meal_max):
+    python -m benchmarks.bench_meal_cache --lookups 50000
+"""
+import argparse
+import json
+import logging
+import random
+import time
+from typing import Dict, List
+
+from benchmarks.common import percentile, temp_database
+from meal_max.models import kitchen_model
+from meal_max.utils.cache import LRUCache
+
+
+def run(cache_size: int, lookups: int, num_meals: int, hot_keys: int, hot_fraction: float) -> Dict[str, float]:
+    kitchen_model.meal_cache = LRUCache(max_size=cache_size, ttl=60)
+    rng = random.Random(0)
+    samples: List[float] = []
+    with temp_database(num_meals):
+        for i in range(lookups):
+            if rng.random() < hot_fraction:
+                meal_id = rng.randint(1, hot_keys)
+            else:
+                meal_id = rng.randint(1, num_meals)
+            start = time.perf_counter()
+            if i % 2:
+                kitchen_model.get_meal_by_id(meal_id)
+            else:
+                kitchen_model.get_meal_by_name(f"Meal {meal_id - 1}")
+            samples.append(time.perf_counter() - start)
+    stats = kitchen_model.meal_cache.stats()
+    return {
+        'cache_size': cache_size,
+        'mean_us': sum(samples) / len(samples) * 1e6,
+        'p50_us': percentile(samples, 50) * 1e6,
+        'p99_us': percentile(samples, 99) * 1e6,
+        'hit_rate': stats['hit_rate'],
+        'evictions': stats['evictions'],
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--lookups", type=int, default=50000)
+    parser.add_argument("--meals", type=int, default=10000)
+    parser.add_argument("--hot-keys", type=int, default=100)
+    parser.add_argument("--hot-fraction", type=float, default=0.9)
+    parser.add_argument("--cache-size", type=int, default=1024)
+    parser.add_argument("--json", action="store_true", help="print results as JSON")
+    args = parser.parse_args()
+
+    logging.disable(logging.WARNING)
+    results = [run(size, args.lookups, args.meals, args.hot_keys, args.hot_fraction)
+               for size in (0, args.cache_size)]
+
+    if args.json:
+        print(json.dumps(results, indent=2))
+        return
+    print(f"{'cache':>6} {'mean us':>9} {'p50 us':>9} {'p99 us':>9} {'hit rate':>9}")
+    for r in results:
+        print(f"{r['cache_size']:>6} {r['mean_us']:>9.1f} {r['p50_us']:>9.1f} {r['p99_us']:>9.1f} {r['hit_rate']:>9.2f}")
+
+
+if __name__ == '__main__':
+    main()
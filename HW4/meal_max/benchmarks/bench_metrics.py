@@ -0,0 +1,60 @@
+"""
+Per-request cost of the built-in metrics (route histograms, timed SQLite
+cursors, cache and pool gauges), measured like bench_logging: the same
+request cycle against the Flask test client in a subprocess, with
+METRICS_ENABLED on and off. A final /api/metrics scrape is timed separately.
+The configurations alternate for several rounds and the median round is
+reported, since the difference is close to run-to-run noise.
+
+Usage (from HW4/meal_max):
+    python -m benchmarks.bench_metrics --cycles 2000
+"""
+import argparse
+import json
+import time
+
+from benchmarks.bench_logging import run_cycles, run_with_env
+
+
+CONFIGS = {
+    'metrics-off': {'METRICS_ENABLED': 'false'},
+    'metrics-on': {'METRICS_ENABLED': 'true'},
+}
+
+
+def run_worker(cycles: int, num_meals: int) -> dict:
+    result = run_cycles(cycles, num_meals)
+    from app import create_app
+
+    client = create_app().test_client()
+    start = time.perf_counter()
+    body = client.get('/api/metrics').data
+    result['scrape_ms'] = round((time.perf_counter() - start) * 1000, 2)
+    result['scrape_bytes'] = len(body)
+    return result
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--cycles", type=int, default=2000)
+    parser.add_argument("--meals", type=int, default=100)
+    parser.add_argument("--rounds", type=int, default=5)
+    parser.add_argument("--worker", action="store_true", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.worker:
+        print(json.dumps(run_worker(args.cycles, args.meals)))
+        return
+
+    rounds = {name: [] for name in CONFIGS}
+    for _ in range(args.rounds):
+        for name, env in CONFIGS.items():
+            rounds[name].append(run_with_env({'LOG_LEVEL': 'WARNING', **env}, args.cycles, args.meals,
+                                             module="benchmarks.bench_metrics"))
+    results = {name: sorted(runs, key=lambda run: run['us_per_request'])[len(runs) // 2]
+               for name, runs in rounds.items()}
+    print(json.dumps(results, indent=2))
+
+
+if __name__ == "__main__":
+    main()
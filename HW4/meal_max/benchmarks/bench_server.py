@@ -0,0 +1,101 @@
+"""
+HTTP throughput of the Flask development server versus gunicorn.
+
+Starts the app in a subprocess against a freshly seeded temporary database,
+then drives the existing routes from client threads: meal lookups by ID and
+name, the leaderboard, and a prep/prep/battle cycle in a per-thread arena.
+
+Usage (from HW4/meal_max):
+    python -m benchmarks.bench_server --server dev --server gunicorn --duration 10
+"""
+import argparse
+import json
+import os
+import random
+import tempfile
+import threading
+import time
+from typing import Dict, List
+
+import requests
+
+from benchmarks.common import BASE_URL, SERVER_COMMANDS, percentile, seed_database, start_server, stop_server
+
+
+def run_server(server: str, clients: int, duration: float, num_meals: int,
+               workers: int, threads: int) -> Dict[str, float]:
+    with tempfile.TemporaryDirectory() as tmp:
+        db_path = os.path.join(tmp, "meal_max.db")
+        seed_database(db_path, num_meals)
+        proc = start_server(server, db_path, workers, threads)
+        latencies: List[List[float]] = [[] for _ in range(clients)]
+        errors = [0] * clients
+        stop = threading.Event()
+
+        def client(index: int) -> None:
+            rng = random.Random(index)
+            session = requests.Session()
+            arena = f"{BASE_URL}/arenas/bench-{index}"
+            done = 0
+            while not stop.is_set():
+                done += 1
+                start = time.perf_counter()
+                try:
+                    if done % 10 == 0:
+                        session.post(f"{arena}/clear-combatants").raise_for_status()
+                        for name in rng.sample(range(num_meals), 2):
+                            session.post(f"{arena}/prep-combatant",
+                                         json={'meal': f"Meal {name}"}).raise_for_status()
+                        session.get(f"{arena}/battle").raise_for_status()
+                    elif done % 5 == 0:
+                        session.get(f"{BASE_URL}/leaderboard", params={'limit': 10}).raise_for_status()
+                    elif done % 2 == 0:
+                        meal_id = rng.randint(1, num_meals)
+                        session.get(f"{BASE_URL}/get-meal-by-id/{meal_id}").raise_for_status()
+                    else:
+                        name = rng.randrange(num_meals)
+                        session.get(f"{BASE_URL}/get-meal-by-name/Meal {name}").raise_for_status()
+                    latencies[index].append(time.perf_counter() - start)
+                except requests.RequestException:
+                    errors[index] += 1
+
+        pool = [threading.Thread(target=client, args=(i,)) for i in range(clients)]
+        started = time.perf_counter()
+        for t in pool:
+            t.start()
+        time.sleep(duration)
+        stop.set()
+        for t in pool:
+            t.join()
+        elapsed = time.perf_counter() - started
+        stop_server(proc)
+
+    samples = [s for per_client in latencies for s in per_client]
+    return {
+        'requests_per_sec': round(len(samples) / elapsed, 1),
+        'p50_ms': round(percentile(samples, 50) * 1000, 2),
+        'p99_ms': round(percentile(samples, 99) * 1000, 2),
+        'errors': sum(errors),
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--server", action="append", choices=sorted(SERVER_COMMANDS),
+                        help="Server to benchmark; repeat to compare (default: both)")
+    parser.add_argument("--clients", type=int, default=16)
+    parser.add_argument("--duration", type=float, default=10)
+    parser.add_argument("--meals", type=int, default=1000)
+    parser.add_argument("--workers", type=int, default=4, help="gunicorn worker processes")
+    parser.add_argument("--threads", type=int, default=4, help="gunicorn threads per worker")
+    args = parser.parse_args()
+
+    results = {}
+    for server in args.server or ['dev', 'gunicorn']:
+        results[server] = run_server(server, args.clients, args.duration, args.meals,
+                                     args.workers, args.threads)
+    print(json.dumps(results, indent=2))
+
+
+if __name__ == "__main__":
+    main()
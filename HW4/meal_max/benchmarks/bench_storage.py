@@ -0,0 +1,102 @@
+"""
+Mixed read/write throughput of meal_max.db under each storage profile.
+
+Readers hammer get_leaderboard and get_meal_by_id while writers record battle
+results through update_meal_stats, all against a fresh temporary database.
+
+Usage (from HW4/meal_max):
+    python -m benchmarks.bench_storage --readers 4 --writers 2 --duration 5
+"""
+import argparse
+import json
+import logging
+import random
+import sqlite3
+import threading
+import time
+from typing import Dict, List
+
+from benchmarks.common import temp_database
+from meal_max.models import kitchen_model
+from meal_max.utils import sql_utils
+
+
+def run_profile(profile: str, readers: int, writers: int, duration: float, num_meals: int) -> Dict[str, float]:
+    sql_utils.DB_STORAGE_PROFILE = profile
+    sql_utils.DB_POOL_SIZE = readers + writers
+    kitchen_model.meal_cache.max_size = 0
+    with temp_database(num_meals):
+
+        counts = {'reads': 0, 'writes': 0, 'errors': 0}
+        counts_lock = threading.Lock()
+        stop = threading.Event()
+
+        def reader():
+            done = errors = 0
+            while not stop.is_set():
+                try:
+                    if done % 10 == 0:
+                        kitchen_model.get_leaderboard("wins")
+                    else:
+                        kitchen_model.get_meal_by_id(random.randint(1, num_meals))
+                    done += 1
+                except sqlite3.Error:
+                    errors += 1
+            with counts_lock:
+                counts['reads'] += done
+                counts['errors'] += errors
+
+        def writer():
+            done = errors = 0
+            while not stop.is_set():
+                try:
+                    kitchen_model.update_meal_stats(random.randint(1, num_meals), random.choice(["win", "loss"]))
+                    done += 1
+                except sqlite3.Error:
+                    errors += 1
+            with counts_lock:
+                counts['writes'] += done
+                counts['errors'] += errors
+
+        threads: List[threading.Thread] = [threading.Thread(target=reader) for _ in range(readers)]
+        threads += [threading.Thread(target=writer) for _ in range(writers)]
+        start = time.perf_counter()
+        for thread in threads:
+            thread.start()
+        time.sleep(duration)
+        stop.set()
+        for thread in threads:
+            thread.join()
+        elapsed = time.perf_counter() - start
+
+    return {
+        'profile': profile,
+        'reads_per_sec': counts['reads'] / elapsed,
+        'writes_per_sec': counts['writes'] / elapsed,
+        'errors': counts['errors'],
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--profiles", nargs="+", default=["legacy", "wal"], choices=sorted(sql_utils.STORAGE_PROFILES))
+    parser.add_argument("--readers", type=int, default=4)
+    parser.add_argument("--writers", type=int, default=2)
+    parser.add_argument("--duration", type=float, default=5.0)
+    parser.add_argument("--meals", type=int, default=1000)
+    parser.add_argument("--json", action="store_true", help="print results as JSON")
+    args = parser.parse_args()
+
+    logging.disable(logging.WARNING)
+    results = [run_profile(p, args.readers, args.writers, args.duration, args.meals) for p in args.profiles]
+
+    if args.json:
+        print(json.dumps(results, indent=2))
+        return
+    print(f"{'profile':<10} {'reads/s':>10} {'writes/s':>10} {'errors':>8}")
+    for r in results:
+        print(f"{r['profile']:<10} {r['reads_per_sec']:>10.0f} {r['writes_per_sec']:>10.0f} {r['errors']:>8}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,131 @@
+"""
+Helpers shared by the benchmark scripts.
+"""
+import contextlib
+import os
+import random
+import signal
+import sqlite3
+import subprocess
+import sys
+import tempfile
+import time
+from typing import Dict, Iterator, List, Optional
+
+import requests
+
+from meal_max.utils import sql_utils
+from meal_max.utils.migrations import apply_migrations
+
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+SCHEMA_PATH = os.path.join(ROOT, "sql", "create_meal_table.sql")
+
+CUISINES = ["Italian", "Chinese", "Mexican", "Thai", "Indian", "French", "American", "Japanese"]
+
+
+def seed_database(db_path: str, num_meals: int, battles: int = 10, seed: int = 0) -> None:
+    """
+    Creates the meals table at db_path, fills it with num_meals synthetic meals and
+    applies the migrations, as a deployed database would have them.
+    """
+    rng = random.Random(seed)
+    with open(SCHEMA_PATH) as f:
+        schema = f.read()
+    conn = sqlite3.connect(db_path)
+    conn.executescript(schema)
+    conn.executemany(
+        "INSERT INTO meals (meal, cuisine, price, difficulty, battles, wins) VALUES (?, ?, ?, ?, ?, ?)",
+        ((f"Meal {i}", rng.choice(CUISINES), round(rng.uniform(5, 50), 2),
+          rng.choice(["LOW", "MED", "HIGH"]), battles, rng.randint(0, battles)) for i in range(num_meals)))
+    conn.commit()
+    apply_migrations(conn)
+    conn.close()
+
+
+@contextlib.contextmanager
+def temp_database(num_meals: int, **kwargs) -> Iterator[str]:
+    """
+    Points meal_max at a freshly seeded temporary database for the duration of the block.
+    """
+    with tempfile.TemporaryDirectory() as tmp:
+        db_path = os.path.join(tmp, "meal_max.db")
+        seed_database(db_path, num_meals, **kwargs)
+        previous = sql_utils.DB_PATH
+        sql_utils.DB_PATH = db_path
+        sql_utils.reset_pool()
+        try:
+            yield db_path
+        finally:
+            sql_utils.reset_pool()
+            sql_utils.DB_PATH = previous
+
+
+def percentile(samples: List[float], pct: float) -> float:
+    """
+    Returns the pct-th percentile of samples using nearest-rank.
+    """
+    if not samples:
+        return 0.0
+    ordered = sorted(samples)
+    rank = max(0, min(len(ordered) - 1, int(round(pct / 100 * len(ordered))) - 1))
+    return ordered[rank]
+
+
+# app.py's development server always listens here
+BASE_URL = "http://127.0.0.1:5000/api"
+
+SERVER_COMMANDS = {
+    'dev': [sys.executable, "app.py"],
+    'gunicorn': [sys.executable, "-m", "gunicorn", "-c", "gunicorn.conf.py", "app:create_app()"],
+    'asgi': [sys.executable, "-m", "uvicorn", "--factory", "asgi:create_asgi_app", "--port", "5000"],
+}
+
+
+def start_server(server: str, db_path: str, workers: int = 4, threads: int = 4,
+                 env: Optional[Dict[str, str]] = None) -> subprocess.Popen:
+    """
+    Starts app.py's server in a subprocess against db_path and waits until it is healthy.
+    The random provider is local unless env says otherwise.
+    """
+    overrides = env or {}
+    env = dict(os.environ,
+               DB_PATH=db_path,
+               SQL_CREATE_TABLE_PATH=SCHEMA_PATH,
+               SQL_MIGRATIONS_PATH=os.path.join(ROOT, "sql", "migrations"),
+               RANDOM_PROVIDER="local",
+               ARENA_STORE="sqlite",
+               GUNICORN_BIND="127.0.0.1:5000",
+               GUNICORN_WORKERS=str(workers),
+               GUNICORN_THREADS=str(threads),
+               DB_POOL_SIZE=str(max(threads, 8)))
+    env.update(overrides)
+    command = list(SERVER_COMMANDS[server])
+    if server == 'asgi':
+        command += ["--workers", str(workers)]
+    # New session so the debug reloader's child process is stopped with it
+    proc = subprocess.Popen(command, cwd=ROOT, env=env, start_new_session=True,
+                            stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    deadline = time.time() + 30
+    while time.time() < deadline:
+        try:
+            if requests.get(f"{BASE_URL}/health", timeout=1).ok:
+                return proc
+        except requests.ConnectionError:
+            pass
+        time.sleep(0.2)
+    stop_server(proc)
+    raise RuntimeError(f"{server} server did not start")
+
+
+def stop_server(proc: subprocess.Popen) -> None:
+    """
+    Stops a server started by start_server, along with any child processes.
+    """
+    os.killpg(proc.pid, signal.SIGTERM)
+    try:
+        proc.wait(timeout=35)
+    except subprocess.TimeoutExpired:
+        os.killpg(proc.pid, signal.SIGKILL)
+        proc.wait()
@@ -0,0 +1,280 @@
+"""
+Load test for the meal_max HTTP API.
+
+Seeds N meals through POST /api/create-meals, then runs a weighted mix of
+operations from concurrent clients for a fixed duration. It reports
+throughput and p50/p95/p99 latency per operation as JSON. Each client battles
+in its own arena, so clients do not steal each other's combatants.
+
+By default the script starts the server itself (--server dev, gunicorn or
+asgi) against an empty temporary database, with RANDOM_PROVIDER=seeded
+standing in for random.org. With --url it drives a server that is already
+running, which must be configured with a local random provider to get
+comparable numbers.
+
+Compare against a previous report to catch regressions: exit status 1 means
+throughput dropped or a p95 grew by more than --tolerance.
+
+Usage (from HW4/meal_max):
+    python -m benchmarks.load_test --meals 1000 --concurrency 16 --duration 30 \\
+        --mix create=1,prep=2,battle=2,leaderboard=2,get=3 --output report.json
+    python -m benchmarks.load_test --compare report.json
+"""
+import argparse
+import json
+import os
+import random
+import sys
+import tempfile
+import threading
+import time
+from typing import Dict, List, Optional
+
+import requests
+
+from benchmarks.common import (BASE_URL, CUISINES, SERVER_COMMANDS, percentile, seed_database, start_server,
+                               stop_server)
+
+
+OPERATIONS = ('create', 'prep', 'battle', 'leaderboard', 'get')
+
+DEFAULT_MIX = "create=1,prep=2,battle=2,leaderboard=2,get=3"
+
+
+def parse_mix(mix: str) -> Dict[str, float]:
+    """
+    Parses 'op=weight,...' into a dict, rejecting unknown operations and non-positive totals.
+    """
+    weights = {}
+    for part in mix.split(","):
+        name, _, weight = part.partition("=")
+        name = name.strip()
+        if name not in OPERATIONS:
+            raise ValueError(f"Unknown operation in mix: {name}. Expected one of {', '.join(OPERATIONS)}.")
+        try:
+            weights[name] = float(weight)
+        except ValueError:
+            raise ValueError(f"Invalid weight for {name}: {weight!r}")
+        if weights[name] < 0:
+            raise ValueError(f"Invalid weight for {name}: {weight}. Must not be negative.")
+    if sum(weights.values()) <= 0:
+        raise ValueError("The mix needs at least one operation with a positive weight.")
+    return weights
+
+
+def seed_meals(base_url: str, num_meals: int, seed: int) -> None:
+    """
+    Creates num_meals meals named 'Load meal <n>' through the bulk endpoint.
+    """
+    rng = random.Random(seed)
+    meals = [{'meal': f"Load meal {i}", 'cuisine': rng.choice(CUISINES),
+              'price': round(rng.uniform(5, 50), 2), 'difficulty': rng.choice(["LOW", "MED", "HIGH"])}
+             for i in range(num_meals)]
+    for start in range(0, num_meals, 1000):
+        response = requests.post(f"{base_url}/create-meals", json=meals[start:start + 1000], timeout=60)
+        response.raise_for_status()
+
+
+class Client:
+    """
+    One simulated user: a session, an arena and a record of every call it made.
+    """
+
+    def __init__(self, index: int, base_url: str, num_meals: int, seed: int):
+        self.index = index
+        self.base_url = base_url
+        self.num_meals = num_meals
+        self.rng = random.Random(seed * 1000 + index)
+        self.session = requests.Session()
+        self.arena = f"{base_url}/arenas/load-{index}"
+        self.combatants = 0
+        self.created = 0
+        # operation -> [latencies in seconds], and operation -> error count
+        self.latencies: Dict[str, List[float]] = {}
+        self.errors: Dict[str, int] = {}
+        self.recording = False
+
+    def _call(self, operation: str, method: str, url: str, **kwargs) -> Optional[requests.Response]:
+        start = time.perf_counter()
+        try:
+            response = self.session.request(method, url, timeout=30, **kwargs)
+            response.raise_for_status()
+        except requests.RequestException:
+            if self.recording:
+                self.errors[operation] = self.errors.get(operation, 0) + 1
+            return None
+        if self.recording:
+            self.latencies.setdefault(operation, []).append(time.perf_counter() - start)
+        return response
+
+    def _random_meal(self) -> str:
+        return f"Load meal {self.rng.randrange(self.num_meals)}"
+
+    def create(self) -> None:
+        self.created += 1
+        self._call('create', 'POST', f"{self.base_url}/create-meal", json={
+            'meal': f"Load client {self.index} meal {self.created}", 'cuisine': self.rng.choice(CUISINES),
+            'price': round(self.rng.uniform(5, 50), 2), 'difficulty': self.rng.choice(["LOW", "MED", "HIGH"])})
+
+    def prep(self) -> None:
+        if self.combatants >= 2:
+            if self._call('clear', 'POST', f"{self.arena}/clear-combatants") is not None:
+                self.combatants = 0
+        response = self._call('prep', 'POST', f"{self.arena}/prep-combatant", json={'meal': self._random_meal()})
+        if response is not None:
+            self.combatants += 1
+
+    def battle(self) -> None:
+        while self.combatants < 2:
+            before = self.combatants
+            self.prep()
+            if self.combatants == before:
+                return
+        if self._call('battle', 'GET', f"{self.arena}/battle") is not None:
+            self.combatants = 1
+
+    def leaderboard(self) -> None:
+        self._call('leaderboard', 'GET', f"{self.base_url}/leaderboard",
+                   params={'sort': self.rng.choice(['wins', 'win_pct']), 'limit': 10})
+
+    def get(self) -> None:
+        self._call('get', 'GET', f"{self.base_url}/get-meal-by-id/{self.rng.randint(1, self.num_meals)}")
+
+    def run(self, weights: Dict[str, float], stop: threading.Event) -> None:
+        names = list(weights)
+        values = list(weights.values())
+        self._call('clear', 'POST', f"{self.arena}/clear-combatants")
+        while not stop.is_set():
+            getattr(self, self.rng.choices(names, weights=values)[0])()
+
+
+def summarize(samples: List[float], errors: int, elapsed: float) -> Dict[str, float]:
+    """
+    Returns count, errors, throughput and latency percentiles (in milliseconds).
+    """
+    return {
+        'count': len(samples),
+        'errors': errors,
+        'throughput_rps': round(len(samples) / elapsed, 1) if elapsed else 0.0,
+        'mean_ms': round(sum(samples) / len(samples) * 1000, 2) if samples else 0.0,
+        'p50_ms': round(percentile(samples, 50) * 1000, 2),
+        'p95_ms': round(percentile(samples, 95) * 1000, 2),
+        'p99_ms': round(percentile(samples, 99) * 1000, 2),
+        'max_ms': round(max(samples) * 1000, 2) if samples else 0.0,
+    }
+
+
+def run_load(base_url: str, num_meals: int, concurrency: int, duration: float, warmup: float,
+             weights: Dict[str, float], seed: int) -> Dict[str, object]:
+    """
+    Drives base_url with concurrency clients and returns the report (without config).
+    """
+    clients = [Client(i, base_url, num_meals, seed) for i in range(concurrency)]
+    stop = threading.Event()
+    threads = [threading.Thread(target=client.run, args=(weights, stop)) for client in clients]
+    for thread in threads:
+        thread.start()
+    time.sleep(warmup)
+    for client in clients:
+        client.recording = True
+    started = time.perf_counter()
+    time.sleep(duration)
+    stop.set()
+    for thread in threads:
+        thread.join()
+    elapsed = time.perf_counter() - started
+
+    operations = {}
+    all_samples: List[float] = []
+    total_errors = 0
+    for operation in OPERATIONS + ('clear',):
+        samples = [s for client in clients for s in client.latencies.get(operation, [])]
+        errors = sum(client.errors.get(operation, 0) for client in clients)
+        if samples or errors:
+            operations[operation] = summarize(samples, errors, elapsed)
+        all_samples.extend(samples)
+        total_errors += errors
+    return {'totals': dict(summarize(all_samples, total_errors, elapsed), duration_s=round(elapsed, 2)),
+            'operations': operations}
+
+
+def compare(report: Dict, baseline: Dict, tolerance: float) -> List[str]:
+    """
+    Returns one message per regression of report against baseline.
+    """
+    regressions = []
+    base_rps = baseline['totals']['throughput_rps']
+    if report['totals']['throughput_rps'] < base_rps * (1 - tolerance):
+        regressions.append(f"throughput {report['totals']['throughput_rps']} rps < baseline {base_rps} rps")
+    for operation, stats in report['operations'].items():
+        base = baseline['operations'].get(operation)
+        if base and base['p95_ms'] and stats['p95_ms'] > base['p95_ms'] * (1 + tolerance):
+            regressions.append(f"{operation} p95 {stats['p95_ms']} ms > baseline {base['p95_ms']} ms")
+    return regressions
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    target = parser.add_mutually_exclusive_group()
+    target.add_argument("--server", choices=sorted(SERVER_COMMANDS), default="gunicorn",
+                        help="Start this server against a temporary database (default: gunicorn)")
+    target.add_argument("--url", help="Drive an already running server, e.g. http://localhost:5000/api")
+    parser.add_argument("--meals", type=int, default=1000, help="Meals to seed before the run")
+    parser.add_argument("--concurrency", type=int, default=16, help="Concurrent clients")
+    parser.add_argument("--duration", type=float, default=30, help="Seconds to measure")
+    parser.add_argument("--warmup", type=float, default=2, help="Seconds to run before measuring")
+    parser.add_argument("--mix", default=DEFAULT_MIX, help=f"Operation weights (default: {DEFAULT_MIX})")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--workers", type=int, default=4, help="Server worker processes")
+    parser.add_argument("--threads", type=int, default=4, help="gunicorn threads per worker")
+    parser.add_argument("--output", help="Write the JSON report here as well as to stdout")
+    parser.add_argument("--compare", metavar="BASELINE", help="Fail if the run regresses against this report")
+    parser.add_argument("--tolerance", type=float, default=0.2,
+                        help="Allowed relative slowdown for --compare (default: 0.2)")
+    args = parser.parse_args()
+
+    try:
+        weights = parse_mix(args.mix)
+    except ValueError as e:
+        parser.error(str(e))
+
+    config = {key: getattr(args, key) for key in ('meals', 'concurrency', 'duration', 'warmup', 'mix', 'seed')}
+    with tempfile.TemporaryDirectory() as tmp:
+        proc = None
+        if args.url:
+            base_url = args.url.rstrip("/")
+            config['url'] = base_url
+        else:
+            db_path = os.path.join(tmp, "meal_max.db")
+            seed_database(db_path, 0)
+            proc = start_server(args.server, db_path, args.workers, args.threads,
+                                env={'RANDOM_PROVIDER': 'seeded', 'RANDOM_SEED': str(args.seed),
+                                     'LOG_LEVEL': 'WARNING'})
+            base_url = BASE_URL
+            config.update(server=args.server, workers=args.workers, threads=args.threads)
+        try:
+            seed_meals(base_url, args.meals, args.seed)
+            report = run_load(base_url, args.meals, args.concurrency, args.duration, args.warmup,
+                              weights, args.seed)
+        finally:
+            if proc is not None:
+                stop_server(proc)
+
+    report = {'config': config, **report}
+    output = json.dumps(report, indent=2)
+    print(output)
+    if args.output:
+        with open(args.output, "w") as f:
+            f.write(output + "\n")
+
+    if args.compare:
+        with open(args.compare) as f:
+            regressions = compare(report, json.load(f), args.tolerance)
+        for regression in regressions:
+            print(f"REGRESSION: {regression}", file=sys.stderr)
+        if regressions:
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,27 @@
+"""
+Runs the kitchen_model and BattleModel micro-benchmarks with pytest-benchmark
+and checks them against benchmarks/micro/baseline.json.
+
+Usage (from HW4/meal_max):
+    python -m benchmarks.micro                     # fail on regressions
+    python -m benchmarks.micro --update-baseline   # record new medians
+    python -m benchmarks.micro -k leaderboard      # any other pytest options
+
+The files are named bench_*.py, so a plain `python -m pytest` never collects them.
+"""
+import os
+import sys
+
+import pytest
+
+
+def main() -> int:
+    # Read at import time by meal_max.utils.logger, so set it before pytest imports anything
+    os.environ.setdefault("LOG_LEVEL", "WARNING")
+    here = os.path.dirname(os.path.abspath(__file__))
+    return pytest.main([here, "-o", "python_files=bench_*.py", "-p", "no:cacheprovider",
+                        "--benchmark-sort=name", *sys.argv[1:]])
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,24 @@
+import pytest
+
+from meal_max.models.battle_model import BattleModel
+from meal_max.models.kitchen_model import get_meal_by_id
+
+
+@pytest.fixture
+def combatants(use_db):
+    use_db(10_000)
+    return get_meal_by_id(1), get_meal_by_id(2)
+
+
+def test_get_battle_score(benchmark, combatants):
+    benchmark(BattleModel().get_battle_score, combatants[0])
+
+def test_battle(benchmark, combatants, mocker):
+    """A full battle, including the stats write, with random.org stubbed out."""
+    mocker.patch("meal_max.models.battle_model.get_random", return_value=0.5)
+    battle_model = BattleModel()
+
+    def setup():
+        battle_model.combatants = list(combatants)
+
+    benchmark.pedantic(battle_model.battle, setup=setup, rounds=2000, warmup_rounds=50)
@@ -0,0 +1,46 @@
+import random
+
+import pytest
+
+from meal_max.models import kitchen_model
+from meal_max.models.kitchen_model import get_leaderboard, get_meal_by_id, get_meal_by_name, iter_leaderboard, update_meal_stats
+
+
+LOOKUP_MEALS = 10_000
+
+
+def test_get_meal_by_id(benchmark, use_db):
+    use_db(LOOKUP_MEALS)
+    ids = iter(random.Random(0).choices(range(1, LOOKUP_MEALS + 1), k=1_000_000))
+    benchmark(lambda: get_meal_by_id(next(ids)))
+
+def test_get_meal_by_id_cached(benchmark, use_db):
+    use_db(LOOKUP_MEALS)
+    kitchen_model.meal_cache.max_size = 1024
+    get_meal_by_id(42)
+    benchmark(get_meal_by_id, 42)
+
+def test_get_meal_by_name(benchmark, use_db):
+    use_db(LOOKUP_MEALS)
+    names = iter(f"Meal {i}" for i in random.Random(0).choices(range(LOOKUP_MEALS), k=1_000_000))
+    benchmark(lambda: get_meal_by_name(next(names)))
+
+@pytest.mark.parametrize("sort_by", ["wins", "win_pct"])
+@pytest.mark.parametrize("num_meals", [10_000, 100_000, 1_000_000])
+def test_get_leaderboard(benchmark, use_db, num_meals, sort_by):
+    use_db(num_meals)
+    result = benchmark(get_leaderboard, sort_by, limit=10)
+    assert len(result) == 10
+
+@pytest.mark.parametrize("sort_by", ["wins", "win_pct"])
+@pytest.mark.parametrize("num_meals", [10_000, 100_000, 1_000_000])
+def test_iter_leaderboard(benchmark, use_db, num_meals, sort_by):
+    # The whole table, so this one grows with it; a few rounds are plenty at 1M
+    use_db(num_meals)
+    count = benchmark.pedantic(lambda: sum(1 for _ in iter_leaderboard(sort_by)), rounds=3, warmup_rounds=1)
+    assert count == num_meals
+
+def test_update_meal_stats(benchmark, use_db):
+    use_db(LOOKUP_MEALS)
+    ids = iter(random.Random(0).choices(range(1, LOOKUP_MEALS + 1), k=1_000_000))
+    benchmark(lambda: update_meal_stats(next(ids), "win"))
@@ -0,0 +1,129 @@
+"""
+Fixtures for the micro-benchmarks: seeded temporary databases and the baseline check.
+
+Each benchmark's median is compared with its entry in baseline.json. Timings
+depend on the machine, so both runs also time a fixed pure-Python workload and
+the baseline is scaled by the ratio before applying --baseline-tolerance.
+"""
+import json
+import math
+import os
+import platform
+import tempfile
+import time
+from typing import Callable, Dict
+
+import pytest
+
+from benchmarks.common import seed_database
+from meal_max.models import kitchen_model
+from meal_max.utils import sql_utils
+
+
+BASELINE_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "baseline.json")
+
+
+def pytest_addoption(parser):
+    group = parser.getgroup("meal_max micro-benchmarks")
+    group.addoption("--update-baseline", action="store_true",
+                    help="Write this run's medians to baseline.json instead of checking them")
+    group.addoption("--baseline-tolerance", type=float, default=float(os.getenv("BENCH_TOLERANCE", "0.25")),
+                    help="Allowed slowdown against the scaled baseline (default: 0.25, or BENCH_TOLERANCE)")
+
+
+def calibrate() -> float:
+    """
+    Returns the best of five timings of a fixed pure-Python loop, in seconds.
+    """
+    best = math.inf
+    for _ in range(5):
+        start = time.perf_counter()
+        total = 0
+        for i in range(200_000):
+            total += i * i % 7
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+@pytest.fixture(scope="session")
+def baseline(request):
+    """
+    Yields the recorded baseline and collects this run's medians; writes them back
+    at the end of the session with --update-baseline.
+    """
+    recorded = {}
+    if os.path.exists(BASELINE_PATH):
+        with open(BASELINE_PATH) as f:
+            recorded = json.load(f)
+    state = {'recorded': recorded, 'calibration': calibrate(), 'results': {}}
+    yield state
+
+    if request.config.getoption("--update-baseline") and state['results']:
+        benchmarks = dict(recorded.get('benchmarks', {}))
+        benchmarks.update(state['results'])
+        with open(BASELINE_PATH, "w") as f:
+            json.dump({'calibration': state['calibration'], 'python': platform.python_version(),
+                       'benchmarks': dict(sorted(benchmarks.items()))}, f, indent=2)
+            f.write("\n")
+
+
+@pytest.fixture(autouse=True)
+def check_against_baseline(request, benchmark, baseline):
+    """Fails the benchmark if its median regressed beyond the tolerance."""
+    yield
+    if benchmark.stats is None:
+        return
+    name = request.node.name
+    median = benchmark.stats.stats.median
+    baseline['results'][name] = median
+    if request.config.getoption("--update-baseline"):
+        return
+
+    recorded = baseline['recorded'].get('benchmarks', {}).get(name)
+    if recorded is None:
+        return
+    scale = baseline['calibration'] / baseline['recorded']['calibration']
+    allowed = recorded * scale * (1 + request.config.getoption("--baseline-tolerance"))
+    if median > allowed:
+        pytest.fail(f"{name}: median {median * 1e6:.1f} us exceeds the baseline of "
+                    f"{recorded * 1e6:.1f} us (x{scale:.2f} for this machine) by more than the tolerance",
+                    pytrace=False)
+
+
+@pytest.fixture(scope="session")
+def meal_db() -> Callable[[int], str]:
+    """
+    Returns a function that builds (once per size) a migrated database of n meals.
+    """
+    databases: Dict[int, str] = {}
+    with tempfile.TemporaryDirectory() as tmp:
+        def build(num_meals: int) -> str:
+            if num_meals not in databases:
+                db_path = os.path.join(tmp, f"meals_{num_meals}.db")
+                seed_database(db_path, num_meals)
+                databases[num_meals] = db_path
+            return databases[num_meals]
+
+        yield build
+    sql_utils.reset_pool()
+
+
+@pytest.fixture
+def use_db(meal_db):
+    """
+    Returns a function pointing kitchen_model at a database of n meals, with the meal
+    cache cleared and disabled so every call reaches SQLite.
+    """
+    previous_path = sql_utils.DB_PATH
+    previous_size = kitchen_model.meal_cache.max_size
+
+    def use(num_meals: int) -> str:
+        sql_utils.DB_PATH = meal_db(num_meals)
+        kitchen_model.meal_cache.clear()
+        kitchen_model.meal_cache.max_size = 0
+        return sql_utils.DB_PATH
+
+    yield use
+    kitchen_model.meal_cache.max_size = previous_size
+    kitchen_model.meal_cache.clear()
+    sql_utils.DB_PATH = previous_path
@@ -13,5 +13,17 @@ else
     echo "Skipping database creation."
 fi
 
-# Start the Python application
-exec python3 app.py
+# Start the Python application. SERVER_MODE=development runs Flask's debug
+# server with auto-reload, SERVER_MODE=asgi runs uvicorn with the async battle
+# routes (see asgi.py), and anything else runs gunicorn (see gunicorn.conf.py).
+if [ "$SERVER_MODE" = "development" ]; then
+    echo "Starting the development server..."
+    exec python3 app.py
+elif [ "$SERVER_MODE" = "asgi" ]; then
+    echo "Starting uvicorn..."
+    exec uvicorn --factory asgi:create_asgi_app --host 0.0.0.0 --port 5000 \
+        --workers "${UVICORN_WORKERS:-4}" --timeout-graceful-shutdown "${GUNICORN_GRACEFUL_TIMEOUT:-30}"
+else
+    echo "Starting gunicorn..."
+    exec gunicorn -c gunicorn.conf.py 'app:create_app()'
+fi
@@ -0,0 +1,77 @@
+"""
+Gunicorn settings for running meal_max in production:
+
+    gunicorn -c gunicorn.conf.py 'app:create_app()'
+
+Every setting can be overridden from the environment (see .env).
+"""
+import logging
+import multiprocessing
+import os
+
+from meal_max.models import kitchen_model
+from meal_max.utils import random_utils, sql_utils
+from meal_max.utils.logger import shutdown_logging
+
+
+logger = logging.getLogger("gunicorn.error")
+
+
+bind = os.getenv("GUNICORN_BIND", "0.0.0.0:5000")
+
+# Processes x threads. Each thread holds at most one pooled SQLite connection,
+# so keep GUNICORN_THREADS at or below DB_POOL_SIZE.
+workers = int(os.getenv("GUNICORN_WORKERS", str(min(multiprocessing.cpu_count() * 2 + 1, 8))))
+threads = int(os.getenv("GUNICORN_THREADS", "4"))
+worker_class = "gthread"
+
+# Import the app (and run migrations) once in the master before forking
+preload_app = os.getenv("GUNICORN_PRELOAD", "true").lower() == "true"
+
+# Seconds a worker may spend on one request, and the time it gets to finish
+# in-flight requests after SIGTERM before it is killed
+timeout = int(os.getenv("GUNICORN_TIMEOUT", "30"))
+graceful_timeout = int(os.getenv("GUNICORN_GRACEFUL_TIMEOUT", "30"))
+keepalive = int(os.getenv("GUNICORN_KEEPALIVE", "5"))
+
+# Recycle workers periodically; the jitter stops them all restarting together
+max_requests = int(os.getenv("GUNICORN_MAX_REQUESTS", "0"))
+max_requests_jitter = int(os.getenv("GUNICORN_MAX_REQUESTS_JITTER", "0"))
+
+accesslog = os.getenv("GUNICORN_ACCESS_LOG") or None
+errorlog = "-"
+loglevel = os.getenv("GUNICORN_LOG_LEVEL", "info")
+
+
+def when_ready(server):
+    """
+    Runs in the master once the app is loaded. Closes the connections the
+    master opened while preloading so workers do not inherit them.
+    """
+    sql_utils.reset_pool()
+    if server.cfg.workers > 1 and os.getenv("ARENA_STORE", "memory") == "memory":
+        logger.warning("ARENA_STORE=memory with %d workers: each worker keeps its own combatants. "
+                       "Set ARENA_STORE=sqlite to share arenas between workers.", server.cfg.workers)
+
+
+def post_fork(server, worker):
+    """
+    Runs in each worker right after it is forked. SQLite connections and the
+    prefetching random provider's background thread must not cross a fork,
+    so each worker builds its own.
+    """
+    sql_utils.reset_pool()
+    random_utils.set_random_provider(None)
+    logger.info("Worker %s ready (threads=%d).", worker.pid, server.cfg.threads)
+
+
+def worker_exit(server, worker):
+    """
+    Runs in each worker as it shuts down, after in-flight requests finish.
+    Flushes buffered battle stats and queued log records, since the worker may
+    exit without running atexit.
+    """
+    kitchen_model.stats_buffer.close()
+    sql_utils.reset_pool()
+    random_utils.set_random_provider(None)
+    shutdown_logging()
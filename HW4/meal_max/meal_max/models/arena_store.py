@@ -0,0 +1,286 @@
+from contextlib import contextmanager
+from dataclasses import asdict
+import json
+import logging
+import os
+import re
+import sqlite3
+import threading
+import time
+from typing import ContextManager, Dict, Iterator, Optional
+import uuid
+
+from meal_max.models.battle_model import BattleModel
+from meal_max.models.kitchen_model import Meal
+from meal_max.utils.logger import configure_logger
+from meal_max.utils.sql_utils import get_db_connection
+
+
+logger = logging.getLogger(__name__)
+configure_logger(logger)
+
+
+# which store holds the arenas: memory (one process) or sqlite (shared by all workers)
+ARENA_STORE = os.getenv("ARENA_STORE", "memory")
+# seconds a request may hold an arena before another one can take it over
+ARENA_LOCK_TIMEOUT = float(os.getenv("ARENA_LOCK_TIMEOUT", "10"))
+# seconds to wait for a busy arena before giving up
+ARENA_LOCK_WAIT = float(os.getenv("ARENA_LOCK_WAIT", "5"))
+# seconds an arena may sit unused before it is dropped to make room for new ones
+ARENA_IDLE_TTL = float(os.getenv("ARENA_IDLE_TTL", "3600"))
+# arenas kept at once; creating another beyond this fails until some expire
+ARENA_MAX_COUNT = int(os.getenv("ARENA_MAX_COUNT", "10000"))
+
+DEFAULT_ARENA = "default"
+ARENA_ID_REGEX = r"[A-Za-z0-9_-]{1,64}"
+ARENA_ID_PATTERN = re.compile(rf"^{ARENA_ID_REGEX}$")
+
+
+def validate_arena_id(arena_id: str) -> None:
+    """
+    Checks that an arena ID is 1-64 letters, digits, underscores or dashes.
+
+    Raises:
+        ValueError: If the arena ID is invalid.
+    """
+    if not isinstance(arena_id, str) or not ARENA_ID_PATTERN.match(arena_id):
+        raise ValueError(f"Invalid arena ID: {arena_id}")
+
+
+class ArenaStore:
+    """
+    Base class for stores of independent battle arenas, each with its own BattleModel.
+
+    Callers work on an arena inside the arena() context manager. The store makes sure
+    only one caller at a time works on a given arena, and saves its combatants when
+    the block exits without an error.
+
+    Creating an arena first drops arenas that have been idle for ARENA_IDLE_TTL
+    seconds, and fails if ARENA_MAX_COUNT arenas still remain.
+    """
+
+    def arena(self, arena_id: str) -> ContextManager[BattleModel]:
+        """
+        Loads an arena, creating it empty if needed, and holds it for the with-block.
+
+        Yields:
+            BattleModel: The arena's battle model.
+
+        Raises:
+            ValueError: If the arena ID is invalid.
+            RuntimeError: If the arena stays busy for longer than ARENA_LOCK_WAIT, or
+                it is new and ARENA_MAX_COUNT arenas already exist.
+        """
+        raise NotImplementedError
+
+    def count_combatants(self, arena_id: str) -> int:
+        """
+        Counts an arena's combatants without holding it. A missing arena has none.
+
+        Raises:
+            ValueError: If the arena ID is invalid.
+        """
+        raise NotImplementedError
+
+    def delete(self, arena_id: str) -> None:
+        """
+        Removes an arena and its combatants. Deleting a missing arena is a no-op.
+        """
+        raise NotImplementedError
+
+
+class InMemoryArenaStore(ArenaStore):
+    """
+    Keeps arenas in this process's memory, with one lock per arena.
+    """
+
+    def __init__(self):
+        self._arenas: Dict[str, BattleModel] = {}
+        self._locks: Dict[str, threading.Lock] = {}
+        self._last_used: Dict[str, float] = {}
+        self._lock = threading.Lock()
+
+    def _arena_lock(self, arena_id: str) -> threading.Lock:
+        with self._lock:
+            if arena_id not in self._locks:
+                self._locks[arena_id] = threading.Lock()
+            return self._locks[arena_id]
+
+    def _hold(self, arena_id: str) -> threading.Lock:
+        deadline = time.monotonic() + ARENA_LOCK_WAIT
+        while True:
+            lock = self._arena_lock(arena_id)
+            if not lock.acquire(timeout=max(0.0, deadline - time.monotonic())):
+                raise RuntimeError(f"Arena {arena_id} is busy")
+            with self._lock:
+                if self._locks.get(arena_id) is lock:
+                    return lock
+            # The arena was deleted or expired while we waited, so this lock guards nothing
+            lock.release()
+
+    def _discard(self, arena_id: str) -> None:
+        # Call with self._lock held
+        self._arenas.pop(arena_id, None)
+        self._locks.pop(arena_id, None)
+        self._last_used.pop(arena_id, None)
+
+    def _make_room(self) -> None:
+        # Call with self._lock held
+        cutoff = time.monotonic() - ARENA_IDLE_TTL
+        for arena_id in [arena_id for arena_id, used in self._last_used.items() if used < cutoff]:
+            lock = self._locks.get(arena_id)
+            if lock is None or not lock.locked():
+                self._discard(arena_id)
+        if len(self._arenas) >= ARENA_MAX_COUNT:
+            raise RuntimeError(f"Too many arenas (at most {ARENA_MAX_COUNT})")
+
+    @contextmanager
+    def arena(self, arena_id: str) -> Iterator[BattleModel]:
+        validate_arena_id(arena_id)
+        lock = self._hold(arena_id)
+        try:
+            with self._lock:
+                battle_model = self._arenas.get(arena_id)
+                if battle_model is None:
+                    try:
+                        self._make_room()
+                    except RuntimeError:
+                        self._discard(arena_id)
+                        raise
+                    battle_model = self._arenas[arena_id] = BattleModel()
+                self._last_used[arena_id] = time.monotonic()
+            yield battle_model
+        finally:
+            lock.release()
+
+    def count_combatants(self, arena_id: str) -> int:
+        validate_arena_id(arena_id)
+        with self._lock:
+            battle_model = self._arenas.get(arena_id)
+            return len(battle_model.combatants) if battle_model is not None else 0
+
+    def delete(self, arena_id: str) -> None:
+        validate_arena_id(arena_id)
+        lock = self._hold(arena_id)
+        try:
+            with self._lock:
+                self._discard(arena_id)
+        finally:
+            lock.release()
+
+
+class SQLiteArenaStore(ArenaStore):
+    """
+    Keeps arenas in the arenas table so every worker process sees the same combatants.
+
+    A request leases an arena by stamping a lock token on its row. The lease is held
+    across the with-block without keeping a transaction open, so the battle's own
+    stats commit is unaffected, and it expires after ARENA_LOCK_TIMEOUT in case the
+    holder dies. Taking and returning the lease are one small write transaction
+    each; see benchmarks/README.md for what that costs per battle.
+    """
+
+    def _acquire(self, arena_id: str, token: str) -> None:
+        deadline = time.monotonic() + ARENA_LOCK_WAIT
+        delay = 0.005
+        while True:
+            now = time.time()
+            with get_db_connection() as conn:
+                cursor = conn.cursor()
+                cursor.execute("INSERT OR IGNORE INTO arenas (arena_id, last_used) VALUES (?, ?)", (arena_id, now))
+                if cursor.rowcount == 1:
+                    self._make_room(conn, arena_id, now)
+                cursor.execute("""
+                    UPDATE arenas SET lock_token = ?, lock_expires = ?, last_used = ?
+                    WHERE arena_id = ? AND (lock_token IS NULL OR lock_expires < ?)
+                """, (token, now + ARENA_LOCK_TIMEOUT, now, arena_id, now))
+                acquired = cursor.rowcount == 1
+                conn.commit()
+            if acquired:
+                return
+            if time.monotonic() >= deadline:
+                logger.error("Timed out waiting for arena %s", arena_id)
+                raise RuntimeError(f"Arena {arena_id} is busy")
+            time.sleep(delay)
+            delay = min(delay * 2, 0.1)
+
+    def _make_room(self, conn: sqlite3.Connection, arena_id: str, now: float) -> None:
+        cursor = conn.cursor()
+        cursor.execute("""
+            DELETE FROM arenas
+            WHERE last_used < ? AND arena_id != ? AND (lock_token IS NULL OR lock_expires < ?)
+        """, (now - ARENA_IDLE_TTL, arena_id, now))
+        cursor.execute("SELECT COUNT(*) FROM arenas")
+        if cursor.fetchone()[0] > ARENA_MAX_COUNT:
+            conn.rollback()
+            logger.error("Refusing to create arena %s: %d arenas already exist", arena_id, ARENA_MAX_COUNT)
+            raise RuntimeError(f"Too many arenas (at most {ARENA_MAX_COUNT})")
+
+    def _release(self, arena_id: str, token: str, battle_model: Optional[BattleModel] = None) -> None:
+        with get_db_connection() as conn:
+            cursor = conn.cursor()
+            if battle_model is None:
+                cursor.execute("UPDATE arenas SET lock_token = NULL WHERE arena_id = ? AND lock_token = ?",
+                               (arena_id, token))
+            else:
+                combatants = json.dumps([asdict(combatant) for combatant in battle_model.combatants])
+                cursor.execute("""
+                    UPDATE arenas SET combatants = ?, lock_token = NULL
+                    WHERE arena_id = ? AND lock_token = ?
+                """, (combatants, arena_id, token))
+                if cursor.rowcount != 1:
+                    logger.warning("Lease on arena %s expired before its combatants were saved", arena_id)
+            conn.commit()
+
+    @contextmanager
+    def arena(self, arena_id: str) -> Iterator[BattleModel]:
+        validate_arena_id(arena_id)
+        token = uuid.uuid4().hex
+        self._acquire(arena_id, token)
+        try:
+            with get_db_connection() as conn:
+                cursor = conn.cursor()
+                cursor.execute("SELECT combatants FROM arenas WHERE arena_id = ?", (arena_id,))
+                row = cursor.fetchone()
+            battle_model = BattleModel()
+            battle_model.combatants = [Meal(**combatant) for combatant in json.loads(row[0])]
+            yield battle_model
+        except BaseException:
+            self._release(arena_id, token)
+            raise
+        self._release(arena_id, token, battle_model)
+
+    def count_combatants(self, arena_id: str) -> int:
+        validate_arena_id(arena_id)
+        with get_db_connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute("SELECT combatants FROM arenas WHERE arena_id = ?", (arena_id,))
+            row = cursor.fetchone()
+        return len(json.loads(row[0])) if row is not None else 0
+
+    def delete(self, arena_id: str) -> None:
+        validate_arena_id(arena_id)
+        token = uuid.uuid4().hex
+        self._acquire(arena_id, token)
+        with get_db_connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute("DELETE FROM arenas WHERE arena_id = ? AND lock_token = ?", (arena_id, token))
+            conn.commit()
+
+
+def create_arena_store(name: Optional[str] = None) -> ArenaStore:
+    """
+    Builds an arena store by name.
+
+    Args:
+        name (Optional[str]): memory or sqlite. Defaults to ARENA_STORE.
+
+    Raises:
+        ValueError: If the name is unknown.
+    """
+    name = name or ARENA_STORE
+    if name == "memory":
+        return InMemoryArenaStore()
+    if name == "sqlite":
+        return SQLiteArenaStore()
+    raise ValueError(f"Unknown arena store: {name}. Expected memory or sqlite.")
@@ -1,7 +1,7 @@
 import logging
-from typing import List
+from typing import List, Optional, Tuple
 
-from meal_max.models.kitchen_model import Meal, update_meal_stats
+from meal_max.models.kitchen_model import Meal, compute_battle_score, record_battle_result
 from meal_max.utils.logger import configure_logger
 from meal_max.utils.random_utils import get_random
 
@@ -24,10 +24,18 @@ class BattleModel:
         """
         self.combatants: List[Meal] = []
 
-    def battle(self) -> str:
+    def battle(self, random_number: Optional[float] = None) -> str:
         """
         Completes the battle between combatants.
 
+        Args:
+            random_number (Optional[float]): The random draw to decide the battle with.
+                Fetched with get_random() when not given; async callers fetch it
+                themselves so the network wait happens off the worker thread.
+
+        Returns:
+            str: The name of the winning meal.
+
         Side-effects:
             Updates the combatants list to 1 by removing losing combatant
             Updates combatants stats
@@ -35,7 +43,7 @@ class BattleModel:
         Raises:
             ValueError: If a combatant list doesn't have 2 combatants
         """
-        logger.info("Two meals enter, one meal leaves!")
+        logger.debug("Two meals enter, one meal leaves!")
 
         if len(self.combatants) < 2:
             logger.error("Not enough combatants to start a battle.")
@@ -45,27 +53,68 @@ class BattleModel:
         combatant_2 = self.combatants[1]
 
         # Log the start of the battle
-        logger.info("Battle started between %s and %s", combatant_1.meal, combatant_2.meal)
+        logger.debug("Battle started between %s and %s", combatant_1.meal, combatant_2.meal)
+
+        winner, loser = self.decide_winner(combatant_1, combatant_2, random_number)
+
+        # Update stats for both combatants in one transaction
+        record_battle_result(winner.id, loser.id)
+
+        # Remove the losing combatant from combatants
+        self.combatants.remove(loser)
+
+        return winner.meal
+
+    def clear_combatants(self):
+        """
+        Clears all combatants from the battle. If the battle is already empty, logs a warning.
+        """
+
+        logger.info("Clearing the combatants list.")
+        if len(self.combatants) == 0:
+            logger.warning("Clearing an empty combatants list")
+        self.combatants.clear()
+
+    def decide_winner(self, combatant_1: Meal, combatant_2: Meal,
+                      random_number: Optional[float] = None) -> Tuple[Meal, Meal]:
+        """
+        Applies the battle rules to two combatants without touching their stats.
 
+        The score delta, normalized to 0-1, is compared against a random number:
+        combatant_1 wins if the delta is larger, otherwise combatant_2 wins.
+
+        Args:
+            combatant_1 (Meal): The first combatant.
+            combatant_2 (Meal): The second combatant.
+            random_number (Optional[float]): The random draw to use. Fetched with
+                get_random() when not given.
+
+        Returns:
+            Tuple[Meal, Meal]: The winner and the loser.
+
+        Raises:
+            TypeError: If either combatant is not a valid Meal instance.
+        """
         # Get battle scores for both combatants
         score_1 = self.get_battle_score(combatant_1)
         score_2 = self.get_battle_score(combatant_2)
 
         # Log the scores for both combatants
-        logger.info("Score for %s: %.3f", combatant_1.meal, score_1)
-        logger.info("Score for %s: %.3f", combatant_2.meal, score_2)
+        logger.debug("Score for %s: %.3f", combatant_1.meal, score_1)
+        logger.debug("Score for %s: %.3f", combatant_2.meal, score_2)
 
         # Compute the delta and normalize between 0 and 1
         delta = abs(score_1 - score_2) / 100
 
         # Log the delta and normalized delta
-        logger.info("Delta between scores: %.3f", delta)
+        logger.debug("Delta between scores: %.3f", delta)
 
-        # Get random number from random.org
-        random_number = get_random()
+        if random_number is None:
+            # Get random number from random.org
+            random_number = get_random()
 
         # Log the random number
-        logger.info("Random number from random.org: %.3f", random_number)
+        logger.debug("Random number from random.org: %.3f", random_number)
 
         # Determine the winner based on the normalized delta
         if delta > random_number:
@@ -76,26 +125,9 @@ class BattleModel:
             loser = combatant_1
 
         # Log the winner
-        logger.info("The winner is: %s", winner.meal)
-
-        # Update stats for both combatants
-        update_meal_stats(winner.id, 'win')
-        update_meal_stats(loser.id, 'loss')
-
-        # Remove the losing combatant from combatants
-        self.combatants.remove(loser)
-
-        return winner.meal
+        logger.debug("The winner is: %s", winner.meal)
 
-    def clear_combatants(self):
-        """
-        Clears all combatants from the battle. If the battle is already empty, logs a warning.
-        """
-
-        logger.info("Clearing the combatants list.")
-        if len(self.combatants) == 0:
-            logger.warning("Clearing an empty combatants list")
-        self.combatants.clear()
+        return winner, loser
 
     def get_battle_score(self, combatant: Meal) -> float:
         """
@@ -111,17 +143,17 @@ class BattleModel:
             logger.error("combatant_data is not a valid Meal")
             raise TypeError("combatant_data is not a valid Meal")
         
-        difficulty_modifier = {"HIGH": 1, "MED": 2, "LOW": 3}
-
         # Log the calculation process
-        logger.info("Calculating battle score for %s: price=%.3f, cuisine=%s, difficulty=%s",
-                    combatant.meal, combatant.price, combatant.cuisine, combatant.difficulty)
+        logger.debug("Calculating battle score for %s: price=%.3f, cuisine=%s, difficulty=%s",
+                     combatant.meal, combatant.price, combatant.cuisine, combatant.difficulty)
 
-        # Calculate score
-        score = (combatant.price * len(combatant.cuisine)) - difficulty_modifier[combatant.difficulty]
+        # Meals read from the database carry the score stored when they were created
+        score = combatant.battle_score
+        if score is None:
+            score = compute_battle_score(combatant.price, combatant.cuisine, combatant.difficulty)
 
         # Log the calculated score
-        logger.info("Battle score for %s: %.3f", combatant.meal, score)
+        logger.debug("Battle score for %s: %.3f", combatant.meal, score)
 
         return score
 
@@ -130,7 +162,7 @@ class BattleModel:
         Returns a list of all combatant in the combatants list.
         """
         self.check_if_empty()
-        logger.info("Retrieving current list of combatants.")
+        logger.debug("Retrieving current list of combatants.")
         return self.combatants
 
     def prep_combatant(self, combatant_data: Meal):
@@ -153,12 +185,13 @@ class BattleModel:
             raise ValueError("Combatant list is full, cannot add more combatants.")
 
         # Log the addition of the combatant
-        logger.info("Adding combatant '%s' to combatants list", combatant_data.meal)
+        logger.debug("Adding combatant '%s' to combatants list", combatant_data.meal)
 
         self.combatants.append(combatant_data)
 
         # Log the current state of combatants
-        logger.info("Current combatants list: %s", [combatant.meal for combatant in self.combatants])
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug("Current combatants list: %s", [combatant.meal for combatant in self.combatants])
     
     def check_if_empty(self) -> None:
         """
@@ -1,15 +1,80 @@
-from dataclasses import dataclass
+import atexit
+from dataclasses import field
 import logging
+import math
+import os
 import sqlite3
-from typing import Any, List, Dict
+import time
+from typing import Any, Dict, Iterable, Iterator, List, Mapping, Optional, Sequence, Tuple
 
-from meal_max.utils.sql_utils import get_db_connection
+from meal_max.utils import metrics
+from meal_max.utils.cache import LRUCache
+from meal_max.utils.dataclass_utils import slotted_dataclass
+from meal_max.utils.migrations import apply_migrations
+from meal_max.utils.sql_utils import get_db_connection, retry_on_busy
+from meal_max.utils.stats_buffer import StatsBuffer
 from meal_max.utils.logger import configure_logger
 
 logger = logging.getLogger(__name__)
 configure_logger(logger)
 
-@dataclass
+
+# Read-through cache for get_meal_by_id / get_meal_by_name, keyed by ('id', id)
+# with ('name', name) as an alias. Set MEAL_CACHE_SIZE=0 to disable it. Other
+# worker processes only see a delete once their copy expires after MEAL_CACHE_TTL.
+meal_cache = LRUCache(max_size=int(os.getenv("MEAL_CACHE_SIZE", "1024")),
+                      ttl=float(os.getenv("MEAL_CACHE_TTL", "60")))
+
+# Write-behind battle stats: with STATS_WRITE_BEHIND=true, results are summed in
+# memory and written in one transaction every STATS_FLUSH_INTERVAL seconds or
+# STATS_FLUSH_MAX_PENDING results, and journaled to STATS_JOURNAL_DIR meanwhile.
+# Off by default: results for meals deleted before the flush are dropped rather
+# than reported to the caller.
+STATS_WRITE_BEHIND = os.getenv("STATS_WRITE_BEHIND", "false").lower() == "true"
+# seconds an applied journal's ID is remembered; a journal left behind for longer
+# than this before it is recovered would be applied twice
+STATS_JOURNAL_RETENTION = float(os.getenv("STATS_JOURNAL_RETENTION", str(7 * 24 * 3600)))
+
+# Change counters read by get_data_version, keyed by name. A write in this process
+# drops the counters it bumps; writes by other workers, or one committing while the
+# counters were being read, show once the copy expires after DATA_VERSION_TTL
+# seconds. Set DATA_VERSION_TTL=0 to read them on every request.
+DATA_VERSION_TTL = float(os.getenv("DATA_VERSION_TTL", "1"))
+data_version_cache = LRUCache(max_size=8 if DATA_VERSION_TTL > 0 else 0, ttl=DATA_VERSION_TTL)
+
+metrics.registry.callback(
+    "meal_max_meal_cache_lookups_total", "Meal cache lookups by result.", "counter", ("result",),
+    lambda: {('hit',): meal_cache.stats()['hits'], ('miss',): meal_cache.stats()['misses']})
+
+# Make Meal instances immutable. The meal cache hands the same instance to every
+# caller, so this guards it against accidental edits, at roughly three times the
+# construction cost.
+MEAL_FROZEN = os.getenv("MEAL_FROZEN", "false").lower() == "true"
+
+_new_object = object.__new__
+_set_attribute = object.__setattr__
+
+# Subtracted from a meal's battle score: harder meals score higher
+DIFFICULTY_MODIFIERS = {"HIGH": 1, "MED": 2, "LOW": 3}
+
+
+def compute_battle_score(price: float, cuisine: str, difficulty: str) -> float:
+    """
+    Calculates the score a meal brings to a battle. It is stored with the meal when
+    the meal is created; migration 0003 applies the same formula in SQL.
+
+    Args:
+        price (float): The price of the meal.
+        cuisine (str): The type of cuisine for the meal.
+        difficulty (str): The difficulty level of the meal (LOW, MED, HIGH).
+
+    Returns:
+        float: price * len(cuisine) minus the difficulty modifier.
+    """
+    return (price * len(cuisine)) - DIFFICULTY_MODIFIERS[difficulty]
+
+
+@slotted_dataclass(frozen=MEAL_FROZEN)
 class Meal:
     """
     A dataclass representing a Meal object.
@@ -20,12 +85,16 @@ class Meal:
         cuisine (str): The type of cuisine for the meal.
         price (float): The price of the meal.
         difficulty (str): The difficulty level of preparing the meal (LOW, MED, HIGH).
+        battle_score (Optional[float]): The stored battle score, when read from the database.
+            Derived from the other fields, so it is ignored when comparing meals and
+            left out of API responses.
     """
     id: int
     meal: str
     cuisine: str
     price: float
     difficulty: str
+    battle_score: Optional[float] = field(default=None, compare=False, metadata={'serialize': False})
 
     def __post_init__(self):
         if self.price < 0:
@@ -33,7 +102,111 @@ class Meal:
         if self.difficulty not in ['LOW', 'MED', 'HIGH']:
             raise ValueError("Difficulty must be 'LOW', 'MED', or 'HIGH'.")
 
+    @classmethod
+    def from_row(cls, row: Sequence[Any]) -> "Meal":
+        """
+        Builds a Meal from a database row without validating it again. Only use it for
+        rows read from the meals table, whose values were checked when they were written.
 
+        Args:
+            row (Sequence[Any]): id, meal, cuisine, price, difficulty and battle_score, in
+                that order. Any further columns are ignored.
+
+        Returns:
+            Meal: The meal.
+        """
+        meal = _new_object(cls)
+        if MEAL_FROZEN:
+            _set_attribute(meal, 'id', row[0])
+            _set_attribute(meal, 'meal', row[1])
+            _set_attribute(meal, 'cuisine', row[2])
+            _set_attribute(meal, 'price', row[3])
+            _set_attribute(meal, 'difficulty', row[4])
+            _set_attribute(meal, 'battle_score', row[5])
+        else:
+            meal.id, meal.meal, meal.cuisine, meal.price, meal.difficulty, meal.battle_score = (
+                row[0], row[1], row[2], row[3], row[4], row[5])
+        return meal
+
+
+def meal_row_factory(cursor: sqlite3.Cursor, row: Tuple) -> Meal:
+    """
+    sqlite3 row factory that turns each row of a meals query into a Meal as it is
+    fetched. The query must select id, meal, cuisine, price, difficulty and battle_score first.
+    """
+    return Meal.from_row(row)
+
+
+def _bump_versions(conn: sqlite3.Connection, *names: str) -> None:
+    """
+    Bumps the change counters of the named data ('meals', 'meal_stats') inside the
+    caller's transaction, so they commit together with the change.
+    """
+    conn.execute(f"UPDATE table_versions SET version = version + 1, updated_at = ? "
+                 f"WHERE name IN ({', '.join('?' * len(names))})", (time.time(), *names))
+    for name in names:
+        data_version_cache.invalidate(name)
+
+
+def get_data_version(names: Sequence[str]) -> Tuple[str, float]:
+    """
+    Returns validators for HTTP caching of responses built from the named data.
+
+    The tag changes whenever any of the data is written: it joins the change counters
+    and, for 'meal_stats' with write-behind stats on, this process's pending results,
+    which the leaderboard includes but the counters do not yet reflect. The counters
+    are cached for DATA_VERSION_TTL seconds (see data_version_cache).
+
+    Args:
+        names (Sequence[str]): 'meals' (the catalog) and/or 'meal_stats' (battle results).
+
+    Returns:
+        Tuple[str, float]: The tag, and the Unix time of the latest change.
+
+    Raises:
+        ValueError: If a name has no change counter.
+    """
+    versions: Dict[str, Tuple[int, float]] = {}
+    missing = []
+    for name in names:
+        cached = data_version_cache.get(name)
+        if cached is None:
+            missing.append(name)
+        else:
+            versions[name] = cached
+
+    if missing:
+        try:
+            with get_db_connection() as conn:
+                cursor = conn.cursor()
+                cursor.execute(f"SELECT name, version, updated_at FROM table_versions "
+                               f"WHERE name IN ({', '.join('?' * len(missing))})", missing)
+                for name, version, updated_at in cursor.fetchall():
+                    versions[name] = (version, updated_at)
+                    data_version_cache.set(name, (version, updated_at))
+
+        except sqlite3.Error as e:
+            logger.error("Database error: %s", str(e))
+            raise e
+
+    parts = []
+    for name in names:
+        if name not in versions:
+            raise ValueError(f"No change counter for {name}")
+        parts.append(f"{name}.{versions[name][0]}")
+    last_modified = max(updated_at for _, updated_at in versions.values())
+
+    if 'meal_stats' in names and STATS_WRITE_BEHIND:
+        buffered = stats_buffer.changes()
+        if buffered is not None:
+            generation, updated_at = buffered
+            parts.append(f"pending.{os.getpid()}.{generation}")
+            last_modified = max(last_modified, updated_at)
+
+    return "-".join(parts), last_modified
+
+
+@retry_on_busy
 def create_meal(meal: str, cuisine: str, price: float, difficulty: str) -> None:
     """
     Creates a new meal in the database.
@@ -56,10 +229,12 @@ def create_meal(meal: str, cuisine: str, price: float, difficulty: str) -> None:
         with get_db_connection() as conn:
             cursor = conn.cursor()
             cursor.execute("""
-                INSERT INTO meals (meal, cuisine, price, difficulty)
-                VALUES (?, ?, ?, ?)
-            """, (meal, cuisine, price, difficulty))
+                INSERT INTO meals (meal, cuisine, price, difficulty, battle_score)
+                VALUES (?, ?, ?, ?, ?)
+            """, (meal, cuisine, price, difficulty, compute_battle_score(price, cuisine, difficulty)))
+            _bump_versions(conn, 'meals')
             conn.commit()
+            meal_cache.invalidate(('name', meal))
             logger.info("Meal successfully added to the database: %s", meal)
 
     except sqlite3.IntegrityError:
@@ -70,6 +245,158 @@ def create_meal(meal: str, cuisine: str, price: float, difficulty: str) -> None:
         raise e
 
 
+def _validate_meal_row(row: Any) -> Tuple[str, str, float, str]:
+    """
+    Validates and normalizes one row of a bulk meal load.
+
+    Args:
+        row (Any): A mapping with meal, cuisine, price and difficulty keys. The price
+            may be a number or a numeric string, as produced by CSV readers.
+
+    Returns:
+        Tuple[str, str, float, str]: The values ready for insertion.
+
+    Raises:
+        ValueError: If a field is missing or invalid.
+    """
+    if not isinstance(row, Mapping):
+        raise ValueError("Row must be an object with meal, cuisine, price and difficulty")
+
+    meal = row.get('meal')
+    cuisine = row.get('cuisine')
+    price = row.get('price')
+    difficulty = row.get('difficulty')
+
+    if not meal or not isinstance(meal, str):
+        raise ValueError("Meal name is required")
+    if not cuisine or not isinstance(cuisine, str):
+        raise ValueError("Cuisine is required")
+    if isinstance(price, bool):
+        raise ValueError(f"Invalid price: {price}. Price must be a positive number.")
+    try:
+        price = float(price)
+    except (TypeError, ValueError):
+        raise ValueError(f"Invalid price: {price}. Price must be a positive number.")
+    if price <= 0:
+        raise ValueError(f"Invalid price: {price}. Price must be a positive number.")
+    if round(price, 2) != price:
+        raise ValueError(f"Invalid price: {price}. Price must have at most two decimal places.")
+    if difficulty not in ['LOW', 'MED', 'HIGH']:
+        raise ValueError(f"Invalid difficulty level: {difficulty}. Must be 'LOW', 'MED', or 'HIGH'.")
+
+    return meal, cuisine, price, difficulty
+
+
+def create_meals(meals: Iterable[Mapping[str, Any]], batch_size: int = 500) -> Dict[str, Any]:
+    """
+    Creates many meals in a single transaction.
+
+    Rows are validated and inserted in batches with executemany. Invalid rows and
+    rows whose name already exists (in the database or earlier in the input) are
+    skipped and reported; the remaining rows are committed together.
+
+    Args:
+        meals (Iterable[Mapping[str, Any]]): Rows with meal, cuisine, price and difficulty keys.
+            The iterable is consumed lazily, so it may be a streaming parser.
+        batch_size (int): How many rows to check and insert per executemany call.
+
+    Returns:
+        Dict[str, Any]: The number of meals created, plus a list of duplicates and a list
+        of errors, each entry carrying the zero-based row number.
+
+    Raises:
+        ValueError: If the batch size is not positive, or if the input stream is malformed.
+    """
+    if batch_size < 1:
+        raise ValueError(f"Invalid batch size: {batch_size}. Must be at least 1.")
+
+    created = 0
+    duplicates: List[Dict[str, Any]] = []
+    errors: List[Dict[str, Any]] = []
+    seen = set()
+
+    def insert_batch(cursor: sqlite3.Cursor, batch: List[Tuple[int, Tuple[str, str, float, str]]]) -> int:
+        names = [values[0] for _, values in batch]
+        placeholders = ", ".join("?" * len(names))
+        cursor.execute(f"SELECT meal FROM meals WHERE meal IN ({placeholders})", names)
+        existing = {row[0] for row in cursor.fetchall()}
+
+        to_insert = []
+        for index, values in batch:
+            if values[0] in existing or values[0] in seen:
+                duplicates.append({'row': index, 'meal': values[0]})
+                continue
+            seen.add(values[0])
+            _, cuisine, price, difficulty = values
+            to_insert.append(values + (compute_battle_score(price, cuisine, difficulty),))
+            meal_cache.invalidate(('name', values[0]))
+
+        cursor.executemany("""
+            INSERT INTO meals (meal, cuisine, price, difficulty, battle_score)
+            VALUES (?, ?, ?, ?, ?)
+        """, to_insert)
+        return len(to_insert)
+
+    try:
+        with get_db_connection() as conn:
+            cursor = conn.cursor()
+            if not conn.in_transaction:
+                # Take the write lock up front so the duplicate checks stay valid until commit.
+                cursor.execute("BEGIN IMMEDIATE")
+
+            batch: List[Tuple[int, Tuple[str, str, float, str]]] = []
+            for index, row in enumerate(meals):
+                try:
+                    batch.append((index, _validate_meal_row(row)))
+                except ValueError as e:
+                    errors.append({'row': index, 'error': str(e)})
+                    continue
+                if len(batch) >= batch_size:
+                    created += insert_batch(cursor, batch)
+                    batch = []
+            if batch:
+                created += insert_batch(cursor, batch)
+
+            if created:
+                _bump_versions(conn, 'meals')
+            conn.commit()
+            logger.info("Bulk load added %d meals (%d duplicates, %d errors)", created, len(duplicates), len(errors))
+
+    except sqlite3.Error as e:
+        logger.error("Database error: %s", str(e))
+        raise e
+
+    return {'created': created, 'duplicates': duplicates, 'errors': errors}
+
+
+def clear_meals() -> None:
+    """
+    Recreates the meals table from the create table script, deleting all meals,
+    and applies any migrations still pending. The script builds meals at the current
+    schema, so the other tables (arenas, table_versions, ...) are left as they are.
+
+    Raises:
+        sqlite3.Error: For any database-related issues.
+    """
+    try:
+        with open(os.getenv("SQL_CREATE_TABLE_PATH", "/app/sql/create_meal_table.sql"), "r") as fh:
+            create_table_script = fh.read()
+        with get_db_connection() as conn:
+            cursor = conn.cursor()
+            cursor.executescript(create_table_script)
+            apply_migrations(conn)
+            _bump_versions(conn, 'meals', 'meal_stats')
+            conn.commit()
+        meal_cache.clear()
+        stats_buffer.discard()
+        logger.info("Meals cleared successfully.")
+
+    except sqlite3.Error as e:
+        logger.error("Database error while clearing meals: %s", str(e))
+        raise e
+
+
+@retry_on_busy
 def delete_meal(meal_id: int) -> None:
     """
     Marks a meal as deleted in the database by its ID.
@@ -88,13 +415,16 @@ def delete_meal(meal_id: int) -> None:
                 deleted = cursor.fetchone()[0]
                 if deleted:
                     logger.info("Meal with ID %s has already been deleted", meal_id)
+                    meal_cache.invalidate(('id', meal_id))
                     raise ValueError(f"Meal with ID {meal_id} has been deleted")
             except TypeError:
                 logger.info("Meal with ID %s not found", meal_id)
                 raise ValueError(f"Meal with ID {meal_id} not found")
 
             cursor.execute("UPDATE meals SET deleted = TRUE WHERE id = ?", (meal_id,))
+            _bump_versions(conn, 'meals')
             conn.commit()
+            meal_cache.invalidate(('id', meal_id))
             logger.info("Meal with ID %s marked as deleted.", meal_id)
 
     except sqlite3.Error as e:
@@ -102,51 +432,157 @@ def delete_meal(meal_id: int) -> None:
         raise e
 
 
-def get_leaderboard(sort_by: str = "wins") -> List[Dict[str, Any]]:
+def get_active_meals() -> List[Meal]:
     """
-    Retrieves the leaderboard of meals, sorted by wins or win percentage.
-
-    Args:
-        sort_by (str): The sorting criteria for the leaderboard ("wins" or "win_pct").
+    Retrieves every meal that has not been deleted, ordered by ID.
 
     Returns:
-        List[Dict[str, Any]]: A list of dictionaries with meal information, including win percentage.
+        List[Meal]: The active meals.
+    """
+    try:
+        with get_db_connection() as conn:
+            cursor = conn.cursor()
+            cursor.row_factory = meal_row_factory
+            cursor.execute("SELECT id, meal, cuisine, price, difficulty, battle_score FROM meals WHERE deleted = 0 ORDER BY id")
+            meals = cursor.fetchall()
+
+        logger.info("Retrieved %d active meals", len(meals))
+        return meals
+
+    except sqlite3.Error as e:
+        logger.error("Database error: %s", str(e))
+        raise e
+
+
+# Column order of leaderboard entries, used as the CSV header of the export
+LEADERBOARD_FIELDS = ('id', 'meal', 'cuisine', 'price', 'difficulty', 'battles', 'wins', 'win_pct')
+
+
+def _leaderboard_query(sort_by: str, cuisine: Optional[str] = None,
+                       difficulty: Optional[str] = None) -> Tuple[str, List[Any]]:
+    """
+    Builds the leaderboard SELECT and its parameters, without LIMIT or OFFSET.
 
     Raises:
-        ValueError: If the sort_by parameter is invalid.
+        ValueError: If the sort_by or difficulty parameter is invalid.
     """
+    # The filter must match the partial indexes' WHERE clause word for word.
     query = """
         SELECT id, meal, cuisine, price, difficulty, battles, wins, (wins * 1.0 / battles) AS win_pct
-        FROM meals WHERE deleted = false AND battles > 0
+        FROM meals WHERE deleted = 0 AND battles > 0
     """
+    params: List[Any] = []
+
+    if cuisine is not None:
+        query += " AND cuisine = ?"
+        params.append(cuisine)
+    if difficulty is not None:
+        if difficulty not in ['LOW', 'MED', 'HIGH']:
+            raise ValueError(f"Invalid difficulty level: {difficulty}. Must be 'LOW', 'MED', or 'HIGH'.")
+        query += " AND difficulty = ?"
+        params.append(difficulty)
 
     if sort_by == "win_pct":
-        query += " ORDER BY win_pct DESC"
+        query += " ORDER BY win_pct DESC, id"
     elif sort_by == "wins":
-        query += " ORDER BY wins DESC"
+        query += " ORDER BY wins DESC, id"
     else:
         logger.error("Invalid sort_by parameter: %s", sort_by)
         raise ValueError("Invalid sort_by parameter: %s" % sort_by)
 
+    return query, params
+
+
+def _leaderboard_entry(row: Tuple) -> Dict[str, Any]:
+    return {
+        'id': row[0],
+        'meal': row[1],
+        'cuisine': row[2],
+        'price': row[3],
+        'difficulty': row[4],
+        'battles': row[5],
+        'wins': row[6],
+        'win_pct': round(row[7], 1)  # Convert to percentage
+    }
+
+
+def _rank_with_pending(cursor: sqlite3.Cursor, rows: List[Tuple], pending: Mapping[int, List[int]],
+                       sort_by: str) -> List[Tuple]:
+    """
+    Adds buffered increments to leaderboard rows, fetching the pending meals that are
+    not among them, and re-ranks the lot the way the leaderboard query does.
+    """
+    merged = {row[0]: list(row) for row in rows}
+    meal_ids = list(pending)
+    for start in range(0, len(meal_ids), 500):
+        chunk = meal_ids[start:start + 500]
+        cursor.execute(f"""
+            SELECT id, meal, cuisine, price, difficulty, battles, wins, NULL FROM meals
+            WHERE id IN ({', '.join('?' * len(chunk))}) AND deleted = 0
+        """, chunk)
+        merged.update((row[0], list(row)) for row in cursor.fetchall())
+
+    for meal_id, row in merged.items():
+        if meal_id in pending:
+            battles, wins = pending[meal_id]
+            row[5] += battles
+            row[6] += wins
+        row[7] = row[6] * 1.0 / row[5] if row[5] else None
+
+    ranked = [tuple(row) for row in merged.values() if row[5] > 0]
+    column = 6 if sort_by == "wins" else 7
+    ranked.sort(key=lambda row: (-row[column], row[0]))
+    return ranked
+
+
+def get_leaderboard(sort_by: str = "wins", limit: Optional[int] = None, offset: int = 0) -> List[Dict[str, Any]]:
+    """
+    Retrieves the leaderboard of meals, sorted by wins or win percentage.
+
+    Each sort order is served by a partial index over active meals that SQLite keeps
+    up to date as battle results are written, so a page of the top meals is read
+    straight off the index instead of sorting the whole table. Ties are broken by ID
+    so pages are stable. Results still in the write-behind buffer are included.
+
+    Args:
+        sort_by (str): The sorting criteria for the leaderboard ("wins" or "win_pct").
+        limit (Optional[int]): The maximum number of meals to return. Defaults to all.
+        offset (int): The number of top-ranked meals to skip.
+
+    Returns:
+        List[Dict[str, Any]]: A list of dictionaries with meal information, including win percentage.
+
+    Raises:
+        ValueError: If the sort_by, limit or offset parameter is invalid.
+    """
+    query, _ = _leaderboard_query(sort_by)
+
+    if limit is not None and limit < 1:
+        raise ValueError(f"Invalid limit: {limit}. Must be at least 1.")
+    if offset < 0:
+        raise ValueError(f"Invalid offset: {offset}. Must not be negative.")
+    pending = stats_buffer.pending() if STATS_WRITE_BEHIND else None
+    params: Tuple[int, ...] = ()
+    if pending:
+        # Pending results can move any of their meals into the page or out of it, so
+        # read enough ranked rows to fill the page without them and rank them in.
+        if limit is not None:
+            query += " LIMIT ?"
+            params = (offset + limit + len(pending),)
+    elif limit is not None or offset:
+        query += " LIMIT ? OFFSET ?"
+        params = (-1 if limit is None else limit, offset)
+
     try:
         with get_db_connection() as conn:
             cursor = conn.cursor()
-            cursor.execute(query)
+            cursor.execute(query, params)
             rows = cursor.fetchall()
+            if pending:
+                rows = _rank_with_pending(cursor, rows, pending, sort_by)
+                rows = rows[offset:None if limit is None else offset + limit]
 
-        leaderboard = []
-        for row in rows:
-            meal = {
-                'id': row[0],
-                'meal': row[1],
-                'cuisine': row[2],
-                'price': row[3],
-                'difficulty': row[4],
-                'battles': row[5],
-                'wins': row[6],
-                'win_pct': round(row[7], 1)  # Convert to percentage
-            }
-            leaderboard.append(meal)
+        leaderboard = [_leaderboard_entry(row) for row in rows]
 
         logger.info("Leaderboard retrieved successfully")
         return leaderboard
@@ -156,6 +592,145 @@ def get_leaderboard(sort_by: str = "wins") -> List[Dict[str, Any]]:
         raise e
 
 
+def iter_leaderboard(sort_by: str = "wins", cuisine: Optional[str] = None, difficulty: Optional[str] = None,
+                     batch_size: int = 1000) -> Iterator[Dict[str, Any]]:
+    """
+    Streams the whole leaderboard, optionally filtered, for exports.
+
+    Rows are read from the cursor batch_size at a time with fetchmany, so memory stays
+    flat however many meals there are. The arguments are checked when this is called;
+    the query runs once iteration starts, and the pooled connection is held until the
+    iterator is exhausted or closed.
+
+    Args:
+        sort_by (str): The sorting criteria for the leaderboard ("wins" or "win_pct").
+        cuisine (Optional[str]): Only include meals of this cuisine.
+        difficulty (Optional[str]): Only include meals of this difficulty (LOW, MED, HIGH).
+        batch_size (int): How many rows to fetch from SQLite at a time.
+
+    Returns:
+        Iterator[Dict[str, Any]]: Leaderboard entries in rank order, shaped like get_leaderboard's.
+
+    Raises:
+        ValueError: If the sort_by, difficulty or batch_size parameter is invalid.
+    """
+    query, params = _leaderboard_query(sort_by, cuisine, difficulty)
+    if batch_size < 1:
+        raise ValueError(f"Invalid batch size: {batch_size}. Must be at least 1.")
+    if STATS_WRITE_BEHIND:
+        # Cheaper than merging pending results into a stream
+        stats_buffer.flush()
+    return _stream_leaderboard(query, params, batch_size)
+
+
+def _stream_leaderboard(query: str, params: List[Any], batch_size: int) -> Iterator[Dict[str, Any]]:
+    streamed = 0
+    try:
+        with get_db_connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute(query, params)
+            while True:
+                rows = cursor.fetchmany(batch_size)
+                if not rows:
+                    break
+                for row in rows:
+                    yield _leaderboard_entry(row)
+                streamed += len(rows)
+
+    except sqlite3.Error as e:
+        logger.error("Database error: %s", str(e))
+        raise e
+
+    logger.info("Leaderboard export streamed %d meals", streamed)
+
+
+CATALOG_FIELDS = ('id', 'meal', 'cuisine', 'price', 'difficulty', 'battles', 'wins', 'deleted')
+
+
+def list_meals(cuisine: Optional[str] = None, difficulty: Optional[str] = None,
+               min_price: Optional[float] = None, max_price: Optional[float] = None,
+               deleted: Optional[bool] = False, after: int = 0, limit: int = 50) -> Dict[str, Any]:
+    """
+    Retrieves one page of the meal catalog in ID order, optionally filtered.
+
+    Pages are keyset-paginated: each page starts after the last ID of the previous
+    one (its next_cursor), so the query seeks straight to it through the primary key,
+    or through idx_meals_cuisine / idx_meals_difficulty / idx_meals_cuisine_difficulty
+    when those filters are given. A deep page costs the same as the first; only a
+    price range that few meals match makes the query skip rows to fill a page.
+
+    Args:
+        cuisine (Optional[str]): Only include meals of this cuisine.
+        difficulty (Optional[str]): Only include meals of this difficulty (LOW, MED, HIGH).
+        min_price (Optional[float]): Only include meals costing at least this much.
+        max_price (Optional[float]): Only include meals costing at most this much.
+        deleted (Optional[bool]): False for active meals, True for deleted ones, None for both.
+        after (int): Only include meals with a higher ID: the previous page's next_cursor.
+        limit (int): The maximum number of meals to return, from 1 to 1000.
+
+    Returns:
+        Dict[str, Any]: The meals, as dicts with CATALOG_FIELDS (battle stats include
+        write-behind results), and next_cursor, the value of after for the next page,
+        or None on the last page.
+
+    Raises:
+        ValueError: If the difficulty, price range, after or limit parameter is invalid.
+    """
+    if not 1 <= limit <= 1000:
+        raise ValueError(f"Invalid limit: {limit}. Must be between 1 and 1000.")
+    if after < 0:
+        raise ValueError(f"Invalid cursor: {after}. Must not be negative.")
+    for bound in (min_price, max_price):
+        if bound is not None and not math.isfinite(bound):
+            raise ValueError(f"Invalid price bound: {bound}. Must be a finite number.")
+    if min_price is not None and max_price is not None and min_price > max_price:
+        raise ValueError(f"Invalid price range: {min_price} to {max_price}. The minimum exceeds the maximum.")
+
+    query = "SELECT id, meal, cuisine, price, difficulty, battles, wins, deleted FROM meals WHERE id > ?"
+    params: List[Any] = [after]
+    if cuisine is not None:
+        query += " AND cuisine = ?"
+        params.append(cuisine)
+    if difficulty is not None:
+        if difficulty not in ['LOW', 'MED', 'HIGH']:
+            raise ValueError(f"Invalid difficulty level: {difficulty}. Must be 'LOW', 'MED', or 'HIGH'.")
+        query += " AND difficulty = ?"
+        params.append(difficulty)
+    if min_price is not None:
+        query += " AND price >= ?"
+        params.append(min_price)
+    if max_price is not None:
+        query += " AND price <= ?"
+        params.append(max_price)
+    if deleted is not None:
+        query += " AND deleted = ?"
+        params.append(int(deleted))
+    # One extra row tells whether there is a next page
+    query += " ORDER BY id LIMIT ?"
+    params.append(limit + 1)
+
+    try:
+        with get_db_connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute(query, params)
+            rows = cursor.fetchall()
+
+    except sqlite3.Error as e:
+        logger.error("Database error: %s", str(e))
+        raise e
+
+    next_cursor = rows[limit - 1][0] if len(rows) > limit else None
+    pending = stats_buffer.pending() if STATS_WRITE_BEHIND else {}
+    meals = []
+    for row in rows[:limit]:
+        battles, wins = pending.get(row[0], (0, 0))
+        meals.append({'id': row[0], 'meal': row[1], 'cuisine': row[2], 'price': row[3], 'difficulty': row[4],
+                      'battles': row[5] + battles, 'wins': row[6] + wins, 'deleted': bool(row[7])})
+
+    logger.info("Listed %d meals after ID %d", len(meals), after)
+    return {'meals': meals, 'next_cursor': next_cursor}
+
+
 def get_meal_by_id(meal_id: int) -> Meal:
     """
     Retrieves a meal from the database by its ID.
@@ -169,17 +744,23 @@ def get_meal_by_id(meal_id: int) -> Meal:
     Raises:
         ValueError: If the meal is deleted or not found.
     """
+    cached = meal_cache.get(('id', meal_id))
+    if cached is not None:
+        return cached
+
     try:
         with get_db_connection() as conn:
             cursor = conn.cursor()
-            cursor.execute("SELECT id, meal, cuisine, price, difficulty, deleted FROM meals WHERE id = ?", (meal_id,))
+            cursor.execute("SELECT id, meal, cuisine, price, difficulty, battle_score, deleted FROM meals WHERE id = ?", (meal_id,))
             row = cursor.fetchone()
 
             if row:
-                if row[5]:
+                if row[6]:
                     logger.info("Meal with ID %s has been deleted", meal_id)
                     raise ValueError(f"Meal with ID {meal_id} has been deleted")
-                return Meal(id=row[0], meal=row[1], cuisine=row[2], price=row[3], difficulty=row[4])
+                meal = Meal.from_row(row)
+                meal_cache.set(('id', meal.id), meal, aliases=[('name', meal.meal)])
+                return meal
             else:
                 logger.info("Meal with ID %s not found", meal_id)
                 raise ValueError(f"Meal with ID {meal_id} not found")
@@ -202,17 +783,23 @@ def get_meal_by_name(meal_name: str) -> Meal:
     Raises:
         ValueError: If the meal is deleted or not found.
     """
+    cached = meal_cache.get(('name', meal_name))
+    if cached is not None:
+        return cached
+
     try:
         with get_db_connection() as conn:
             cursor = conn.cursor()
-            cursor.execute("SELECT id, meal, cuisine, price, difficulty, deleted FROM meals WHERE meal = ?", (meal_name,))
+            cursor.execute("SELECT id, meal, cuisine, price, difficulty, battle_score, deleted FROM meals WHERE meal = ?", (meal_name,))
             row = cursor.fetchone()
 
             if row:
-                if row[5]:
+                if row[6]:
                     logger.info("Meal with name %s has been deleted", meal_name)
                     raise ValueError(f"Meal with name {meal_name} has been deleted")
-                return Meal(id=row[0], meal=row[1], cuisine=row[2], price=row[3], difficulty=row[4])
+                meal = Meal.from_row(row)
+                meal_cache.set(('id', meal.id), meal, aliases=[('name', meal.meal)])
+                return meal
             else:
                 logger.info("Meal with name %s not found", meal_name)
                 raise ValueError(f"Meal with name {meal_name} not found")
@@ -222,6 +809,333 @@ def get_meal_by_name(meal_name: str) -> Meal:
         raise e
 
 
+def _get_meals_by(column: str, keys: Iterable[Any], chunk_size: int) -> Dict[str, List[Any]]:
+    """
+    Looks up meals by id or meal (the column) for get_meals_by_ids / get_meals_by_names:
+    cached meals first, then one IN query per chunk_size keys still missing.
+    """
+    if chunk_size < 1:
+        raise ValueError(f"Invalid chunk size: {chunk_size}. Must be at least 1.")
+    kind = 'id' if column == 'id' else 'name'
+    # Duplicates are looked up and reported once, in order of first appearance
+    keys = list(dict.fromkeys(keys))
+
+    found: Dict[Any, Meal] = {}
+    misses = []
+    for key in keys:
+        cached = meal_cache.get((kind, key))
+        if cached is not None:
+            found[key] = cached
+        else:
+            misses.append(key)
+
+    deleted = set()
+    if misses:
+        try:
+            with get_db_connection() as conn:
+                cursor = conn.cursor()
+                for start in range(0, len(misses), chunk_size):
+                    chunk = misses[start:start + chunk_size]
+                    cursor.execute(f"SELECT id, meal, cuisine, price, difficulty, battle_score, deleted FROM meals "
+                                   f"WHERE {column} IN ({', '.join('?' * len(chunk))})", chunk)
+                    for row in cursor.fetchall():
+                        key = row[0] if column == 'id' else row[1]
+                        if row[6]:
+                            deleted.add(key)
+                            continue
+                        meal = Meal.from_row(row)
+                        meal_cache.set(('id', meal.id), meal, aliases=[('name', meal.meal)])
+                        found[key] = meal
+
+        except sqlite3.Error as e:
+            logger.error("Database error: %s", str(e))
+            raise e
+
+    result: Dict[str, List[Any]] = {'meals': [], 'not_found': [], 'deleted': []}
+    for key in keys:
+        if key in found:
+            result['meals'].append(found[key])
+        elif key in deleted:
+            result['deleted'].append(key)
+        else:
+            result['not_found'].append(key)
+    logger.info("Looked up %d meals by %s: %d found, %d not found, %d deleted", len(keys), kind,
+                len(result['meals']), len(result['not_found']), len(result['deleted']))
+    return result
+
+
+def get_meals_by_ids(meal_ids: Iterable[int], chunk_size: int = 500) -> Dict[str, List[Any]]:
+    """
+    Retrieves many meals by ID with one query per chunk, instead of one per meal.
+
+    Meals already in the meal cache are served from it, and the rest are cached.
+
+    Args:
+        meal_ids (Iterable[int]): The IDs to look up. Duplicates are looked up once.
+        chunk_size (int): How many IDs to put in each IN (...) query.
+
+    Returns:
+        Dict[str, List[Any]]: The active meals found, in the order their IDs were
+        given, plus the IDs not found and the IDs of deleted meals.
+
+    Raises:
+        ValueError: If the chunk size is not positive.
+    """
+    return _get_meals_by('id', meal_ids, chunk_size)
+
+
+def get_meals_by_names(meal_names: Iterable[str], chunk_size: int = 500) -> Dict[str, List[Any]]:
+    """
+    Retrieves many meals by name with one query per chunk, instead of one per meal.
+
+    Meals already in the meal cache are served from it, and the rest are cached.
+
+    Args:
+        meal_names (Iterable[str]): The names to look up. Duplicates are looked up once.
+        chunk_size (int): How many names to put in each IN (...) query.
+
+    Returns:
+        Dict[str, List[Any]]: The active meals found, in the order their names were
+        given, plus the names not found and the names of deleted meals.
+
+    Raises:
+        ValueError: If the chunk size is not positive.
+    """
+    return _get_meals_by('meal', meal_names, chunk_size)
+
+
+def find_close_opponents(meal_id: int, limit: int = 1) -> List[Meal]:
+    """
+    Finds the active meals whose battle scores are closest to a meal's, for matchmaking.
+
+    Reads at most limit meals on each side of the meal's score off the battle score
+    index, so the cost does not grow with the catalog.
+
+    Args:
+        meal_id (int): The ID of the meal to find opponents for.
+        limit (int): The number of opponents to return.
+
+    Returns:
+        List[Meal]: The closest meals first, ties going to the lower score. Fewer than
+        limit if there are not enough other active meals.
+
+    Raises:
+        ValueError: If the limit is not positive, or if the meal is deleted or not found.
+    """
+    if limit < 1:
+        raise ValueError(f"Invalid limit: {limit}. Must be at least 1.")
+
+    meal = get_meal_by_id(meal_id)
+    score = meal.battle_score
+    if score is None:
+        score = compute_battle_score(meal.price, meal.cuisine, meal.difficulty)
+
+    try:
+        with get_db_connection() as conn:
+            cursor = conn.cursor()
+            cursor.row_factory = meal_row_factory
+            # The filter must match the partial index's WHERE clause word for word.
+            cursor.execute("""
+                SELECT id, meal, cuisine, price, difficulty, battle_score FROM meals
+                WHERE deleted = 0 AND battle_score >= ? AND id != ?
+                ORDER BY battle_score, id LIMIT ?
+            """, (score, meal_id, limit))
+            above = cursor.fetchall()
+            cursor.execute("""
+                SELECT id, meal, cuisine, price, difficulty, battle_score FROM meals
+                WHERE deleted = 0 AND battle_score < ?
+                ORDER BY battle_score DESC, id DESC LIMIT ?
+            """, (score, limit))
+            below = cursor.fetchall()
+
+    except sqlite3.Error as e:
+        logger.error("Database error: %s", str(e))
+        raise e
+
+    opponents = sorted(above + below, key=lambda m: (abs(m.battle_score - score), m.battle_score, m.id))
+    logger.info("Found %d opponents close to meal %s (score %.3f)", min(len(opponents), limit), meal_id, score)
+    return opponents[:limit]
+
+
+@retry_on_busy
+def record_battle_result(winner_id: int, loser_id: int) -> None:
+    """
+    Records the outcome of a battle for both meals in a single atomic statement.
+
+    Args:
+        winner_id (int): The ID of the winning meal.
+        loser_id (int): The ID of the losing meal.
+
+    Raises:
+        ValueError: If either meal is deleted or not found. With write-behind stats
+            the check is skipped and such results are dropped when flushed.
+    """
+    if STATS_WRITE_BEHIND:
+        if winner_id == loser_id:
+            stats_buffer.add(winner_id, 2, 1)
+        else:
+            stats_buffer.add_many({winner_id: [1, 1], loser_id: [1, 0]})
+        return
+
+    if winner_id == loser_id:
+        # The same meal prepped twice: one win and two battles, as two separate
+        # update_meal_stats calls would record
+        _apply_stat_deltas({winner_id: [2, 1]})
+        return
+
+    try:
+        with get_db_connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute("""
+                UPDATE meals SET battles = battles + 1, wins = wins + (id = ?)
+                WHERE id IN (?, ?) AND deleted = FALSE
+            """, (winner_id, winner_id, loser_id))
+
+            if cursor.rowcount != 2:
+                conn.rollback()
+                cursor.execute("SELECT id, deleted FROM meals WHERE id IN (?, ?)", (winner_id, loser_id))
+                found = dict(cursor.fetchall())
+                for meal_id in (winner_id, loser_id):
+                    if meal_id not in found:
+                        logger.info("Meal with ID %s not found", meal_id)
+                        raise ValueError(f"Meal with ID {meal_id} not found")
+                    if found[meal_id]:
+                        logger.info("Meal with ID %s has been deleted", meal_id)
+                        raise ValueError(f"Meal with ID {meal_id} has been deleted")
+                raise ValueError(f"Battle result for meals {winner_id} and {loser_id} could not be recorded")
+
+            _bump_versions(conn, 'meal_stats')
+            conn.commit()
+            logger.debug("Battle result recorded: winner ID %d, loser ID %d", winner_id, loser_id)
+
+    except sqlite3.Error as e:
+        logger.error("Database error: %s", str(e))
+        raise e
+
+
+def record_battle_results(results: Iterable[Tuple[int, int]]) -> None:
+    """
+    Records the outcomes of many battles in a single transaction.
+
+    The results are folded into one battles/wins increment per meal and applied
+    with executemany, so a whole tournament costs one commit. If any meal is
+    deleted or missing, nothing is recorded.
+
+    Args:
+        results (Iterable[Tuple[int, int]]): (winner_id, loser_id) pairs.
+
+    Raises:
+        ValueError: If any meal is deleted or not found.
+    """
+    deltas: Dict[int, List[int]] = {}
+    for winner_id, loser_id in results:
+        deltas.setdefault(winner_id, [0, 0])
+        deltas.setdefault(loser_id, [0, 0])
+        deltas[winner_id][0] += 1
+        deltas[winner_id][1] += 1
+        deltas[loser_id][0] += 1
+    if not deltas:
+        return
+    if STATS_WRITE_BEHIND:
+        stats_buffer.add_many(deltas)
+    else:
+        _apply_stat_deltas(deltas)
+    logger.info("Battle results recorded for %d meals", len(deltas))
+
+
+@retry_on_busy
+def _apply_stat_deltas(deltas: Mapping[int, List[int]], journal_ids: Sequence[str] = ()) -> None:
+    """
+    Adds per-meal [battles, wins] increments in one transaction, or nothing at all
+    if any meal is deleted or missing.
+
+    Args:
+        deltas (Mapping[int, List[int]]): The increments per meal ID.
+        journal_ids (Sequence[str]): Write-behind journals the increments came from. They
+            are recorded in the same transaction; if they already are, nothing is written.
+
+    Raises:
+        ValueError: If any meal is deleted or not found.
+    """
+    try:
+        with get_db_connection() as conn:
+            cursor = conn.cursor()
+            if journal_ids:
+                now = time.time()
+                cursor.executemany("INSERT OR IGNORE INTO applied_journals (journal_id, applied_at) VALUES (?, ?)",
+                                   [(journal_id, now) for journal_id in journal_ids])
+                if cursor.rowcount != len(journal_ids):
+                    conn.rollback()
+                    logger.warning("Stats journals already applied, skipping them: %s", list(journal_ids))
+                    return
+                cursor.execute("DELETE FROM applied_journals WHERE applied_at < ?", (now - STATS_JOURNAL_RETENTION,))
+
+            cursor.executemany("""
+                UPDATE meals SET battles = battles + ?, wins = wins + ?
+                WHERE id = ? AND deleted = FALSE
+            """, [(battles, wins, meal_id) for meal_id, (battles, wins) in deltas.items()])
+
+            if cursor.rowcount != len(deltas):
+                conn.rollback()
+                meal_ids = list(deltas)
+                found: Dict[int, Any] = {}
+                for start in range(0, len(meal_ids), 500):
+                    chunk = meal_ids[start:start + 500]
+                    cursor.execute(f"SELECT id, deleted FROM meals WHERE id IN ({', '.join('?' * len(chunk))})", chunk)
+                    found.update(cursor.fetchall())
+                for meal_id in meal_ids:
+                    if meal_id not in found:
+                        logger.info("Meal with ID %s not found", meal_id)
+                        raise ValueError(f"Meal with ID {meal_id} not found")
+                    if found[meal_id]:
+                        logger.info("Meal with ID %s has been deleted", meal_id)
+                        raise ValueError(f"Meal with ID {meal_id} has been deleted")
+                raise ValueError("Battle results could not be recorded")
+
+            _bump_versions(conn, 'meal_stats')
+            conn.commit()
+
+    except sqlite3.Error as e:
+        logger.error("Database error: %s", str(e))
+        raise e
+
+
+def _flush_stat_deltas(deltas: Mapping[int, List[int]], journal_ids: Sequence[str] = ()) -> None:
+    """
+    Writes a batch of buffered increments, recording the journals it came from.
+    Increments for meals deleted (or never created) since their battles are dropped
+    with a warning, so one bad meal does not hold back the rest.
+    """
+    try:
+        _apply_stat_deltas(deltas, journal_ids)
+    except ValueError:
+        meal_ids = list(deltas)
+        active = set()
+        with get_db_connection() as conn:
+            cursor = conn.cursor()
+            for start in range(0, len(meal_ids), 500):
+                chunk = meal_ids[start:start + 500]
+                cursor.execute(f"SELECT id FROM meals WHERE id IN ({', '.join('?' * len(chunk))}) AND deleted = FALSE",
+                               chunk)
+                active.update(row[0] for row in cursor.fetchall())
+        dropped = [meal_id for meal_id in meal_ids if meal_id not in active]
+        logger.warning("Dropping buffered stats for deleted or missing meals: %s", dropped)
+        if active:
+            _apply_stat_deltas({meal_id: delta for meal_id, delta in deltas.items() if meal_id in active}, journal_ids)
+
+
+stats_buffer = StatsBuffer(_flush_stat_deltas,
+                           max_pending=int(os.getenv("STATS_FLUSH_MAX_PENDING", "1000")),
+                           flush_interval=float(os.getenv("STATS_FLUSH_INTERVAL", "1.0")),
+                           journal_dir=os.getenv("STATS_JOURNAL_DIR", "/app/sql/journal"))
+atexit.register(stats_buffer.close)
+
+metrics.registry.callback(
+    "meal_max_stats_pending_meals", "Meals with battle stats buffered but not yet written.", "gauge", (),
+    lambda: {(): len(stats_buffer.pending())})
+
+
+@retry_on_busy
 def update_meal_stats(meal_id: int, result: str) -> None:
     """
     Updates the meal statistics in the database after a battle.
@@ -232,7 +1146,14 @@ def update_meal_stats(meal_id: int, result: str) -> None:
 
     Raises:
         ValueError: If the meal is deleted or not found, or if the result is invalid.
+            With write-behind stats only the result is checked.
     """
+    if STATS_WRITE_BEHIND:
+        if result not in ['win', 'loss']:
+            raise ValueError(f"Invalid result: {result}. Expected 'win' or 'loss'.")
+        stats_buffer.add(meal_id, 1, int(result == 'win'))
+        return
+
     try:
         with get_db_connection() as conn:
             cursor = conn.cursor()
@@ -253,6 +1174,7 @@ def update_meal_stats(meal_id: int, result: str) -> None:
             else:
                 raise ValueError(f"Invalid result: {result}. Expected 'win' or 'loss'.")
 
+            _bump_versions(conn, 'meal_stats')
             conn.commit()
             logger.info("Meal stats updated successfully for meal ID: %d", meal_id)
 
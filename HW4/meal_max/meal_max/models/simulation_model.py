@@ -0,0 +1,160 @@
+import logging
+import os
+from typing import Any, Dict, List, Optional
+
+import numpy as np
+
+from meal_max.models.kitchen_model import Meal, compute_battle_score, get_active_meals
+from meal_max.utils.logger import configure_logger
+
+
+logger = logging.getLogger(__name__)
+configure_logger(logger)
+
+
+# Beyond this many meals a full pairwise matrix is too large to return.
+MAX_MATRIX_MEALS = 500
+# battles per simulation; each one costs about 50 bytes of working arrays
+MAX_SIMULATED_BATTLES = int(os.getenv("MAX_SIMULATED_BATTLES", "1000000"))
+
+
+class SimulationModel:
+    """
+    A class to estimate battle outcomes in bulk with NumPy, without the database or random.org.
+
+    A battle is won by the first-listed meal when abs(score_1 - score_2) / 100 beats a
+    random draw in {0.00, 0.01, ..., 0.99}, so every matchup has a closed-form win
+    probability. Note that it depends only on the score gap, not on which meal scores
+    higher: a meal wins the same bout with probability 1 - p when listed second.
+
+    Attributes:
+        ids (np.ndarray): The meal IDs.
+        names (List[str]): The meal names, aligned with ids.
+        scores (np.ndarray): The battle scores, aligned with ids.
+    """
+
+    def __init__(self, meals: List[Meal]):
+        """
+        Initializes the SimulationModel by scoring all meals at once
+        """
+        if not meals:
+            raise ValueError("At least one meal is needed for a simulation.")
+        self.ids = np.fromiter((meal.id for meal in meals), dtype=np.int64, count=len(meals))
+        self.names = [meal.meal for meal in meals]
+        # The stored score, as BattleModel.get_battle_score uses it
+        self.scores = np.fromiter(
+            (meal.battle_score if meal.battle_score is not None
+             else compute_battle_score(meal.price, meal.cuisine, meal.difficulty) for meal in meals),
+            dtype=np.float64, count=len(meals))
+        self._index = {meal_id: i for i, meal_id in enumerate(self.ids.tolist())}
+
+    @classmethod
+    def from_database(cls) -> "SimulationModel":
+        """
+        Builds a SimulationModel from every active meal in the database.
+        """
+        meals = get_active_meals()
+        logger.info("Loaded %d meals for simulation", len(meals))
+        return cls(meals)
+
+    def indices(self, meal_ids: Optional[List[int]] = None) -> np.ndarray:
+        """
+        Maps meal IDs to positions in the score arrays; all meals when meal_ids is None.
+
+        Raises:
+            ValueError: If a meal ID is not among the loaded meals or is given twice.
+        """
+        if meal_ids is None:
+            return np.arange(len(self.ids))
+        if len(set(meal_ids)) != len(meal_ids):
+            raise ValueError("Each meal can only appear once in a simulation.")
+        missing = [meal_id for meal_id in meal_ids if meal_id not in self._index]
+        if missing:
+            raise ValueError(f"Meal with ID {missing[0]} not found")
+        return np.array([self._index[meal_id] for meal_id in meal_ids], dtype=np.int64)
+
+    @staticmethod
+    def win_probability(delta: np.ndarray) -> np.ndarray:
+        """
+        Returns the probability that the first-listed meal wins for normalized score deltas.
+        """
+        # Count the draws k / 100 strictly below delta; rounding guards against float noise.
+        return np.clip(np.ceil(np.round(delta * 100, 9)), 0, 100) / 100
+
+    def win_probability_matrix(self, meal_ids: Optional[List[int]] = None) -> np.ndarray:
+        """
+        Computes P[i, j], the probability that meal i beats meal j when listed first.
+
+        Args:
+            meal_ids (Optional[List[int]]): The meals to include. Defaults to all loaded meals.
+
+        Returns:
+            np.ndarray: An n x n matrix of win probabilities with zeros on the diagonal.
+
+        Raises:
+            ValueError: If a meal is not loaded or given twice, or more than MAX_MATRIX_MEALS
+                meals are requested.
+        """
+        idx = self.indices(meal_ids)
+        if len(idx) > MAX_MATRIX_MEALS:
+            raise ValueError(f"Too many meals for a win probability matrix: {len(idx)} (max {MAX_MATRIX_MEALS}).")
+        scores = self.scores[idx]
+        matrix = self.win_probability(np.abs(scores[:, None] - scores[None, :]) / 100)
+        np.fill_diagonal(matrix, 0.0)
+        return matrix
+
+    def simulate(self, num_battles: int, meal_ids: Optional[List[int]] = None,
+                 seed: Optional[int] = None) -> Dict[str, np.ndarray]:
+        """
+        Simulates battles between uniformly chosen pairs of distinct meals.
+
+        Args:
+            num_battles (int): How many battles to simulate.
+            meal_ids (Optional[List[int]]): The meals to draw from. Defaults to all loaded meals.
+            seed (Optional[int]): Seed for a replayable run.
+
+        Returns:
+            Dict[str, np.ndarray]: Per-meal ids, battles and wins, aligned with each other.
+
+        Raises:
+            ValueError: If num_battles is negative or above MAX_SIMULATED_BATTLES, fewer
+                than two meals are given, or a meal is not loaded or given twice.
+        """
+        if num_battles < 0 or num_battles > MAX_SIMULATED_BATTLES:
+            raise ValueError(f"Invalid number of battles: {num_battles}. "
+                             f"Must be between 0 and {MAX_SIMULATED_BATTLES}.")
+        idx = self.indices(meal_ids)
+        if len(idx) < 2:
+            raise ValueError("At least two meals are needed to simulate battles.")
+
+        rng = np.random.default_rng(seed)
+        first = rng.integers(0, len(idx), size=num_battles)
+        # Offsetting by 1..n-1 picks a uniformly random second meal distinct from the first.
+        second = (first + rng.integers(1, len(idx), size=num_battles)) % len(idx)
+        delta = np.abs(self.scores[idx[first]] - self.scores[idx[second]]) / 100
+        draws = rng.integers(0, 100, size=num_battles) / 100
+        winners = np.where(delta > draws, first, second)
+
+        battles = np.bincount(first, minlength=len(idx)) + np.bincount(second, minlength=len(idx))
+        wins = np.bincount(winners, minlength=len(idx))
+        return {'ids': self.ids[idx], 'battles': battles, 'wins': wins}
+
+    def summarize(self, num_battles: int, meal_ids: Optional[List[int]] = None,
+                  seed: Optional[int] = None) -> List[Dict[str, Any]]:
+        """
+        Simulates battles and returns per-meal results ranked by simulated win rate.
+        """
+        result = self.simulate(num_battles, meal_ids, seed)
+        rows = []
+        for meal_id, battles, wins in zip(result['ids'].tolist(), result['battles'].tolist(), result['wins'].tolist()):
+            i = self._index[meal_id]
+            rows.append({
+                'id': meal_id,
+                'meal': self.names[i],
+                'score': float(self.scores[i]),
+                'battles': battles,
+                'wins': wins,
+                'win_rate': wins / battles if battles else 0.0,
+            })
+        rows.sort(key=lambda row: (-row['win_rate'], row['id']))
+        return rows
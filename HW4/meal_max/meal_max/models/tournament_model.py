@@ -0,0 +1,175 @@
+from dataclasses import dataclass, field
+import logging
+import math
+import os
+from typing import Any, Dict, List, Optional, Set, Tuple
+
+from meal_max.models.battle_model import BattleModel
+from meal_max.models.kitchen_model import Meal, get_meals_by_ids, record_battle_results
+from meal_max.utils.logger import configure_logger
+from meal_max.utils.random_utils import get_random_provider
+
+
+logger = logging.getLogger(__name__)
+configure_logger(logger)
+
+
+TOURNAMENT_FORMATS = ['single_elimination', 'round_robin', 'swiss']
+
+# random.org serves at most 10,000 numbers per request
+RANDOM_BATCH_SIZE = 10000
+# round robin plays n * (n - 1) / 2 bouts; 200 meals is 19,900 bouts in one request
+MAX_ROUND_ROBIN_MEALS = int(os.getenv("MAX_ROUND_ROBIN_MEALS", "200"))
+
+
+@dataclass
+class _Bracket:
+    """
+    The state of one tournament run: battle scores, bout results and each meal's record.
+    """
+    scores: Dict[int, float]
+    record: Dict[int, List[int]]
+    results: List[Tuple[int, int]] = field(default_factory=list)
+
+
+class TournamentModel:
+    """
+    A class to run whole brackets of battles in memory and commit their stats at once.
+
+    Every bout follows the same rules as BattleModel.battle: the first-listed meal
+    wins if the normalized score delta beats the random draw. Random numbers are
+    drawn in bulk per round, and all results are written in one transaction when
+    the tournament ends.
+
+    Attributes:
+        battle_model (BattleModel): Supplies the battle score and rules.
+    """
+
+    def __init__(self, battle_model: Optional[BattleModel] = None):
+        """
+        Initializes the TournamentModel with the BattleModel whose rules it applies
+        """
+        self.battle_model = battle_model or BattleModel()
+
+    def run_tournament(self, meal_ids: List[int], format: str = "single_elimination",
+                       rounds: Optional[int] = None) -> Dict[str, Any]:
+        """
+        Runs a tournament between the given meals and records every bout's result.
+
+        Args:
+            meal_ids (List[int]): The IDs of the competing meals. For single elimination
+                the list order is the seeding: neighbours meet in the first round.
+            format (str): single_elimination, round_robin or swiss.
+            rounds (Optional[int]): The number of Swiss rounds. Defaults to ceil(log2(n)).
+
+        Returns:
+            Dict[str, Any]: The format, the number of bouts, the champion (the last meal
+            standing in single elimination, otherwise the top of the standings) and the
+            standings with each meal's wins and losses.
+
+        Raises:
+            ValueError: If the format or rounds is invalid, fewer than two distinct meals
+                are given, a round robin has more than MAX_ROUND_ROBIN_MEALS meals, or a
+                meal is deleted or not found.
+        """
+        if format not in TOURNAMENT_FORMATS:
+            raise ValueError(f"Invalid tournament format: {format}. Expected one of {TOURNAMENT_FORMATS}.")
+        if len(meal_ids) < 2:
+            raise ValueError("A tournament needs at least two meals.")
+        if len(set(meal_ids)) != len(meal_ids):
+            raise ValueError("Each meal can only enter a tournament once.")
+        if format == "round_robin" and len(meal_ids) > MAX_ROUND_ROBIN_MEALS:
+            raise ValueError(f"A round robin takes at most {MAX_ROUND_ROBIN_MEALS} meals, got {len(meal_ids)}.")
+        if rounds is not None and (format != "swiss" or rounds < 1):
+            raise ValueError(f"Invalid rounds: {rounds}. Only Swiss tournaments take a positive number of rounds.")
+
+        lookup = get_meals_by_ids(meal_ids)
+        if lookup['not_found']:
+            raise ValueError(f"Meal with ID {lookup['not_found'][0]} not found")
+        if lookup['deleted']:
+            raise ValueError(f"Meal with ID {lookup['deleted'][0]} has been deleted")
+        meals = lookup['meals']
+        logger.info("Starting %s tournament with %d meals", format, len(meals))
+
+        # Kept per run rather than on self, so one model can run tournaments concurrently
+        bracket = _Bracket(scores={meal.id: self.battle_model.get_battle_score(meal) for meal in meals},
+                           record={meal.id: [0, 0] for meal in meals})
+
+        if format == "single_elimination":
+            champion = self._single_elimination(bracket, meals)
+        elif format == "round_robin":
+            self._round_robin(bracket, meals)
+            champion = None
+        else:
+            self._swiss(bracket, meals, rounds or max(1, math.ceil(math.log2(len(meals)))))
+            champion = None
+
+        record_battle_results(bracket.results)
+
+        by_id = {meal.id: meal for meal in meals}
+        standings = [
+            {'id': meal_id, 'meal': by_id[meal_id].meal, 'wins': wins, 'losses': losses}
+            for meal_id, (wins, losses) in sorted(
+                bracket.record.items(), key=lambda item: (-item[1][0], item[1][1], item[0]))
+        ]
+        if champion is None:
+            champion = by_id[standings[0]['id']]
+
+        logger.info("Tournament finished after %d bouts, champion: %s", len(bracket.results), champion.meal)
+        return {
+            'format': format,
+            'bouts': len(bracket.results),
+            'champion': champion.meal,
+            'standings': standings,
+        }
+
+    def _play_round(self, bracket: _Bracket, pairs: List[Tuple[Meal, Meal]]) -> List[Meal]:
+        """
+        Plays a round of bouts with one bulk random draw and returns the winners.
+        """
+        provider = get_random_provider()
+        winners = []
+        for start in range(0, len(pairs), RANDOM_BATCH_SIZE):
+            chunk = pairs[start:start + RANDOM_BATCH_SIZE]
+            for (meal_1, meal_2), random_number in zip(chunk, provider.fetch(len(chunk))):
+                delta = abs(bracket.scores[meal_1.id] - bracket.scores[meal_2.id]) / 100
+                winner, loser = (meal_1, meal_2) if delta > random_number else (meal_2, meal_1)
+                bracket.results.append((winner.id, loser.id))
+                bracket.record[winner.id][0] += 1
+                bracket.record[loser.id][1] += 1
+                winners.append(winner)
+        return winners
+
+    def _single_elimination(self, bracket: _Bracket, meals: List[Meal]) -> Meal:
+        remaining = meals
+        while len(remaining) > 1:
+            pairs = [(remaining[i], remaining[i + 1]) for i in range(0, len(remaining) - 1, 2)]
+            bye = [remaining[-1]] if len(remaining) % 2 else []
+            remaining = self._play_round(bracket, pairs) + bye
+        return remaining[0]
+
+    def _round_robin(self, bracket: _Bracket, meals: List[Meal]) -> None:
+        pairs = [(meals[i], meals[j]) for i in range(len(meals)) for j in range(i + 1, len(meals))]
+        self._play_round(bracket, pairs)
+
+    def _swiss(self, bracket: _Bracket, meals: List[Meal], rounds: int) -> None:
+        played: Set[Tuple[int, int]] = set()
+        had_bye: Set[int] = set()
+        for _ in range(rounds):
+            ranked = sorted(meals, key=lambda meal: (-bracket.record[meal.id][0], meal.id))
+            if len(ranked) % 2:
+                # The lowest-ranked meal without a bye sits this round out.
+                bye = next((meal for meal in reversed(ranked) if meal.id not in had_bye), ranked[-1])
+                had_bye.add(bye.id)
+                ranked.remove(bye)
+
+            pairs = []
+            while ranked:
+                meal_1 = ranked.pop(0)
+                # Prefer the closest-ranked opponent not already faced.
+                index = next((i for i, meal_2 in enumerate(ranked)
+                              if (min(meal_1.id, meal_2.id), max(meal_1.id, meal_2.id)) not in played), 0)
+                meal_2 = ranked.pop(index)
+                played.add((min(meal_1.id, meal_2.id), max(meal_1.id, meal_2.id)))
+                pairs.append((meal_1, meal_2))
+            self._play_round(bracket, pairs)
@@ -0,0 +1,73 @@
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+import functools
+import logging
+import os
+from typing import Any, Callable, Optional
+
+from meal_max.utils.logger import configure_logger
+
+
+logger = logging.getLogger(__name__)
+configure_logger(logger)
+
+
+# threads for blocking database work from async handlers, and how many calls may
+# be queued or running before further callers wait on the event loop
+ASYNC_DB_WORKERS = int(os.getenv("ASYNC_DB_WORKERS", os.getenv("DB_POOL_SIZE", "8")))
+ASYNC_DB_MAX_PENDING = int(os.getenv("ASYNC_DB_MAX_PENDING", "256"))
+
+
+class BoundedExecutor:
+    """
+    Runs blocking calls in a fixed thread pool on behalf of coroutines.
+
+    ThreadPoolExecutor queues without limit. Here at most max_pending calls are
+    queued or running at once; further callers wait on the event loop, so a burst
+    of requests cannot build an unbounded backlog of database work.
+
+    Attributes:
+        max_workers (int): Threads running calls.
+        max_pending (int): Calls allowed to be queued or running at once.
+    """
+
+    def __init__(self, max_workers: int = ASYNC_DB_WORKERS, max_pending: int = ASYNC_DB_MAX_PENDING):
+        if max_workers < 1:
+            raise ValueError(f"Invalid worker count: {max_workers}. Must be at least 1.")
+        if max_pending < max_workers:
+            raise ValueError(f"Invalid max pending: {max_pending}. Must be at least max_workers ({max_workers}).")
+        self.max_workers = max_workers
+        self.max_pending = max_pending
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="async-db")
+        # Created on first use so it binds to the running loop (Python 3.9 binds at construction)
+        self._slots: Optional[asyncio.Semaphore] = None
+        self._pending = 0
+
+    @property
+    def pending(self) -> int:
+        """Calls currently queued or running."""
+        return self._pending
+
+    async def run(self, fn: Callable[..., Any], *args: Any, **kwargs: Any) -> Any:
+        """
+        Calls fn(*args, **kwargs) in the thread pool and returns its result.
+
+        Raises:
+            Exception: Whatever fn raises.
+        """
+        if self._slots is None:
+            self._slots = asyncio.Semaphore(self.max_pending)
+        async with self._slots:
+            self._pending += 1
+            try:
+                loop = asyncio.get_running_loop()
+                return await loop.run_in_executor(self._executor, functools.partial(fn, *args, **kwargs))
+            finally:
+                self._pending -= 1
+
+    def shutdown(self, wait: bool = True) -> None:
+        """
+        Stops the thread pool, waiting for running calls to finish when wait is True.
+        """
+        self._executor.shutdown(wait=wait)
+        logger.info("Async executor shut down.")
@@ -0,0 +1,130 @@
+from collections import OrderedDict
+import logging
+import threading
+import time
+from typing import Any, Dict, Hashable, Iterable, Optional, Tuple
+
+from meal_max.utils.logger import configure_logger
+
+logger = logging.getLogger(__name__)
+configure_logger(logger)
+
+
+class LRUCache:
+    """
+    A thread-safe, bounded least-recently-used cache with per-entry expiry.
+
+    Each entry has a primary key and may have alias keys that resolve to it, so one
+    value can be looked up several ways. Evicting or invalidating an entry through
+    any of its keys drops all of them together.
+
+    Attributes:
+        max_size (int): The maximum number of entries; 0 disables the cache.
+        ttl (float): Seconds an entry stays valid after it is stored; 0 means forever.
+    """
+
+    def __init__(self, max_size: int = 1024, ttl: float = 60.0):
+        if max_size < 0:
+            raise ValueError(f"Invalid cache size: {max_size}. Must not be negative.")
+        if ttl < 0:
+            raise ValueError(f"Invalid cache TTL: {ttl}. Must not be negative.")
+        self.max_size = max_size
+        self.ttl = ttl
+
+        # primary key -> (value, expires_at, aliases)
+        self._entries: "OrderedDict[Hashable, Tuple[Any, float, Tuple[Hashable, ...]]]" = OrderedDict()
+        self._aliases: Dict[Hashable, Hashable] = {}
+        self._lock = threading.Lock()
+
+        self._hits = 0
+        self._misses = 0
+        self._evictions = 0
+        self._expirations = 0
+        self._invalidations = 0
+
+    def _drop(self, key: Hashable) -> None:
+        _, _, aliases = self._entries.pop(key)
+        for alias in aliases:
+            self._aliases.pop(alias, None)
+
+    def get(self, key: Hashable) -> Optional[Any]:
+        """
+        Returns the value stored under a primary or alias key, or None on a miss.
+        """
+        with self._lock:
+            primary = self._aliases.get(key, key)
+            entry = self._entries.get(primary)
+            if entry is None:
+                self._misses += 1
+                return None
+            value, expires_at, _ = entry
+            if self.ttl and time.monotonic() >= expires_at:
+                self._drop(primary)
+                self._expirations += 1
+                self._misses += 1
+                return None
+            self._entries.move_to_end(primary)
+            self._hits += 1
+            return value
+
+    def set(self, key: Hashable, value: Any, aliases: Iterable[Hashable] = ()) -> None:
+        """
+        Stores a value under a primary key and any alias keys, evicting the least
+        recently used entries if the cache is full.
+        """
+        if self.max_size == 0:
+            return
+        aliases = tuple(aliases)
+        with self._lock:
+            if key in self._entries:
+                self._drop(key)
+            for alias in aliases:
+                previous = self._aliases.get(alias)
+                if previous is not None and previous in self._entries:
+                    self._drop(previous)
+            self._entries[key] = (value, time.monotonic() + self.ttl, aliases)
+            for alias in aliases:
+                self._aliases[alias] = key
+            while len(self._entries) > self.max_size:
+                oldest = next(iter(self._entries))
+                self._drop(oldest)
+                self._evictions += 1
+
+    def invalidate(self, key: Hashable) -> None:
+        """
+        Drops the entry reachable through a primary or alias key, if there is one.
+        """
+        with self._lock:
+            primary = self._aliases.get(key, key)
+            if primary in self._entries:
+                self._drop(primary)
+                self._invalidations += 1
+
+    def clear(self) -> None:
+        """
+        Drops every entry. Counters are kept.
+        """
+        with self._lock:
+            self._entries.clear()
+            self._aliases.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        """
+        Returns a snapshot of the cache counters.
+
+        Returns:
+            Dict[str, Any]: Size, capacity, hits, misses, evictions, expirations and invalidations.
+        """
+        with self._lock:
+            lookups = self._hits + self._misses
+            return {
+                'size': len(self._entries),
+                'max_size': self.max_size,
+                'ttl': self.ttl,
+                'hits': self._hits,
+                'misses': self._misses,
+                'hit_rate': self._hits / lookups if lookups else 0.0,
+                'evictions': self._evictions,
+                'expirations': self._expirations,
+                'invalidations': self._invalidations,
+            }
@@ -0,0 +1,84 @@
+import gzip
+import logging
+import os
+from typing import List, Optional
+
+from flask import Response
+from werkzeug.datastructures import Accept
+
+from meal_max.utils.logger import configure_logger
+
+try:
+    import brotli
+except ImportError:  # optional: without it only gzip is offered
+    brotli = None
+
+logger = logging.getLogger(__name__)
+configure_logger(logger)
+
+
+# compress large responses for clients that accept gzip or br
+COMPRESS_RESPONSES = os.getenv("COMPRESS_RESPONSES", "true").lower() == "true"
+# bodies smaller than this many bytes are sent as they are
+COMPRESS_MIN_SIZE = int(os.getenv("COMPRESS_MIN_SIZE", "1024"))
+# gzip level (1-9) and brotli quality (0-11); both favor speed over size, since
+# JSON shrinks about 7x at gzip level 1 and each level up costs more CPU than it saves bytes
+COMPRESS_GZIP_LEVEL = int(os.getenv("COMPRESS_GZIP_LEVEL", "1"))
+COMPRESS_BROTLI_QUALITY = int(os.getenv("COMPRESS_BROTLI_QUALITY", "4"))
+
+COMPRESSIBLE_MIMETYPES = frozenset(("application/json", "application/x-ndjson", "text/csv", "text/plain"))
+
+
+def available_encodings() -> List[str]:
+    """
+    Returns the content codings this process can produce, most preferred first.
+    """
+    return ["br", "gzip"] if brotli is not None else ["gzip"]
+
+
+def compress(data: bytes, encoding: str) -> bytes:
+    """
+    Compresses data with a content coding from available_encodings().
+
+    Raises:
+        ValueError: If the encoding is not available.
+    """
+    if encoding == "gzip":
+        # A fixed mtime keeps the output identical for identical bodies
+        return gzip.compress(data, compresslevel=COMPRESS_GZIP_LEVEL, mtime=0)
+    if encoding == "br" and brotli is not None:
+        return brotli.compress(data, quality=COMPRESS_BROTLI_QUALITY)
+    raise ValueError(f"Unsupported content encoding: {encoding}. Expected one of {', '.join(available_encodings())}.")
+
+
+def compress_response(response: Response, accept_encodings: Accept,
+                      min_size: Optional[int] = None) -> Response:
+    """
+    Compresses a response body in place when it is worth it: a successful,
+    buffered (not streamed) response with a text mimetype and at least min_size
+    bytes, for a client whose Accept-Encoding allows br or gzip.
+
+    Args:
+        response (Response): The response to compress.
+        accept_encodings (Accept): The request's parsed Accept-Encoding header.
+        min_size (Optional[int]): Smallest body to compress; defaults to COMPRESS_MIN_SIZE.
+
+    Returns:
+        Response: The same response, with Content-Encoding and Vary set if compressed.
+    """
+    if (response.status_code != 200 or response.direct_passthrough or response.is_streamed
+            or 'Content-Encoding' in response.headers or response.mimetype not in COMPRESSIBLE_MIMETYPES):
+        return response
+    data = response.get_data()
+    if len(data) < (COMPRESS_MIN_SIZE if min_size is None else min_size):
+        return response
+
+    # Caches must keep compressed and plain copies apart, whichever this client gets
+    response.vary.add('Accept-Encoding')
+    encoding = accept_encodings.best_match(available_encodings())
+    if encoding is None:
+        return response
+    response.set_data(compress(data, encoding))
+    response.headers['Content-Encoding'] = encoding
+    logger.debug("Compressed %d bytes to %d with %s", len(data), response.content_length, encoding)
+    return response
@@ -0,0 +1,121 @@
+import csv
+import io
+import json
+import logging
+from typing import Any, Dict, Iterable, Iterator, List, Mapping, Sequence
+
+from meal_max.utils.logger import configure_logger
+
+logger = logging.getLogger(__name__)
+configure_logger(logger)
+
+
+def iter_ndjson(lines: Iterable[str]) -> Iterator[Any]:
+    """
+    Parses newline-delimited JSON one line at a time.
+
+    Args:
+        lines (Iterable[str]): The lines of the body. Blank lines are skipped.
+
+    Yields:
+        Any: The decoded value of each non-blank line.
+
+    Raises:
+        ValueError: If a line is not valid JSON.
+    """
+    for line_number, line in enumerate(lines, start=1):
+        line = line.strip()
+        if not line:
+            continue
+        try:
+            yield json.loads(line)
+        except json.JSONDecodeError as e:
+            logger.error("Invalid JSON on line %d: %s", line_number, e)
+            raise ValueError(f"Invalid JSON on line {line_number}: {e.msg}")
+
+
+def iter_csv(lines: Iterable[str]) -> Iterator[Dict[str, Any]]:
+    """
+    Parses CSV with a header row one record at a time.
+
+    Args:
+        lines (Iterable[str]): The lines of the body. The first line names the columns.
+
+    Yields:
+        Dict[str, Any]: Each record keyed by column name, with surrounding whitespace stripped.
+
+    Raises:
+        ValueError: If a record has more fields than the header.
+    """
+    reader = csv.DictReader(lines, skipinitialspace=True)
+    for record in reader:
+        if None in record:
+            logger.error("Too many fields on line %d", reader.line_num)
+            raise ValueError(f"Too many fields on line {reader.line_num}")
+        yield {key.strip(): value.strip() if isinstance(value, str) else value
+               for key, value in record.items()}
+
+
+def encode_ndjson(records: Iterable[Mapping[str, Any]]) -> Iterator[str]:
+    """
+    Serializes records as newline-delimited JSON, one line per record.
+
+    Args:
+        records (Iterable[Mapping[str, Any]]): The records, consumed lazily.
+
+    Yields:
+        str: Each record as a compact JSON object followed by a newline.
+    """
+    for record in records:
+        yield json.dumps(record, separators=(',', ':')) + "\n"
+
+
+def encode_csv(records: Iterable[Mapping[str, Any]], fieldnames: Sequence[str]) -> Iterator[str]:
+    """
+    Serializes records as CSV with a header row.
+
+    Args:
+        records (Iterable[Mapping[str, Any]]): The records, consumed lazily.
+        fieldnames (Sequence[str]): The columns, in order. Other keys are ignored.
+
+    Yields:
+        str: The header line, then one line per record.
+    """
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+
+    def line(values: Iterable[Any]) -> str:
+        writer.writerow(values)
+        text = buffer.getvalue()
+        buffer.seek(0)
+        buffer.truncate()
+        return text
+
+    yield line(fieldnames)
+    for record in records:
+        yield line([record.get(name) for name in fieldnames])
+
+
+def join_chunks(chunks: Iterable[str], size: int = 64 * 1024) -> Iterator[str]:
+    """
+    Groups small strings into pieces of about size characters, so a streamed
+    response is written in a few large writes rather than one per line.
+
+    Args:
+        chunks (Iterable[str]): The strings to group, consumed lazily.
+        size (int): The length at which a piece is emitted.
+
+    Yields:
+        str: The concatenated pieces; the last one may be shorter.
+    """
+    pending: List[str] = []
+    length = 0
+    for chunk in chunks:
+        pending.append(chunk)
+        length += len(chunk)
+        if length >= size:
+            yield "".join(pending)
+            pending = []
+            length = 0
+    if pending:
+        yield "".join(pending)
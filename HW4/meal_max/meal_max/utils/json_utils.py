@@ -0,0 +1,127 @@
+from dataclasses import fields, is_dataclass
+import functools
+import logging
+import os
+from typing import Any, Tuple
+
+from flask import Flask, Response
+from flask.json.provider import DefaultJSONProvider, JSONProvider, _default
+
+from meal_max.utils.logger import configure_logger
+
+try:
+    import orjson
+except ImportError:  # optional: the stdlib provider is used instead
+    orjson = None
+
+logger = logging.getLogger(__name__)
+configure_logger(logger)
+
+
+# which JSON provider the app uses: auto (orjson when installed), orjson or stdlib
+JSON_PROVIDER = os.getenv("JSON_PROVIDER", "auto")
+
+
+@functools.lru_cache(maxsize=None)
+def _field_names(cls: type) -> Tuple[str, ...]:
+    return tuple(f.name for f in fields(cls) if f.metadata.get('serialize', True))
+
+
+def serialize_default(o: Any) -> Any:
+    """
+    Converts what json cannot serialize on its own, as Flask's default does, but
+    reads dataclasses (Meal) field by field instead of deep-copying them with
+    dataclasses.asdict; nested values are converted when the encoder reaches them.
+    Fields declared with metadata={'serialize': False} are left out.
+    """
+    if is_dataclass(o) and not isinstance(o, type):
+        return {name: getattr(o, name) for name in _field_names(type(o))}
+    return _default(o)
+
+
+class StdlibJSONProvider(DefaultJSONProvider):
+    """
+    Flask's default provider with the faster dataclass conversion. Output is the
+    same as Flask's, less the dataclass fields serialize_default leaves out.
+    """
+    default = staticmethod(serialize_default)
+
+
+class OrjsonJSONProvider(JSONProvider):
+    """
+    JSON provider backed by orjson, which serializes dataclasses, dicts and lists
+    in C and returns bytes, so responses skip the str round trip.
+
+    Output is the same document as StdlibJSONProvider's with two differences:
+    non-ASCII text is written as UTF-8 rather than escaped, and NaN and infinite
+    floats become null. Dates keep Flask's HTTP date format, and dataclasses go
+    through serialize_default so both providers leave out the same fields.
+
+    Attributes:
+        sort_keys (bool): Sort dict keys, as Flask does by default.
+        compact (Optional[bool]): Indent the output when False, or when None in debug mode.
+        mimetype (str): The mimetype set by response().
+    """
+
+    sort_keys = True
+    compact = None
+    mimetype = "application/json"
+
+    def _options(self, indent: bool = False) -> int:
+        # Datetimes and dataclasses go through serialize_default, for Flask's date
+        # format and the fields it leaves out
+        option = orjson.OPT_PASSTHROUGH_DATETIME | orjson.OPT_PASSTHROUGH_DATACLASS | orjson.OPT_NON_STR_KEYS
+        if self.sort_keys:
+            option |= orjson.OPT_SORT_KEYS
+        if indent:
+            option |= orjson.OPT_INDENT_2
+        return option
+
+    def dumps(self, obj: Any, **kwargs: Any) -> str:
+        """
+        Serializes obj as JSON text. Keyword arguments meant for json.dumps are
+        ignored, except indent, which turns on two-space indentation.
+        """
+        return orjson.dumps(obj, default=serialize_default,
+                            option=self._options(bool(kwargs.get("indent")))).decode()
+
+    def loads(self, s: Any, **kwargs: Any) -> Any:
+        """
+        Parses JSON text or UTF-8 bytes. Invalid input raises orjson.JSONDecodeError,
+        a ValueError, so Flask's request.get_json turns it into a 400 as before.
+        """
+        return orjson.loads(s)
+
+    def response(self, *args: Any, **kwargs: Any) -> Response:
+        """
+        Serializes the arguments (as jsonify does) straight into a JSON response.
+        """
+        obj = self._prepare_response_obj(args, kwargs)
+        indent = self.compact is False or (self.compact is None and self._app.debug)
+        body = orjson.dumps(obj, default=serialize_default, option=self._options(indent))
+        return self._app.response_class(body + b"\n", mimetype=self.mimetype)
+
+
+def create_json_provider(app: Flask, name: str) -> JSONProvider:
+    """
+    Builds a JSON provider for app by name.
+
+    Args:
+        app (Flask): The application the provider serves.
+        name (str): One of auto (orjson when installed, else stdlib), orjson or stdlib.
+
+    Returns:
+        JSONProvider: The new provider.
+
+    Raises:
+        ValueError: If the name is unknown, or orjson is requested but not installed.
+    """
+    if name == "auto":
+        name = "orjson" if orjson is not None else "stdlib"
+    if name == "orjson":
+        if orjson is None:
+            raise ValueError("JSON provider orjson requested but the orjson package is not installed.")
+        return OrjsonJSONProvider(app)
+    if name == "stdlib":
+        return StdlibJSONProvider(app)
+    raise ValueError(f"Unknown JSON provider: {name}. Expected auto, orjson or stdlib.")
@@ -1,26 +1,113 @@
+import atexit
 import logging
+from logging.handlers import QueueHandler, QueueListener
+import os
+import queue
 import sys
+import threading
+from typing import Optional
 
-from flask import current_app, has_request_context
 
+# level for every meal_max logger: DEBUG, INFO, WARNING, ERROR or CRITICAL
+LOG_LEVEL = os.getenv("LOG_LEVEL", "INFO").upper()
+# hand records to a background thread for formatting and writing; false writes inline
+LOG_QUEUE = os.getenv("LOG_QUEUE", "true").lower() == "true"
 
-def configure_logger(logger):
-    logger.setLevel(logging.DEBUG)  # Set the desired logging level here
+LOG_FORMAT = '%(asctime)s - %(name)s - %(levelname)s - %(message)s'
 
-    # Create a console handler that logs to stderr
+# Module loggers are named after their module, so they all propagate to this one
+ROOT_LOGGER = "meal_max"
+
+_handler: Optional[logging.Handler] = None
+_listener: Optional[QueueListener] = None
+_lock = threading.Lock()
+
+
+class _InProcessQueueHandler(QueueHandler):
+    """
+    QueueHandler that enqueues records untouched. The stock prepare() formats the
+    message on the calling thread so records can be pickled; the listener runs in
+    this process, so formatting is left to it.
+    """
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        return record
+
+
+def _stderr_handler() -> logging.Handler:
     handler = logging.StreamHandler(sys.stderr)
-    handler.setLevel(logging.DEBUG)
+    handler.setFormatter(logging.Formatter(LOG_FORMAT))
+    return handler
+
+
+def _start_listener() -> None:
+    global _listener
+    log_queue: queue.SimpleQueue = queue.SimpleQueue()
+    _handler.queue = log_queue
+    _listener = QueueListener(log_queue, _stderr_handler())
+    _listener.start()
+
+
+def setup_logging() -> logging.Handler:
+    """
+    Attaches the shared handler to the meal_max logger on first call and returns it.
+
+    With LOG_QUEUE on, the handler only enqueues records; a QueueListener thread
+    formats them and writes to stderr. The queue is drained at exit and rebuilt
+    in forked worker processes.
+
+    Returns:
+        logging.Handler: The handler every meal_max log record goes through.
+    """
+    global _handler
+    with _lock:
+        if _handler is None:
+            if LOG_QUEUE:
+                _handler = _InProcessQueueHandler(queue.SimpleQueue())
+                _start_listener()
+                atexit.register(shutdown_logging)
+            else:
+                _handler = _stderr_handler()
+            root = logging.getLogger(ROOT_LOGGER)
+            root.setLevel(LOG_LEVEL)
+            root.addHandler(_handler)
+    return _handler
+
+
+def shutdown_logging() -> None:
+    """
+    Stops the listener thread after it writes every queued record.
+    """
+    global _listener
+    if _listener is not None:
+        _listener.stop()
+        _listener = None
+
+
+def _restart_after_fork() -> None:
+    # The listener thread does not survive a fork, and its queue may have been
+    # mid-operation, so the child gets a fresh queue and thread.
+    if _listener is not None:
+        _start_listener()
+
+
+os.register_at_fork(after_in_child=_restart_after_fork)
 
-    # Create a formatter with a timestamp
-    formatter = logging.Formatter('%(asctime)s - %(name)s - %(levelname)s - %(message)s')
 
-    # Add the formatter to the handler
-    handler.setFormatter(formatter)
+def configure_logger(logger: logging.Logger) -> None:
+    """
+    Routes a logger's records through the shared handler at LOG_LEVEL.
 
-    # Add the handler to the logger
-    logger.addHandler(handler)
+    Loggers under meal_max reach the handler by propagation and are left alone, so
+    calling this once per module never duplicates output. Other loggers (asgi, the
+    Flask app logger) get the handler attached once.
 
-    if has_request_context():
-        app_logger = current_app.logger
-        for handler in app_logger.handlers:
-            logger.addHandler(handler)
\ No newline at end of file
+    Args:
+        logger (logging.Logger): The logger to configure.
+    """
+    handler = setup_logging()
+    if logger.name == ROOT_LOGGER or logger.name.startswith(ROOT_LOGGER + "."):
+        return
+    if handler not in logger.handlers:
+        logger.addHandler(handler)
+    logger.setLevel(LOG_LEVEL)
@@ -0,0 +1,274 @@
+from bisect import bisect_left
+from contextlib import contextmanager
+import functools
+import logging
+import os
+import threading
+import time
+from typing import Callable, Dict, Iterator, List, Sequence, Tuple
+
+from meal_max.utils.logger import configure_logger
+
+
+logger = logging.getLogger(__name__)
+configure_logger(logger)
+
+
+# collect metrics at all; with false every timer is a no-op and /api/metrics is empty
+METRICS_ENABLED = os.getenv("METRICS_ENABLED", "true").lower() == "true"
+
+# upper bounds in seconds, from sub-millisecond SQLite reads to random.org timeouts
+DEFAULT_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+LabelValues = Tuple[str, ...]
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_labels(names: Sequence[str], values: Sequence[str], extra: str = "") -> str:
+    pairs = [f'{name}="{_escape(value)}"' for name, value in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+def _format_value(value: float) -> str:
+    value = float(value)
+    return str(int(value)) if value.is_integer() else repr(value)
+
+
+class Histogram:
+    """
+    A Prometheus histogram: cumulative bucket counts, a sum and a count per label set.
+
+    Attributes:
+        name (str): The metric name.
+        help (str): One-line description shown in the exposition.
+        label_names (Tuple[str, ...]): The labels every observation must supply.
+        buckets (Tuple[float, ...]): Sorted upper bounds, without +Inf.
+    """
+
+    kind = "histogram"
+
+    def __init__(self, name: str, help: str, label_names: Sequence[str] = (),
+                 buckets: Sequence[float] = DEFAULT_BUCKETS):
+        self.name = name
+        self.help = help
+        self.label_names = tuple(label_names)
+        self.buckets = tuple(sorted(buckets))
+        # label values -> [per-bucket counts (last one is +Inf), sum]
+        self._series: Dict[LabelValues, List] = {}
+        self._lock = threading.Lock()
+
+    def observe(self, value: float, *label_values: str) -> None:
+        """
+        Records one observation.
+
+        Args:
+            value (float): The observed value, in seconds for timers.
+            *label_values (str): One value per label name, in order.
+        """
+        index = bisect_left(self.buckets, value)
+        with self._lock:
+            series = self._series.get(label_values)
+            if series is None:
+                series = self._series[label_values] = [[0] * (len(self.buckets) + 1), 0.0]
+            series[0][index] += 1
+            series[1] += value
+
+    @contextmanager
+    def time(self, *label_values: str) -> Iterator[None]:
+        """
+        Observes the wall-clock duration of the block, whether or not it raises.
+        """
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - start, *label_values)
+
+    def snapshot(self) -> Dict[LabelValues, Tuple[List[int], float, int]]:
+        """
+        Returns cumulative bucket counts, the sum and the count for every label set.
+        """
+        with self._lock:
+            series = {labels: (list(counts), total) for labels, (counts, total) in self._series.items()}
+        result = {}
+        for labels, (counts, total) in series.items():
+            cumulative, running = [], 0
+            for count in counts:
+                running += count
+                cumulative.append(running)
+            result[labels] = (cumulative, total, running)
+        return result
+
+    def collect(self) -> List[str]:
+        lines = []
+        bounds = [_format_value(b) for b in self.buckets] + ["+Inf"]
+        for labels, (cumulative, total, count) in sorted(self.snapshot().items()):
+            for bound, value in zip(bounds, cumulative):
+                le = 'le="%s"' % bound
+                lines.append(f"{self.name}_bucket{_format_labels(self.label_names, labels, le)} {value}")
+            lines.append(f"{self.name}_sum{_format_labels(self.label_names, labels)} {_format_value(total)}")
+            lines.append(f"{self.name}_count{_format_labels(self.label_names, labels)} {count}")
+        return lines
+
+    def clear(self) -> None:
+        with self._lock:
+            self._series.clear()
+
+
+class CallbackMetric:
+    """
+    A gauge or counter whose values are read from a function at scrape time, for
+    numbers another component already tracks (pool and cache statistics).
+
+    Attributes:
+        name (str): The metric name.
+        help (str): One-line description shown in the exposition.
+        kind (str): gauge or counter.
+        label_names (Tuple[str, ...]): The labels the callback's keys supply.
+        callback (Callable): Returns {label values: value}.
+    """
+
+    def __init__(self, name: str, help: str, kind: str, label_names: Sequence[str],
+                 callback: Callable[[], Dict[LabelValues, float]]):
+        if kind not in ("gauge", "counter"):
+            raise ValueError(f"Invalid metric type: {kind}. Must be 'gauge' or 'counter'.")
+        self.name = name
+        self.help = help
+        self.kind = kind
+        self.label_names = tuple(label_names)
+        self.callback = callback
+
+    def collect(self) -> List[str]:
+        try:
+            values = self.callback()
+        except Exception as e:
+            logger.warning("Could not collect %s: %s", self.name, e)
+            return []
+        return [f"{self.name}{_format_labels(self.label_names, labels)} {_format_value(value)}"
+                for labels, value in sorted(values.items())]
+
+    def clear(self) -> None:
+        pass
+
+
+class MetricsRegistry:
+    """
+    Holds every metric of the process and renders them in the Prometheus text format.
+
+    Metrics are per process: under gunicorn each worker keeps its own, so scrape
+    every worker or run one worker per container.
+    """
+
+    def __init__(self):
+        self._metrics: Dict[str, object] = {}
+        self._lock = threading.Lock()
+
+    def _register(self, metric):
+        with self._lock:
+            existing = self._metrics.get(metric.name)
+            if existing is not None:
+                return existing
+            self._metrics[metric.name] = metric
+            return metric
+
+    def histogram(self, name: str, help: str, label_names: Sequence[str] = (),
+                  buckets: Sequence[float] = DEFAULT_BUCKETS) -> Histogram:
+        """
+        Returns the histogram called name, creating it on first use.
+        """
+        return self._register(Histogram(name, help, label_names, buckets))
+
+    def callback(self, name: str, help: str, kind: str, label_names: Sequence[str],
+                 callback: Callable[[], Dict[LabelValues, float]]) -> CallbackMetric:
+        """
+        Registers a gauge or counter read from callback at scrape time.
+        """
+        return self._register(CallbackMetric(name, help, kind, label_names, callback))
+
+    def render(self) -> str:
+        """
+        Returns every metric in the Prometheus text exposition format (version 0.0.4).
+        """
+        with self._lock:
+            metrics = list(self._metrics.values())
+        lines = []
+        for metric in metrics:
+            samples = metric.collect()
+            if not samples:
+                continue
+            lines.append(f"# HELP {metric.name} {metric.help}")
+            lines.append(f"# TYPE {metric.name} {metric.kind}")
+            lines.extend(samples)
+        return "\n".join(lines) + "\n" if lines else ""
+
+    def clear(self) -> None:
+        """
+        Drops every recorded observation, keeping the registered metrics.
+        """
+        with self._lock:
+            metrics = list(self._metrics.values())
+        for metric in metrics:
+            metric.clear()
+
+
+registry = MetricsRegistry()
+
+http_request_duration = registry.histogram(
+    "meal_max_http_request_duration_seconds", "Time spent handling HTTP requests.",
+    ("method", "route", "status"))
+
+db_query_duration = registry.histogram(
+    "meal_max_db_query_duration_seconds", "Time spent executing SQLite statements.",
+    ("operation",))
+
+external_request_duration = registry.histogram(
+    "meal_max_external_request_duration_seconds", "Time spent waiting on external services.",
+    ("service", "outcome"))
+
+
+@contextmanager
+def time_external_call(service: str) -> Iterator[None]:
+    """
+    Times a call to an external service, labelled with its outcome (ok or error).
+
+    Args:
+        service (str): The service being called, e.g. random_org.
+    """
+    if not METRICS_ENABLED:
+        yield
+        return
+    start = time.perf_counter()
+    outcome = "error"
+    try:
+        yield
+        outcome = "ok"
+    finally:
+        external_request_duration.observe(time.perf_counter() - start, service, outcome)
+
+
+_SQL_OPERATIONS = frozenset(("SELECT", "INSERT", "UPDATE", "DELETE", "BEGIN", "COMMIT", "ROLLBACK",
+                             "PRAGMA", "CREATE", "DROP", "WITH"))
+
+
+@functools.lru_cache(maxsize=1024)
+def sql_operation(sql: str) -> str:
+    """
+    Returns the statement's leading keyword for use as a label, or OTHER.
+    Cached, since the same few statements are executed over and over.
+    """
+    keyword = sql.lstrip()[:8].split(None, 1)
+    keyword = keyword[0].upper().rstrip(";") if keyword else ""
+    return keyword if keyword in _SQL_OPERATIONS else "OTHER"
+
+
+def observe_query(sql: str, start: float) -> None:
+    """
+    Records a statement that started at start (a time.perf_counter() value).
+    """
+    db_query_duration.observe(time.perf_counter() - start, sql_operation(sql))
+
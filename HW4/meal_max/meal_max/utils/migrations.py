@@ -0,0 +1,122 @@
+import logging
+import os
+import re
+import sqlite3
+from typing import List, Optional, Tuple
+
+from meal_max.utils.logger import configure_logger
+from meal_max.utils.sql_utils import get_db_connection
+
+logger = logging.getLogger(__name__)
+configure_logger(logger)
+
+
+# Migrations are numbered SQL scripts, e.g. 0001_meal_indexes.sql. The number of the
+# last one applied is stored in the database's PRAGMA user_version.
+MIGRATIONS_PATH = os.getenv(
+    "SQL_MIGRATIONS_PATH",
+    os.path.join(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))), "sql", "migrations"))
+
+MIGRATION_FILE_PATTERN = re.compile(r"^(\d+)_([\w-]+)\.sql$")
+
+# SQLite has no ADD COLUMN IF NOT EXISTS, so these statements are dropped from a
+# migration when the column is already there.
+ADD_COLUMN_PATTERN = re.compile(r"^\s*ALTER\s+TABLE\s+(\w+)\s+ADD\s+(?:COLUMN\s+)?(\w+)\b[^;]*;",
+                                re.IGNORECASE | re.MULTILINE)
+
+
+def get_migrations(path: Optional[str] = None) -> List[Tuple[int, str, str]]:
+    """
+    Lists the migration scripts in version order.
+
+    Args:
+        path (Optional[str]): The migrations directory. Defaults to MIGRATIONS_PATH.
+
+    Returns:
+        List[Tuple[int, str, str]]: The version, name and file path of each migration.
+
+    Raises:
+        ValueError: If two migrations share a version number.
+    """
+    path = path or MIGRATIONS_PATH
+    migrations = []
+    for filename in os.listdir(path):
+        match = MIGRATION_FILE_PATTERN.match(filename)
+        if match:
+            migrations.append((int(match.group(1)), match.group(2), os.path.join(path, filename)))
+    migrations.sort()
+
+    versions = [version for version, _, _ in migrations]
+    if len(versions) != len(set(versions)):
+        raise ValueError(f"Duplicate migration versions in {path}")
+    return migrations
+
+
+def get_schema_version(conn: sqlite3.Connection) -> int:
+    """
+    Returns the version of the last migration applied to the database.
+    """
+    return conn.execute("PRAGMA user_version;").fetchone()[0]
+
+
+def skip_existing_columns(conn: sqlite3.Connection, script: str) -> str:
+    """
+    Removes the ALTER TABLE ... ADD COLUMN statements whose column already exists,
+    so a migration can be re-run against a table it has already altered.
+    """
+    def add_column(match: re.Match) -> str:
+        table, column = match.group(1), match.group(2)
+        columns = {row[1].lower() for row in conn.execute(f"PRAGMA table_info({table});")}
+        if column.lower() in columns:
+            logger.info("Column %s.%s already exists; skipping", table, column)
+            return ""
+        return match.group(0)
+
+    return ADD_COLUMN_PATTERN.sub(add_column, script)
+
+
+def apply_migrations(conn: Optional[sqlite3.Connection] = None, path: Optional[str] = None) -> int:
+    """
+    Applies every migration newer than the database's schema version.
+
+    Each migration runs in its own transaction together with the version bump,
+    so a failed migration leaves the database at the previous version. Columns a
+    migration adds are skipped if they already exist (see skip_existing_columns).
+
+    Args:
+        conn (Optional[sqlite3.Connection]): The connection to migrate. Defaults to a pooled connection.
+        path (Optional[str]): The migrations directory. Defaults to MIGRATIONS_PATH.
+
+    Returns:
+        int: The schema version after migrating.
+
+    Raises:
+        sqlite3.Error: If a migration fails.
+    """
+    if conn is None:
+        with get_db_connection() as pooled_conn:
+            return apply_migrations(pooled_conn, path)
+
+    version = get_schema_version(conn)
+    for migration_version, name, migration_path in get_migrations(path):
+        if migration_version <= version:
+            continue
+        with open(migration_path) as f:
+            script = skip_existing_columns(conn, f.read())
+        logger.info("Applying migration %04d_%s", migration_version, name)
+        try:
+            conn.executescript(
+                f"BEGIN IMMEDIATE;\n{script}\nPRAGMA user_version = {migration_version};\nCOMMIT;")
+        except sqlite3.Error as e:
+            if conn.in_transaction:
+                conn.rollback()
+            logger.error("Migration %04d_%s failed: %s", migration_version, name, str(e))
+            raise e
+        version = migration_version
+
+    logger.info("Database schema is at version %d", version)
+    return version
+
+
+if __name__ == '__main__':
+    apply_migrations()
@@ -1,48 +1,432 @@
+import asyncio
+from collections import deque
 import logging
+import os
+import random
+import threading
+from typing import Callable, Deque, List, Optional
+
+import httpx
 import requests
 
 from meal_max.utils.logger import configure_logger
+from meal_max.utils.metrics import time_external_call
 
 logger = logging.getLogger(__name__)
 configure_logger(logger)
 
 
+# which provider get_random() uses: random_org, local, seeded or prefetch
+RANDOM_PROVIDER = os.getenv("RANDOM_PROVIDER", "random_org")
+RANDOM_SEED = int(os.getenv("RANDOM_SEED", "0"))
+# where the prefetch provider gets its numbers from: random_org or local
+RANDOM_PREFETCH_SOURCE = os.getenv("RANDOM_PREFETCH_SOURCE", "random_org")
+RANDOM_PREFETCH_SIZE = int(os.getenv("RANDOM_PREFETCH_SIZE", "100"))
+
+RANDOM_ORG_URL = "https://www.random.org/decimal-fractions/?num={count}&dec=2&col=1&format=plain&rnd=new"
+
+
+class RandomProvider:
+    """
+    Base class for sources of random decimal numbers with two decimal places in [0, 1).
+
+    Subclasses implement get_random(); fetch() has a default that calls it repeatedly.
+    """
+
+    def get_random(self) -> float:
+        """
+        Returns a random decimal number with two decimal places.
+
+        Raises:
+            RuntimeError: If the source cannot be reached.
+            ValueError: If the source returns something that is not a valid float.
+        """
+        raise NotImplementedError
+
+    def fetch(self, count: int) -> List[float]:
+        """
+        Returns count random decimal numbers with two decimal places.
+
+        Args:
+            count (int): How many numbers to return.
+        """
+        return [self.get_random() for _ in range(count)]
+
+    def close(self) -> None:
+        """
+        Releases any resources held by the provider.
+        """
+
+
+class RandomOrgProvider(RandomProvider):
+    """
+    Fetches random numbers from random.org over HTTPS.
+
+    Attributes:
+        timeout (float): Seconds to wait for random.org before giving up.
+    """
+
+    def __init__(self, timeout: float = 5):
+        self.timeout = timeout
+
+    def get_random(self) -> float:
+        """
+        Fetches a random decimal number with two decimal places from random.org.
+
+        Returns:
+            float: The random decimal number fetched from random.org.
+
+        Raises:
+            RuntimeError: If the request to random.org fails or times out.
+            ValueError: If the response from random.org is not a valid float.
+        """
+        return self._request(1)[0]
+
+    def fetch(self, count: int) -> List[float]:
+        """
+        Fetches count random decimal numbers from random.org in a single request.
+
+        Args:
+            count (int): How many numbers to fetch (random.org allows up to 10,000).
+
+        Raises:
+            RuntimeError: If the request to random.org fails or times out.
+            ValueError: If the response from random.org is not a list of valid floats.
+        """
+        return self._request(count)
+
+    def _request(self, count: int) -> List[float]:
+        url = RANDOM_ORG_URL.format(count=count)
+
+        try:
+            # Log the request to random.org
+            logger.info("Fetching random number from %s", url)
+
+            with time_external_call("random_org"):
+                response = requests.get(url, timeout=self.timeout)
+
+                # Check if the request was successful
+                response.raise_for_status()
+
+            return _parse_random_org_response(response.text, count)
+
+        except requests.exceptions.Timeout:
+            logger.error("Request to random.org timed out.")
+            raise RuntimeError("Request to random.org timed out.")
+
+        except requests.exceptions.RequestException as e:
+            logger.error("Request to random.org failed: %s", e)
+            raise RuntimeError("Request to random.org failed: %s" % e)
+
+
+def _parse_random_org_response(text: str, count: int) -> List[float]:
+    """
+    Parses random.org's plain-text response into count floats.
+
+    Raises:
+        ValueError: If the response is not exactly count valid floats.
+    """
+    try:
+        random_numbers = [float(value) for value in text.split()]
+    except ValueError:
+        raise ValueError("Invalid response from random.org: %s" % text.strip())
+    if len(random_numbers) != count:
+        raise ValueError("Invalid response from random.org: %s" % text.strip())
+
+    if count == 1:
+        logger.info("Received random number: %.3f", random_numbers[0])
+    else:
+        logger.info("Received %d random numbers", count)
+    return random_numbers
+
+
+class LocalRandomProvider(RandomProvider):
+    """
+    Draws random numbers from the operating system's CSPRNG without any network I/O.
+    """
+
+    def __init__(self):
+        self._rng = random.SystemRandom()
+
+    def get_random(self) -> float:
+        return self._rng.randrange(100) / 100
+
+
+class SeededRandomProvider(RandomProvider):
+    """
+    Draws a deterministic sequence of random numbers for replayable tests and benchmarks.
+
+    Attributes:
+        seed (int): The seed the sequence starts from.
+    """
+
+    def __init__(self, seed: int = 0):
+        self.seed = seed
+        self._rng = random.Random(seed)
+        self._lock = threading.Lock()
+
+    def get_random(self) -> float:
+        with self._lock:
+            return self._rng.randrange(100) / 100
+
+
+class PrefetchingRandomProvider(RandomProvider):
+    """
+    Serves random numbers from a local buffer that is refilled in bulk in the background.
+
+    When the buffer drops to the low-water mark a background thread fetches another
+    batch from the source. If the buffer runs dry anyway, get_random() fetches a batch
+    synchronously, so callers see the source's errors exactly as they would without
+    the buffer.
+
+    Attributes:
+        source (Callable[[int], List[float]]): Returns the requested number of random numbers.
+        batch_size (int): How many numbers to fetch per refill.
+        low_water (int): Buffer size at which a background refill starts.
+    """
+
+    def __init__(self, source: Callable[[int], List[float]], batch_size: int = RANDOM_PREFETCH_SIZE,
+                 low_water: Optional[int] = None):
+        if batch_size < 1:
+            raise ValueError(f"Invalid batch size: {batch_size}. Must be at least 1.")
+        self.source = source
+        self.batch_size = batch_size
+        self.low_water = batch_size // 4 if low_water is None else low_water
+
+        self._buffer: Deque[float] = deque()
+        self._lock = threading.Lock()
+        self._refill_needed = threading.Event()
+        self._closed = threading.Event()
+        self._thread = threading.Thread(target=self._refill_loop, name="random-prefetch", daemon=True)
+        self._thread.start()
+        self._refill_needed.set()
+
+    def _refill_loop(self) -> None:
+        while True:
+            self._refill_needed.wait()
+            if self._closed.is_set():
+                return
+            try:
+                numbers = self.source(self.batch_size)
+            except (RuntimeError, ValueError) as e:
+                logger.warning("Background random number refill failed: %s", e)
+                numbers = []
+            with self._lock:
+                self._buffer.extend(numbers)
+                if len(self._buffer) > self.low_water or not numbers:
+                    self._refill_needed.clear()
+
+    def get_random(self) -> float:
+        with self._lock:
+            if self._buffer:
+                value = self._buffer.popleft()
+                if len(self._buffer) <= self.low_water:
+                    self._refill_needed.set()
+                return value
+
+        logger.warning("Random number buffer empty, fetching %d numbers synchronously", self.batch_size)
+        numbers = self.source(self.batch_size)
+        with self._lock:
+            self._buffer.extend(numbers[1:])
+        return numbers[0]
+
+    def fetch(self, count: int) -> List[float]:
+        """
+        Returns count numbers, taken from the buffer first. Any shortfall is fetched
+        from the source in one call, topped up to a full batch with the extras buffered.
+        """
+        with self._lock:
+            taken = min(count, len(self._buffer))
+            numbers = [self._buffer.popleft() for _ in range(taken)]
+            if len(self._buffer) <= self.low_water:
+                self._refill_needed.set()
+        if taken == count:
+            return numbers
+
+        missing = count - taken
+        logger.warning("Random number buffer short by %d, fetching synchronously", missing)
+        fetched = self.source(max(missing, self.batch_size))
+        with self._lock:
+            self._buffer.extend(fetched[missing:])
+        return numbers + fetched[:missing]
+
+    def close(self) -> None:
+        self._closed.set()
+        self._refill_needed.set()
+        self._thread.join(timeout=1)
+
+
+def create_random_provider(name: str) -> RandomProvider:
+    """
+    Builds a random provider by name.
+
+    Args:
+        name (str): One of random_org, local, seeded or prefetch.
+
+    Returns:
+        RandomProvider: The new provider.
+
+    Raises:
+        ValueError: If the name is unknown.
+    """
+    if name == "random_org":
+        return RandomOrgProvider()
+    if name == "local":
+        return LocalRandomProvider()
+    if name == "seeded":
+        return SeededRandomProvider(RANDOM_SEED)
+    if name == "prefetch":
+        if RANDOM_PREFETCH_SOURCE == "prefetch":
+            raise ValueError("The prefetch provider cannot prefetch from itself.")
+        return PrefetchingRandomProvider(create_random_provider(RANDOM_PREFETCH_SOURCE).fetch)
+    raise ValueError(f"Unknown random provider: {name}. Expected random_org, local, seeded or prefetch.")
+
+
+_provider: Optional[RandomProvider] = None
+_provider_lock = threading.Lock()
+
+
+def get_random_provider() -> RandomProvider:
+    """
+    Returns the process-wide random provider, creating it from RANDOM_PROVIDER on first use.
+    """
+    global _provider
+    if _provider is None:
+        with _provider_lock:
+            if _provider is None:
+                _provider = create_random_provider(RANDOM_PROVIDER)
+    return _provider
+
+
+def set_random_provider(provider: Optional[RandomProvider]) -> None:
+    """
+    Replaces the process-wide random provider, closing the previous one.
+    Passing None makes the next get_random() rebuild it from RANDOM_PROVIDER.
+    """
+    global _provider
+    with _provider_lock:
+        if _provider is not None and _provider is not provider:
+            _provider.close()
+        _provider = provider
+
+
 def get_random() -> float:
     """
-    Fetches a random decimal number with two decimal places from random.org.
+    Returns a random decimal number with two decimal places from the configured provider.
 
     Returns:
-        float: The random decimal number fetched from random.org.
+        float: The random decimal number.
 
     Raises:
-        RuntimeError: If the request to random.org fails or times out.
-        ValueError: If the response from random.org is not a valid float.
+        RuntimeError: If the provider's source fails or times out.
+        ValueError: If the provider's source returns an invalid number.
     """
-    url = "https://www.random.org/decimal-fractions/?num=1&dec=2&col=1&format=plain&rnd=new"
+    return get_random_provider().get_random()
 
-    try:
-        # Log the request to random.org
-        logger.info("Fetching random number from %s", url)
 
-        response = requests.get(url, timeout=5)
+class AsyncRandomProvider:
+    """
+    Base class for random number sources that are awaited from an event loop.
+    """
+
+    async def get_random(self) -> float:
+        """
+        Returns a random decimal number with two decimal places.
+
+        Raises:
+            RuntimeError: If the source cannot be reached.
+            ValueError: If the source returns something that is not a valid float.
+        """
+        raise NotImplementedError
 
-        # Check if the request was successful
-        response.raise_for_status()
+    async def aclose(self) -> None:
+        """
+        Releases any resources held by the provider.
+        """
 
-        random_number_str = response.text.strip()
+
+class AsyncRandomOrgProvider(AsyncRandomProvider):
+    """
+    Fetches random numbers from random.org through a shared httpx.AsyncClient, so
+    requests reuse pooled keep-alive connections and never block the event loop.
+
+    Attributes:
+        client (httpx.AsyncClient): The client to send requests with. It is owned by the
+            caller, which closes it.
+        timeout (float): Seconds to wait for random.org before giving up.
+    """
+
+    def __init__(self, client: httpx.AsyncClient, timeout: float = 5):
+        self.client = client
+        self.timeout = timeout
+
+    async def get_random(self) -> float:
+        url = RANDOM_ORG_URL.format(count=1)
 
         try:
-            random_number = float(random_number_str)
-        except ValueError:
-            raise ValueError("Invalid response from random.org: %s" % random_number_str)
+            logger.info("Fetching random number from %s", url)
+
+            with time_external_call("random_org"):
+                response = await self.client.get(url, timeout=self.timeout)
+                response.raise_for_status()
+
+            return _parse_random_org_response(response.text, 1)[0]
 
-        logger.info("Received random number: %.3f", random_number)
-        return random_number
+        except httpx.TimeoutException:
+            logger.error("Request to random.org timed out.")
+            raise RuntimeError("Request to random.org timed out.")
 
-    except requests.exceptions.Timeout:
-        logger.error("Request to random.org timed out.")
-        raise RuntimeError("Request to random.org timed out.")
+        except httpx.HTTPError as e:
+            logger.error("Request to random.org failed: %s", e)
+            raise RuntimeError("Request to random.org failed: %s" % e)
+
+
+class SyncRandomAdapter(AsyncRandomProvider):
+    """
+    Exposes a synchronous RandomProvider to async code. The adapter owns the
+    provider and closes it in aclose().
 
-    except requests.exceptions.RequestException as e:
-        logger.error("Request to random.org failed: %s", e)
-        raise RuntimeError("Request to random.org failed: %s" % e)
\ No newline at end of file
+    Attributes:
+        provider (RandomProvider): The provider to draw from.
+        blocking (bool): Whether provider.get_random() may do I/O. Blocking providers
+            are called in a worker thread; the others are called inline.
+    """
+
+    def __init__(self, provider: RandomProvider, blocking: bool = True):
+        self.provider = provider
+        self.blocking = blocking
+
+    async def get_random(self) -> float:
+        if self.blocking:
+            return await asyncio.get_running_loop().run_in_executor(None, self.provider.get_random)
+        return self.provider.get_random()
+
+    async def aclose(self) -> None:
+        self.provider.close()
+
+
+def create_async_random_provider(name: str, client: httpx.AsyncClient) -> AsyncRandomProvider:
+    """
+    Builds an async random provider by name.
+
+    random_org gets a native async provider on the given client. The other names
+    wrap the matching synchronous provider.
+
+    Args:
+        name (str): One of random_org, local, seeded or prefetch.
+        client (httpx.AsyncClient): The client random.org requests are sent with.
+
+    Returns:
+        AsyncRandomProvider: The new provider.
+
+    Raises:
+        ValueError: If the name is unknown.
+    """
+    if name == "random_org":
+        return AsyncRandomOrgProvider(client)
+    if name in ("local", "seeded"):
+        return SyncRandomAdapter(create_random_provider(name), blocking=False)
+    if name == "prefetch":
+        # Served from the buffer almost always, but a dry buffer fetches synchronously
+        return SyncRandomAdapter(create_random_provider(name), blocking=True)
+    raise ValueError(f"Unknown random provider: {name}. Expected random_org, local, seeded or prefetch.")
@@ -1,8 +1,16 @@
 from contextlib import contextmanager
+from dataclasses import dataclass, replace
+import functools
 import logging
 import os
+import queue
+import random
 import sqlite3
+import threading
+import time
+from typing import Any, Callable, Dict, Optional, Tuple, TypeVar
 
+from meal_max.utils import metrics
 from meal_max.utils.logger import configure_logger
 
 
@@ -13,6 +21,18 @@ configure_logger(logger)
 # load the db path from the environment with a default value
 DB_PATH = os.getenv("DB_PATH", "/app/sql/meal_max.db")
 
+# connection pool settings
+DB_POOL_SIZE = int(os.getenv("DB_POOL_SIZE", "8"))
+DB_POOL_TIMEOUT = float(os.getenv("DB_POOL_TIMEOUT", "5.0"))
+DB_POOL_HEALTH_CHECK_INTERVAL = float(os.getenv("DB_POOL_HEALTH_CHECK_INTERVAL", "30.0"))
+
+# storage profile applied to every new connection, see STORAGE_PROFILES
+DB_STORAGE_PROFILE = os.getenv("DB_STORAGE_PROFILE", "wal")
+
+# retry settings for writes that hit SQLITE_BUSY
+DB_BUSY_RETRIES = int(os.getenv("DB_BUSY_RETRIES", "5"))
+DB_BUSY_BACKOFF = float(os.getenv("DB_BUSY_BACKOFF", "0.01"))
+
 
 def check_database_connection():
     try:
@@ -37,6 +57,507 @@ def check_table_exists(tablename: str):
         logger.error(error_message)
         raise Exception(error_message) from e
 
+
+class TimedCursor(sqlite3.Cursor):
+    """
+    Cursor that records how long each statement takes to execute in
+    metrics.db_query_duration, labelled by the statement's leading keyword.
+    Time spent fetching rows afterwards is not included.
+    """
+
+    def execute(self, sql, parameters=()):
+        start = time.perf_counter()
+        try:
+            return super().execute(sql, parameters)
+        finally:
+            metrics.observe_query(sql, start)
+
+    def executemany(self, sql, seq_of_parameters):
+        start = time.perf_counter()
+        try:
+            return super().executemany(sql, seq_of_parameters)
+        finally:
+            metrics.observe_query(sql, start)
+
+    def executescript(self, sql_script):
+        start = time.perf_counter()
+        try:
+            return super().executescript(sql_script)
+        finally:
+            metrics.observe_query(sql_script, start)
+
+
+class TimedConnection(sqlite3.Connection):
+    """
+    Connection whose cursors are TimedCursors. The execute(), executemany() and
+    executescript() shortcuts are timed directly.
+    """
+
+    def cursor(self, factory=TimedCursor):
+        return super().cursor(factory)
+
+    def execute(self, sql, parameters=()):
+        start = time.perf_counter()
+        try:
+            return super().execute(sql, parameters)
+        finally:
+            metrics.observe_query(sql, start)
+
+    def executemany(self, sql, seq_of_parameters):
+        start = time.perf_counter()
+        try:
+            return super().executemany(sql, seq_of_parameters)
+        finally:
+            metrics.observe_query(sql, start)
+
+    def executescript(self, sql_script):
+        start = time.perf_counter()
+        try:
+            return super().executescript(sql_script)
+        finally:
+            metrics.observe_query(sql_script, start)
+
+
+@dataclass(frozen=True)
+class StorageProfile:
+    """
+    A dataclass describing the SQLite pragmas applied when a connection is opened.
+
+    Attributes:
+        journal_mode (str): The journal mode (DELETE, TRUNCATE, PERSIST, MEMORY, WAL, OFF).
+        synchronous (str): The fsync level (OFF, NORMAL, FULL, EXTRA).
+        cache_size (int): The page cache size; negative values are in KiB.
+        mmap_size (int): The number of bytes of the database file to memory-map.
+        busy_timeout (int): Milliseconds to wait on a locked database before SQLITE_BUSY.
+        isolation_level (Optional[str]): How implicit transactions begin (DEFERRED, IMMEDIATE,
+            EXCLUSIVE), or None for autocommit.
+    """
+    journal_mode: str = "WAL"
+    synchronous: str = "NORMAL"
+    cache_size: int = -16000
+    mmap_size: int = 128 * 1024 * 1024
+    busy_timeout: int = 5000
+    isolation_level: Optional[str] = "IMMEDIATE"
+
+    def __post_init__(self):
+        if self.journal_mode.upper() not in ['DELETE', 'TRUNCATE', 'PERSIST', 'MEMORY', 'WAL', 'OFF']:
+            raise ValueError(f"Invalid journal_mode: {self.journal_mode}.")
+        if self.synchronous.upper() not in ['OFF', 'NORMAL', 'FULL', 'EXTRA']:
+            raise ValueError(f"Invalid synchronous level: {self.synchronous}.")
+        if self.isolation_level is not None and self.isolation_level.upper() not in ['DEFERRED', 'IMMEDIATE', 'EXCLUSIVE']:
+            raise ValueError(f"Invalid isolation_level: {self.isolation_level}.")
+
+
+STORAGE_PROFILES: Dict[str, StorageProfile] = {
+    # SQLite's own defaults: rollback journal, fsync on every commit, deferred transactions.
+    'legacy': StorageProfile(journal_mode="DELETE", synchronous="FULL", cache_size=-2000,
+                             mmap_size=0, busy_timeout=5000, isolation_level="DEFERRED"),
+    # Readers never block on writers; commits only fsync at checkpoints.
+    'wal': StorageProfile(),
+    # WAL concurrency, but every commit is fsynced.
+    'durable': StorageProfile(synchronous="FULL"),
+}
+
+
+def get_storage_profile(name: Optional[str] = None) -> StorageProfile:
+    """
+    Resolves a storage profile by name, applying any DB_* pragma overrides from the environment.
+
+    Args:
+        name (Optional[str]): The profile name. Defaults to DB_STORAGE_PROFILE.
+
+    Returns:
+        StorageProfile: The resolved profile.
+
+    Raises:
+        ValueError: If the profile name is unknown or an override is invalid.
+    """
+    name = name or DB_STORAGE_PROFILE
+    if name not in STORAGE_PROFILES:
+        raise ValueError(f"Unknown storage profile: {name}. Expected one of {sorted(STORAGE_PROFILES)}.")
+
+    overrides: Dict[str, Any] = {}
+    for field_name, env_var, cast in [
+        ('journal_mode', 'DB_JOURNAL_MODE', str),
+        ('synchronous', 'DB_SYNCHRONOUS', str),
+        ('cache_size', 'DB_CACHE_SIZE', int),
+        ('mmap_size', 'DB_MMAP_SIZE', int),
+        ('busy_timeout', 'DB_BUSY_TIMEOUT', int),
+    ]:
+        value = os.getenv(env_var)
+        if value:
+            overrides[field_name] = cast(value)
+    return replace(STORAGE_PROFILES[name], **overrides)
+
+
+def apply_storage_profile(conn: sqlite3.Connection, profile: StorageProfile) -> None:
+    """
+    Applies a storage profile's pragmas to an open connection.
+
+    Args:
+        conn (sqlite3.Connection): The connection to configure.
+        profile (StorageProfile): The pragmas to apply.
+    """
+    # Pragma values cannot be bound as parameters; the profile validates them instead.
+    conn.execute(f"PRAGMA busy_timeout = {int(profile.busy_timeout)};")
+    conn.execute(f"PRAGMA journal_mode = {profile.journal_mode};").fetchone()
+    conn.execute(f"PRAGMA synchronous = {profile.synchronous};")
+    conn.execute(f"PRAGMA cache_size = {int(profile.cache_size)};")
+    conn.execute(f"PRAGMA mmap_size = {int(profile.mmap_size)};").fetchone()
+    conn.isolation_level = profile.isolation_level
+
+
+def is_busy_error(error: sqlite3.Error) -> bool:
+    """
+    Returns True if the error means another connection holds the database lock.
+    """
+    message = str(error).lower()
+    return isinstance(error, sqlite3.OperationalError) and (
+        "database is locked" in message or "database is busy" in message or "database table is locked" in message)
+
+
+F = TypeVar("F", bound=Callable[..., Any])
+
+
+def retry_on_busy(func: F) -> F:
+    """
+    Retries a database operation with jittered exponential backoff while it fails with SQLITE_BUSY.
+
+    The wrapped function must run its work in a single transaction, so a failed
+    attempt leaves nothing behind to undo.
+    """
+    @functools.wraps(func)
+    def wrapper(*args, **kwargs):
+        attempt = 0
+        while True:
+            try:
+                return func(*args, **kwargs)
+            except sqlite3.OperationalError as e:
+                if not is_busy_error(e) or attempt >= DB_BUSY_RETRIES:
+                    raise
+                delay = DB_BUSY_BACKOFF * (2 ** attempt) * (0.5 + random.random())
+                attempt += 1
+                logger.warning("Database busy in %s, retrying in %.3fs (attempt %d of %d)",
+                               func.__name__, delay, attempt, DB_BUSY_RETRIES)
+                time.sleep(delay)
+    return wrapper  # type: ignore[return-value]
+
+
+class SavepointConnection:
+    """
+    The connection a nested checkout gets while the outer block has a transaction
+    open. Its commit() and rollback() only release or undo the nested block's own
+    work, through a SAVEPOINT, and leave the outer transaction to its owner.
+    Everything else is passed through to the connection.
+    """
+
+    def __init__(self, conn: sqlite3.Connection, name: str):
+        object.__setattr__(self, "_conn", conn)
+        object.__setattr__(self, "_name", name)
+        object.__setattr__(self, "_active", True)
+        conn.execute(f"SAVEPOINT {name}")
+
+    def __getattr__(self, name: str) -> Any:
+        return getattr(self._conn, name)
+
+    def __setattr__(self, name: str, value: Any) -> None:
+        setattr(self._conn, name, value)
+
+    def commit(self) -> None:
+        """Keeps the nested block's work as part of the outer transaction."""
+        if self._active:
+            self._conn.execute(f"RELEASE {self._name}")
+            object.__setattr__(self, "_active", False)
+
+    def rollback(self) -> None:
+        """Undoes the nested block's work, leaving the outer transaction's intact."""
+        if self._active:
+            self._conn.execute(f"ROLLBACK TO {self._name}")
+            self._conn.execute(f"RELEASE {self._name}")
+            object.__setattr__(self, "_active", False)
+
+
+class ConnectionPool:
+    """
+    A thread-aware pool of reusable SQLite connections.
+
+    Idle connections are handed out most-recently-used first, so a worker thread
+    that checks out, releases and checks out again usually gets the same
+    connection back. Nested checkouts on the same thread reuse the connection the
+    thread already holds; if it has a transaction open, the nested block gets a
+    SavepointConnection, so its commit() or rollback() cannot end the outer
+    transaction. A nested block that raises has its work rolled back.
+
+    Attributes:
+        db_path (str): The path to the SQLite database file.
+        max_size (int): The maximum number of open connections.
+        timeout (float): Seconds to wait for a free connection before giving up.
+        health_check_interval (float): Idle seconds after which a connection is
+            pinged before being handed out again.
+        profile (Optional[StorageProfile]): Pragmas applied to each new connection.
+    """
+
+    def __init__(self, db_path: str, max_size: int = DB_POOL_SIZE, timeout: float = DB_POOL_TIMEOUT,
+                 health_check_interval: float = DB_POOL_HEALTH_CHECK_INTERVAL,
+                 profile: Optional[StorageProfile] = None):
+        if max_size < 1:
+            raise ValueError(f"Invalid pool size: {max_size}. Must be at least 1.")
+        self.db_path = db_path
+        self.max_size = max_size
+        self.timeout = timeout
+        self.health_check_interval = health_check_interval
+        self.profile = profile
+
+        self._idle: "queue.LifoQueue[tuple]" = queue.LifoQueue()
+        self._lock = threading.Lock()
+        self._local = threading.local()
+        self._size = 0
+        self._closed = False
+
+        self._checkouts = 0
+        self._waits = 0
+        self._wait_time = 0.0
+        self._max_wait_time = 0.0
+        self._created = 0
+        self._health_check_failures = 0
+
+    def _connect(self) -> sqlite3.Connection:
+        # Connections move between threads through the pool, never concurrently.
+        factory = TimedConnection if metrics.METRICS_ENABLED else sqlite3.Connection
+        conn = sqlite3.connect(self.db_path, check_same_thread=False, factory=factory)
+        if self.profile is not None:
+            try:
+                apply_storage_profile(conn, self.profile)
+            except sqlite3.Error:
+                conn.close()
+                raise
+        with self._lock:
+            self._created += 1
+        logger.info("Opened new pooled database connection (%d/%d).", self._size, self.max_size)
+        return conn
+
+    def _is_healthy(self, conn: sqlite3.Connection) -> bool:
+        try:
+            conn.execute("SELECT 1;").fetchone()
+            return True
+        except sqlite3.Error as e:
+            logger.warning("Discarding unhealthy pooled connection: %s", str(e))
+            with self._lock:
+                self._health_check_failures += 1
+            return False
+
+    def _discard(self, conn: sqlite3.Connection) -> None:
+        try:
+            conn.close()
+        except sqlite3.Error:
+            pass
+        with self._lock:
+            self._size -= 1
+
+    def _acquire(self) -> sqlite3.Connection:
+        start = time.perf_counter()
+        waited = False
+        while True:
+            if self._closed:
+                raise sqlite3.OperationalError("Connection pool is closed")
+            try:
+                conn, released_at = self._idle.get_nowait()
+            except queue.Empty:
+                with self._lock:
+                    can_grow = self._size < self.max_size
+                    if can_grow:
+                        self._size += 1
+                if can_grow:
+                    try:
+                        conn = self._connect()
+                    except sqlite3.Error:
+                        with self._lock:
+                            self._size -= 1
+                        raise
+                    break
+                remaining = self.timeout - (time.perf_counter() - start)
+                if remaining <= 0:
+                    raise sqlite3.OperationalError(
+                        f"Timed out after {self.timeout:.1f}s waiting for a database connection")
+                waited = True
+                try:
+                    conn, released_at = self._idle.get(timeout=remaining)
+                except queue.Empty:
+                    continue
+
+            if (time.monotonic() - released_at >= self.health_check_interval
+                    and not self._is_healthy(conn)):
+                self._discard(conn)
+                continue
+            break
+
+        elapsed = time.perf_counter() - start
+        with self._lock:
+            self._checkouts += 1
+            self._wait_time += elapsed
+            self._max_wait_time = max(self._max_wait_time, elapsed)
+            if waited:
+                self._waits += 1
+        return conn
+
+    def _release(self, conn: sqlite3.Connection) -> None:
+        # Never hand out a connection with someone else's uncommitted work.
+        try:
+            if conn.in_transaction:
+                conn.rollback()
+        except sqlite3.Error:
+            self._discard(conn)
+            return
+        if self._closed:
+            self._discard(conn)
+            return
+        self._idle.put((conn, time.monotonic()))
+
+    @contextmanager
+    def connection(self):
+        """
+        Checks out a connection for the duration of the with-block.
+
+        Yields:
+            sqlite3.Connection: A connection owned by the calling thread until the block exits.
+
+        Raises:
+            sqlite3.OperationalError: If no connection frees up within the pool timeout.
+        """
+        held = getattr(self._local, "conn", None)
+        if held is not None:
+            self._local.depth += 1
+            try:
+                if not held.in_transaction:
+                    yield held
+                    return
+                nested = SavepointConnection(held, f"pool_nested_{self._local.depth}")
+                try:
+                    yield nested
+                except BaseException:
+                    try:
+                        nested.rollback()
+                    except sqlite3.Error:
+                        pass  # the outer transaction is already gone; its owner will see why
+                    raise
+                nested.commit()
+            finally:
+                self._local.depth -= 1
+            return
+
+        conn = self._acquire()
+        self._local.conn = conn
+        self._local.depth = 1
+        try:
+            yield conn
+        finally:
+            self._local.conn = None
+            self._local.depth = 0
+            self._release(conn)
+
+    def close(self) -> None:
+        """
+        Closes every idle connection and refuses further checkouts.
+        Connections still checked out are closed when they are released.
+        """
+        self._closed = True
+        while True:
+            try:
+                conn, _ = self._idle.get_nowait()
+            except queue.Empty:
+                break
+            self._discard(conn)
+        logger.info("Connection pool for %s closed.", self.db_path)
+
+    def stats(self) -> Dict[str, Any]:
+        """
+        Returns a snapshot of the pool metrics.
+
+        Returns:
+            Dict[str, Any]: Pool size, idle and in-use counts, checkout count,
+            wait statistics and health check failures.
+        """
+        with self._lock:
+            idle = self._idle.qsize()
+            return {
+                'max_size': self.max_size,
+                'size': self._size,
+                'idle': idle,
+                'in_use': self._size - idle,
+                'checkouts': self._checkouts,
+                'waits': self._waits,
+                'total_wait_time': self._wait_time,
+                'max_wait_time': self._max_wait_time,
+                'avg_wait_time': self._wait_time / self._checkouts if self._checkouts else 0.0,
+                'connections_created': self._created,
+                'health_check_failures': self._health_check_failures,
+            }
+
+
+_pool: Optional[ConnectionPool] = None
+_pool_lock = threading.Lock()
+
+
+def get_pool() -> ConnectionPool:
+    """
+    Returns the process-wide connection pool, creating it on first use.
+    The pool is rebuilt if DB_PATH has changed since it was created.
+    """
+    global _pool
+    pool = _pool
+    if pool is not None and pool.db_path == DB_PATH:
+        return pool
+    with _pool_lock:
+        if _pool is None or _pool.db_path != DB_PATH:
+            if _pool is not None:
+                _pool.close()
+            _pool = ConnectionPool(DB_PATH, max_size=DB_POOL_SIZE, timeout=DB_POOL_TIMEOUT,
+                                   health_check_interval=DB_POOL_HEALTH_CHECK_INTERVAL,
+                                   profile=get_storage_profile())
+        return _pool
+
+
+def reset_pool() -> None:
+    """
+    Closes the process-wide pool so the next checkout opens fresh connections.
+    Call this after forking a worker process or when DB_PATH changes.
+    """
+    global _pool
+    with _pool_lock:
+        if _pool is not None:
+            _pool.close()
+        _pool = None
+
+
+def get_pool_stats() -> Dict[str, Any]:
+    """
+    Returns the metrics of the process-wide connection pool.
+    """
+    return get_pool().stats()
+
+
+def _pool_connection_metrics() -> Dict[Tuple[str, ...], float]:
+    # Read the current pool without creating one just to report on it
+    pool = _pool
+    if pool is None:
+        return {}
+    stats = pool.stats()
+    return {('idle',): stats['idle'], ('in_use',): stats['in_use']}
+
+
+def _pool_wait_metrics() -> Dict[Tuple[str, ...], float]:
+    pool = _pool
+    if pool is None:
+        return {}
+    return {(): pool.stats()['total_wait_time']}
+
+
+metrics.registry.callback("meal_max_db_pool_connections", "Pooled SQLite connections by state.",
+                          "gauge", ("state",), _pool_connection_metrics)
+metrics.registry.callback("meal_max_db_pool_wait_seconds_total",
+                          "Time threads have spent waiting for a pooled connection.",
+                          "counter", (), _pool_wait_metrics)
+
 ###################################################
 #
 # This one yields rather than returns.
@@ -45,14 +566,9 @@ def check_table_exists(tablename: str):
 ###################################################
 @contextmanager
 def get_db_connection():
-    conn = None
     try:
-        conn = sqlite3.connect(DB_PATH)
-        yield conn
+        with get_pool().connection() as conn:
+            yield conn
     except sqlite3.Error as e:
         logger.error("Database connection error: %s", str(e))
         raise e
-    finally:
-        if conn:
-            conn.close()
-            logger.info("Database connection closed.")
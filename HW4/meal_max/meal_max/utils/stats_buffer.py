@@ -0,0 +1,342 @@
+import fcntl
+import glob
+import logging
+import os
+import threading
+import time
+from typing import Callable, Dict, IO, List, Optional, Tuple
+import uuid
+import weakref
+
+from meal_max.utils.logger import configure_logger
+
+logger = logging.getLogger(__name__)
+configure_logger(logger)
+
+
+# meal ID -> [battles, wins] increments
+Deltas = Dict[int, List[int]]
+
+JOURNAL_PATTERN = "stats-*.journal"
+
+# Live buffers, so each can be reset in a forked child
+_buffers: "weakref.WeakSet[StatsBuffer]" = weakref.WeakSet()
+
+
+def merge_deltas(target: Deltas, source: Deltas) -> None:
+    """
+    Adds every [battles, wins] increment in source into target.
+    """
+    for meal_id, (battles, wins) in source.items():
+        current = target.get(meal_id)
+        if current is None:
+            target[meal_id] = [battles, wins]
+        else:
+            current[0] += battles
+            current[1] += wins
+
+
+def journal_id(path: str) -> str:
+    """
+    Returns the ID a journal is recorded under once applied: its file name.
+    """
+    return os.path.basename(path)
+
+
+def read_journal(path: str) -> Deltas:
+    """
+    Sums the increments recorded in a journal file. A line torn by a crash
+    mid-write is skipped.
+
+    Args:
+        path (str): The journal file, one "meal_id battles wins" line per result.
+
+    Returns:
+        Deltas: The summed increments per meal.
+    """
+    deltas: Deltas = {}
+    with open(path) as f:
+        for line_number, line in enumerate(f, start=1):
+            try:
+                meal_id, battles, wins = (int(field) for field in line.split())
+            except ValueError:
+                logger.warning("Skipping malformed line %d of %s", line_number, path)
+                continue
+            merge_deltas(deltas, {meal_id: [battles, wins]})
+    return deltas
+
+
+class StatsBuffer:
+    """
+    Write-behind buffer for battle statistics.
+
+    Increments are summed per meal in memory and handed to the flush function in
+    one batch when max_pending results have been added, every flush_interval
+    seconds, and at close(). Until then each result is appended to a journal file
+    (written, not fsynced), so a process that dies without flushing loses nothing:
+    recover() replays journals left behind by dead processes. A live buffer holds
+    an exclusive lock on its journal, which is how recover() tells the two apart.
+
+    Every batch comes with the IDs of the journals it covers. The flush function
+    must record them in the same transaction as the increments, and skip a batch
+    whose journals are already recorded. A process that dies after committing a
+    batch but before deleting its journals then has nothing replayed twice.
+
+    Attributes:
+        flush_function (Callable[[Deltas, List[str]], None]): Applies a batch of increments
+            and records its journal IDs in one transaction.
+        max_pending (int): Results to gather before flushing from the caller's thread.
+        flush_interval (float): Seconds between background flushes.
+        journal_dir (Optional[str]): Where journals are written; None disables them.
+    """
+
+    def __init__(self, flush_function: Callable[[Deltas, List[str]], None], max_pending: int = 1000,
+                 flush_interval: float = 1.0, journal_dir: Optional[str] = None):
+        if max_pending < 1:
+            raise ValueError(f"Invalid max pending: {max_pending}. Must be at least 1.")
+        if flush_interval <= 0:
+            raise ValueError(f"Invalid flush interval: {flush_interval}. Must be positive.")
+        self.flush_function = flush_function
+        self.max_pending = max_pending
+        self.flush_interval = flush_interval
+        self.journal_dir = journal_dir
+
+        self._pending: Deltas = {}
+        self._pending_results = 0
+        # Bumped by every add and discard, for cache validators
+        self._generation = 0
+        self._updated_at = 0.0
+        # A batch being written; still counted by pending() until it commits
+        self._flushing: Deltas = {}
+        self._lock = threading.Lock()
+        self._flush_lock = threading.Lock()
+
+        self._journal: Optional[IO[str]] = None
+        # Journals whose results are in _pending or _flushing, kept open (and locked)
+        # until those commit
+        self._sealed: List[IO[str]] = []
+
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        _buffers.add(self)
+
+    def add(self, meal_id: int, battles: int, wins: int) -> None:
+        """
+        Buffers one battle result's increments for a meal, flushing if the buffer is full.
+        """
+        with self._lock:
+            if self._thread is None:
+                self._start()
+            merge_deltas(self._pending, {meal_id: [battles, wins]})
+            self._pending_results += 1
+            self._generation += 1
+            self._updated_at = time.time()
+            if self._journal is not None:
+                self._journal.write(f"{meal_id} {battles} {wins}\n")
+                self._journal.flush()
+            full = self._pending_results >= self.max_pending
+        if full:
+            self.flush()
+
+    def add_many(self, deltas: Deltas) -> None:
+        """
+        Buffers several meals' increments as one result.
+        """
+        with self._lock:
+            if self._thread is None:
+                self._start()
+            merge_deltas(self._pending, deltas)
+            self._pending_results += 1
+            self._generation += 1
+            self._updated_at = time.time()
+            if self._journal is not None:
+                self._journal.write("".join(f"{meal_id} {battles} {wins}\n"
+                                            for meal_id, (battles, wins) in deltas.items()))
+                self._journal.flush()
+            full = self._pending_results >= self.max_pending
+        if full:
+            self.flush()
+
+    def pending(self) -> Deltas:
+        """
+        Returns a copy of the increments not yet committed, including a batch being flushed.
+        """
+        with self._lock:
+            snapshot: Deltas = {}
+            merge_deltas(snapshot, self._flushing)
+            merge_deltas(snapshot, self._pending)
+            return snapshot
+
+    def changes(self) -> Optional[Tuple[int, float]]:
+        """
+        Returns the generation and time of the last add while increments are waiting
+        to be committed, or None when there are none.
+        """
+        with self._lock:
+            if not self._pending and not self._flushing:
+                return None
+            return self._generation, self._updated_at
+
+    def flush(self) -> int:
+        """
+        Hands every pending increment to the flush function in one batch. If it fails,
+        the increments go back into the buffer for the next attempt.
+
+        Returns:
+            int: The number of meals whose stats were written.
+        """
+        with self._flush_lock:
+            with self._lock:
+                if not self._pending:
+                    return 0
+                # Opened first, so a failure to create it leaves the buffer as it was
+                next_journal = self._open_journal() if self._journal is not None else None
+                batch, self._pending = self._pending, {}
+                results, self._pending_results = self._pending_results, 0
+                self._flushing = batch
+                if self._journal is not None:
+                    self._sealed.append(self._journal)
+                    self._journal = next_journal
+                sealed = list(self._sealed)
+
+            try:
+                self.flush_function(batch, [journal_id(journal.name) for journal in sealed])
+            except Exception:
+                with self._lock:
+                    self._flushing = {}
+                    merge_deltas(self._pending, batch)
+                    self._pending_results += results
+                raise
+
+            with self._lock:
+                self._flushing = {}
+                self._sealed = [journal for journal in self._sealed if journal not in sealed]
+            for journal in sealed:
+                _remove(journal.name)
+                journal.close()
+            logger.debug("Flushed stats for %d meals (%d results)", len(batch), results)
+            return len(batch)
+
+    def discard(self) -> None:
+        """
+        Drops every pending increment and its journals, for when the meals they
+        belong to are gone (the catalog was cleared).
+        """
+        with self._flush_lock, self._lock:
+            self._pending = {}
+            self._pending_results = 0
+            self._generation += 1
+            for journal in self._sealed:
+                _remove(journal.name)
+                journal.close()
+            self._sealed = []
+            if self._journal is not None:
+                self._journal.seek(0)
+                self._journal.truncate()
+
+    def recover(self) -> int:
+        """
+        Applies and deletes the journals of processes that died before flushing.
+
+        Returns:
+            int: The number of journals replayed.
+        """
+        if self.journal_dir is None:
+            return 0
+        replayed = 0
+        for path in sorted(glob.glob(os.path.join(self.journal_dir, JOURNAL_PATTERN))):
+            try:
+                f = open(path)
+            except FileNotFoundError:
+                continue
+            with f:
+                try:
+                    fcntl.flock(f, fcntl.LOCK_EX | fcntl.LOCK_NB)
+                except OSError:
+                    continue  # its process is alive, or it is one of ours
+                if os.fstat(f.fileno()).st_nlink == 0:
+                    continue  # another process replayed it while we waited
+                deltas = read_journal(path)
+                if deltas:
+                    self.flush_function(deltas, [journal_id(path)])
+                _remove(path)
+            logger.info("Replayed stats journal %s (%d meals)", path, len(deltas))
+            replayed += 1
+        return replayed
+
+    def close(self) -> None:
+        """
+        Stops the background thread, flushes what is left and removes the journal.
+        """
+        self._stop.set()
+        thread = self._thread
+        if thread is not None and thread is not threading.current_thread():
+            thread.join()
+        try:
+            self.flush()
+        except Exception as e:
+            logger.error("Could not flush buffered stats at close, leaving them in the journal: %s", e)
+            return
+        with self._lock:
+            if self._journal is not None:
+                path = self._journal.name
+                self._journal.close()
+                self._journal = None
+                _remove(path)
+            self._thread = None
+            self._stop.clear()
+
+    def _start(self) -> None:
+        # Called with _lock held, on the first add
+        if self.journal_dir is not None:
+            os.makedirs(self.journal_dir, exist_ok=True)
+            self._journal = self._open_journal()
+        self._thread = threading.Thread(target=self._run, name="stats-flush", daemon=True)
+        self._thread.start()
+
+    def _open_journal(self) -> IO[str]:
+        # A random name, created exclusively: journal IDs must never repeat, and a
+        # reused PID must not append to a dead process's journal
+        path = os.path.join(self.journal_dir, f"stats-{uuid.uuid4().hex}.journal")
+        journal = open(path, "a", opener=lambda name, flags: os.open(name, flags | os.O_EXCL, 0o644))
+        fcntl.flock(journal, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        return journal
+
+    def _run(self) -> None:
+        while not self._stop.wait(self.flush_interval):
+            try:
+                self.flush()
+            except Exception as e:
+                logger.error("Background stats flush failed, will retry: %s", e)
+
+    def _after_fork(self) -> None:
+        # The parent owns the journal, the pending increments and the thread; the
+        # child starts empty and builds its own on first use. Closing the inherited
+        # descriptors leaves the parent's journal locks in place.
+        for journal in self._sealed + [self._journal]:
+            if journal is not None:
+                journal.close()
+        self._lock = threading.Lock()
+        self._flush_lock = threading.Lock()
+        self._pending = {}
+        self._pending_results = 0
+        self._flushing = {}
+        self._journal = None
+        self._sealed = []
+        self._stop = threading.Event()
+        self._thread = None
+
+
+def _remove(path: str) -> None:
+    try:
+        os.remove(path)
+    except FileNotFoundError:
+        pass
+
+
+def _reset_after_fork() -> None:
+    for buffer in list(_buffers):
+        buffer._after_fork()
+
+
+os.register_at_fork(after_in_child=_reset_after_fork)
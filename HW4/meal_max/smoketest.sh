@@ -18,7 +18,7 @@ done
 # Function to check the health of the service
 check_health() {
   echo "Checking health status..."
-  curl -s -X GET "$BASE_URL/health" | grep -q '"status": "healthy"'
+  curl -s -X GET "$BASE_URL/health" | grep -q '"status": *"healthy"'
   if [ $? -eq 0 ]; then
     echo "Service is healthy."
   else
@@ -30,7 +30,7 @@ check_health() {
 # Function to check the database connection
 check_db() {
   echo "Checking database connection..."
-  curl -s -X GET "$BASE_URL/db-check" | grep -q '"database_status": "healthy"'
+  curl -s -X GET "$BASE_URL/db-check" | grep -q '"database_status": *"healthy"'
   if [ $? -eq 0 ]; then
     echo "Database connection is healthy."
   else
@@ -47,7 +47,7 @@ create_meal() {
 
   echo "Adding meal ($meal, $cuisine, $price, $difficulty) to the combatant list..."
   curl -s -X POST "$BASE_URL/create-meal" -H "Content-Type: application/json" \
-    -d "{\"meal\":\"$meal\", \"cuisine\":\"$cuisine\", \"price\":\"$price\", \"difficulty\":\"$difficulty\"}" | grep -q '"status": "success"'
+    -d "{\"meal\":\"$meal\", \"cuisine\":\"$cuisine\", \"price\":\"$price\", \"difficulty\":\"$difficulty\"}" | grep -q '"status": *"success"'
 
   if [ $? -eq 0 ]; then
     echo "meal added successfully."
@@ -62,7 +62,7 @@ delete_meal() {
 
   echo "Deleting meal by ID ($meal_id)..."
   response=$(curl -s -X DELETE "$BASE_URL/delete-meal/$meal_id")
-  if echo "$response" | grep -q '"status": "success"'; then
+  if echo "$response" | grep -q '"status": *"success"'; then
     echo "meal deleted successfully by ID ($meal_id)."
   else
     echo "Failed to delete meal by ID ($meal_id)."
@@ -73,7 +73,7 @@ delete_meal() {
 get_combatants() {
   echo "Getting all meals in the combatants list..."
   response=$(curl -s -X GET "$BASE_URL/get-combatants")
-  if echo "$response" | grep -q '"status": "success"'; then
+  if echo "$response" | grep -q '"status": *"success"'; then
     echo "All meals retrieved successfully."
     if [ "$ECHO_JSON" = true ]; then
       echo "Meals JSON:"
@@ -90,7 +90,7 @@ get_meal_by_id() {
 
   echo "Getting meal by ID ($meal_id)..."
   response=$(curl -s -X GET "$BASE_URL/get-meal-by-id/$meal_id")
-  if echo "$response" | grep -q '"status": "success"'; then
+  if echo "$response" | grep -q '"status": *"success"'; then
     echo "meal retrieved successfully by ID ($meal_id)."
     if [ "$ECHO_JSON" = true ]; then
       echo "meal JSON (ID $meal_id):"
@@ -113,7 +113,7 @@ prep_combatant() {
     -H "Content-Type: application/json" \
     -d "{\"meal\":\"$meal\", \"cuisine\":\"$cuisine\", \"price\":$price, \"difficult\":\"$difficult\"}")
 
-  if echo "$response" | grep -q '"status": "success"'; then
+  if echo "$response" | grep -q '"status": *"success"'; then
     echo "meal added to combatants list successfully."
     if [ "$ECHO_JSON" = true ]; then
       echo "meal JSON:"
@@ -143,7 +143,7 @@ clear_combatants() {
   echo "Clearing combatants list..."
   response=$(curl -s -X POST "$BASE_URL/clear-combatants")
 
-  if echo "$response" | grep -q '"status": "success"'; then
+  if echo "$response" | grep -q '"status": *"success"'; then
     echo "Combatants list cleared successfully."
   else
     echo "Failed to clear combatants list."
@@ -153,7 +153,7 @@ clear_combatants() {
 
 battle() {
   echo "Battling current combatants..."
-  curl -s -X GET "$BASE_URL/battle" | grep -q '"status": "success"'
+  curl -s -X GET "$BASE_URL/battle" | grep -q '"status": *"success"'
 
   if [ $? -eq 0 ]; then
     echo "combatants battled successfully."
@@ -167,7 +167,7 @@ get_leaderboard() {
   sort_by=$1
   echo "Getting leaderboard sorted by $sort_by..."
   response=$(curl -s -X GET "$BASE_URL/leaderboard?sort_by=$sort_by")
-  if echo "$response" | grep -q '"status": "success"'; then
+  if echo "$response" | grep -q '"status": *"success"'; then
     echo "Leaderboard retrieved successfully."
     if [ "$ECHO_JSON" = true ]; then
       echo "Leaderboard JSON:"
@@ -179,6 +179,21 @@ get_leaderboard() {
   fi
 }
 
+check_leaderboard_not_modified() {
+  echo "Revalidating the leaderboard with its ETag..."
+  # Each worker caches the change counters for DATA_VERSION_TTL seconds, so wait
+  # for every worker to see the last write before comparing ETags across them
+  sleep "${DATA_VERSION_TTL:-1}"
+  etag=$(curl -s -D - -o /dev/null "$BASE_URL/leaderboard" | tr -d '\r' | sed -n 's/^[Ee][Tt]ag: //p')
+  status=$(curl -s -o /dev/null -w '%{http_code}' -H "If-None-Match: $etag" "$BASE_URL/leaderboard")
+  if [ -n "$etag" ] && [ "$status" = "304" ]; then
+    echo "Leaderboard not modified, as expected."
+  else
+    echo "Expected 304 for ETag '$etag', got $status."
+    exit 1
+  fi
+}
+
 check_health
 check_db
 
@@ -206,5 +221,6 @@ get_combatants
 delete_meal 3
 
 get_leaderboard "wins"
+check_leaderboard_not_modified
 
 echo "All tests passed successfully!"
\ No newline at end of file
@@ -7,5 +7,27 @@ CREATE TABLE meals (
     difficulty TEXT CHECK(difficulty IN ('HIGH', 'MED', 'LOW')),
     battles INTEGER DEFAULT 0,
     wins INTEGER DEFAULT 0,
-    deleted BOOLEAN DEFAULT FALSE
-);
\ No newline at end of file
+    deleted BOOLEAN DEFAULT FALSE,
+    -- Added by migration 0003; see kitchen_model.compute_battle_score.
+    battle_score REAL
+);
+
+-- Leaderboard views: walking one of these partial indexes yields active meals
+-- already in rank order, so a top-K page reads K index entries instead of
+-- sorting the whole table. SQLite keeps them current as battle results are
+-- written. Queries must spell the filter exactly as "deleted = 0 AND battles > 0"
+-- for the planner to match them.
+CREATE INDEX idx_meals_leaderboard_wins ON meals (wins DESC, id)
+    WHERE deleted = 0 AND battles > 0;
+CREATE INDEX idx_meals_leaderboard_win_pct ON meals ((wins * 1.0 / battles) DESC, id)
+    WHERE deleted = 0 AND battles > 0;
+
+-- The remaining indexes from the migrations. This script only recreates meals and
+-- leaves PRAGMA user_version alone, so on an existing database no migration runs
+-- again: meals must come out of here with every migration's changes to it already
+-- applied. Migrations that change meals must be mirrored here.
+CREATE INDEX idx_meals_cuisine_difficulty ON meals (cuisine, difficulty);
+CREATE INDEX idx_meals_difficulty ON meals (difficulty);
+CREATE INDEX idx_meals_cuisine ON meals (cuisine);
+CREATE INDEX idx_meals_battle_score ON meals (battle_score, id)
+    WHERE deleted = 0;
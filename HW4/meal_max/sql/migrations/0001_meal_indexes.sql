@@ -0,0 +1,11 @@
+-- Secondary indexes for the meals table.
+
+-- Leaderboard views (also in create_meal_table.sql for fresh databases).
+CREATE INDEX IF NOT EXISTS idx_meals_leaderboard_wins ON meals (wins DESC, id)
+    WHERE deleted = 0 AND battles > 0;
+CREATE INDEX IF NOT EXISTS idx_meals_leaderboard_win_pct ON meals ((wins * 1.0 / battles) DESC, id)
+    WHERE deleted = 0 AND battles > 0;
+
+-- Catalog filters by cuisine (optionally narrowed by difficulty) and by difficulty alone.
+CREATE INDEX IF NOT EXISTS idx_meals_cuisine_difficulty ON meals (cuisine, difficulty);
+CREATE INDEX IF NOT EXISTS idx_meals_difficulty ON meals (difficulty);
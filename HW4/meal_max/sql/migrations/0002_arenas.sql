@@ -0,0 +1,8 @@
+-- Battle arenas: the combatants prepped in each arena, shared by all worker processes.
+-- lock_token/lock_expires form a lease so only one request works on an arena at a time.
+CREATE TABLE IF NOT EXISTS arenas (
+    arena_id TEXT PRIMARY KEY,
+    combatants TEXT NOT NULL DEFAULT '[]',
+    lock_token TEXT,
+    lock_expires REAL
+);
@@ -0,0 +1,13 @@
+-- Battle scores, stored when a meal is created. A score depends only on the
+-- price, cuisine and difficulty, none of which change after creation.
+-- The formula must match kitchen_model.compute_battle_score. The column is also in
+-- create_meal_table.sql, so on a freshly created database the ALTER is skipped.
+ALTER TABLE meals ADD COLUMN battle_score REAL;
+
+UPDATE meals SET battle_score = price * length(cuisine)
+    - CASE difficulty WHEN 'HIGH' THEN 1 WHEN 'MED' THEN 2 WHEN 'LOW' THEN 3 END;
+
+-- Score-range lookups over active meals, e.g. finding a close-matched opponent.
+-- Queries must spell the filter exactly as "deleted = 0" for the planner to match it.
+CREATE INDEX IF NOT EXISTS idx_meals_battle_score ON meals (battle_score, id)
+    WHERE deleted = 0;
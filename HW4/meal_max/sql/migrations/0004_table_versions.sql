@@ -0,0 +1,12 @@
+-- Change counters for HTTP caching. Each write bumps the counter for the data it
+-- changes, in the same transaction: 'meals' for the catalog (meals created or
+-- deleted) and 'meal_stats' for battle results. updated_at is a Unix time.
+CREATE TABLE IF NOT EXISTS table_versions (
+    name TEXT PRIMARY KEY,
+    version INTEGER NOT NULL DEFAULT 0,
+    updated_at REAL NOT NULL
+);
+
+INSERT OR IGNORE INTO table_versions (name, version, updated_at) VALUES
+    ('meals', 0, (julianday('now') - 2440587.5) * 86400.0),
+    ('meal_stats', 0, (julianday('now') - 2440587.5) * 86400.0);
@@ -0,0 +1,4 @@
+-- Catalog browsing by cuisine in ID order (list_meals). With the ID implied at
+-- the end of the key, "cuisine = ? AND id > ? ORDER BY id" is a single seek;
+-- idx_meals_cuisine_difficulty only covers that when the difficulty is fixed too.
+CREATE INDEX IF NOT EXISTS idx_meals_cuisine ON meals (cuisine);
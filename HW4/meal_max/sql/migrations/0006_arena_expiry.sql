@@ -0,0 +1,7 @@
+-- When each arena was last held, so arenas idle for ARENA_IDLE_TTL seconds can be
+-- dropped. Existing arenas count as used now; a re-run leaves stamped ones alone.
+ALTER TABLE arenas ADD COLUMN last_used REAL NOT NULL DEFAULT 0;
+
+UPDATE arenas SET last_used = CAST(strftime('%s', 'now') AS REAL) WHERE last_used = 0;
+
+CREATE INDEX IF NOT EXISTS idx_arenas_last_used ON arenas (last_used);
@@ -0,0 +1,9 @@
+-- Write-behind stats journals whose increments are committed. A journal's ID is
+-- written in the same transaction as its increments, so a journal left behind by
+-- a crash between that commit and the journal's removal is not applied twice.
+CREATE TABLE IF NOT EXISTS applied_journals (
+    journal_id TEXT PRIMARY KEY,
+    applied_at REAL NOT NULL
+);
+
+CREATE INDEX IF NOT EXISTS idx_applied_journals_applied_at ON applied_journals (applied_at);
@@ -0,0 +1,13 @@
+import pytest
+
+from meal_max.models.kitchen_model import data_version_cache, meal_cache
+
+
+@pytest.fixture(autouse=True)
+def clear_meal_cache():
+    """Fixture to keep cached meals and change counters from leaking between tests."""
+    meal_cache.clear()
+    data_version_cache.clear()
+    yield
+    meal_cache.clear()
+    data_version_cache.clear()
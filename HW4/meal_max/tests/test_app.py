@@ -0,0 +1,104 @@
+import sqlite3
+
+import pytest
+
+from app import create_app
+from meal_max.models import kitchen_model
+from meal_max.utils import sql_utils
+
+######################################################
+#
+#    Fixtures
+#
+######################################################
+
+@pytest.fixture
+def client(tmp_path, monkeypatch):
+    """Fixture providing a test client on a temporary database with two meals."""
+    db_path = str(tmp_path / "meal_max.db")
+    conn = sqlite3.connect(db_path)
+    with open("sql/create_meal_table.sql") as f:
+        conn.executescript(f.read())
+    conn.close()
+    monkeypatch.setattr(sql_utils, "DB_PATH", db_path)
+    sql_utils.reset_pool()
+
+    app = create_app()
+    kitchen_model.create_meal("Pasta", "Italian", 12.5, "MED")
+    kitchen_model.create_meal("Tacos", "Mexican", 8.0, "LOW")
+    yield app.test_client()
+    sql_utils.reset_pool()
+
+######################################################
+#
+#    Conditional GETs
+#
+######################################################
+
+def test_matching_etag_is_not_modified(client):
+    """Test that a request carrying the current ETag gets an empty 304 with the same validators."""
+    response = client.get("/api/get-meal-by-id/1")
+    assert response.status_code == 200
+    assert response.headers['Cache-Control'] == 'no-cache'
+
+    revalidated = client.get("/api/get-meal-by-id/1", headers={'If-None-Match': response.headers['ETag']})
+    assert revalidated.status_code == 304
+    assert revalidated.data == b""
+    assert revalidated.headers['ETag'] == response.headers['ETag']
+
+def test_etag_is_per_resource(client):
+    """Test that one meal's ETag does not validate another meal, name or query."""
+    etag = client.get("/api/get-meal-by-id/1").headers['ETag']
+
+    for path in ("/api/get-meal-by-id/2", "/api/get-meal-by-name/Pasta", "/api/meals?limit=1"):
+        response = client.get(path, headers={'If-None-Match': etag})
+        assert response.status_code == 200, path
+        assert response.headers['ETag'] != etag
+
+    page = client.get("/api/meals?limit=1").headers['ETag']
+    assert client.get("/api/meals?limit=2", headers={'If-None-Match': page}).status_code == 200
+    assert client.get("/api/meals?limit=1", headers={'If-None-Match': page}).status_code == 304
+
+def test_write_changes_etag(client):
+    """Test that a write in between turns the old ETag into a full response."""
+    etag = client.get("/api/leaderboard").headers['ETag']
+    assert client.get("/api/leaderboard", headers={'If-None-Match': etag}).status_code == 304
+
+    kitchen_model.record_battle_result(1, 2)
+
+    response = client.get("/api/leaderboard", headers={'If-None-Match': etag})
+    assert response.status_code == 200
+    assert response.headers['ETag'] != etag
+
+def test_if_modified_since_alone_is_ignored(client):
+    """Test that If-Modified-Since does not produce a 304, since it cannot see writes within a second."""
+    response = client.get("/api/get-meal-by-id/1")
+    revalidated = client.get("/api/get-meal-by-id/1",
+                             headers={'If-Modified-Since': response.headers['Last-Modified']})
+    assert revalidated.status_code == 200
+
+def test_last_modified_is_not_before_the_change(client):
+    """Test that Last-Modified is rounded up to the next whole second."""
+    _, updated_at = kitchen_model.get_data_version(("meals",))
+    response = client.get("/api/get-meal-by-id/1")
+    assert response.last_modified.timestamp() >= updated_at
+    assert response.last_modified.timestamp() - updated_at < 1
+
+def test_errors_carry_no_validators(client):
+    """Test that a missing meal is not given an ETag."""
+    response = client.get("/api/get-meal-by-id/99")
+    assert response.status_code != 200
+    assert 'ETag' not in response.headers
+
+######################################################
+#
+#    Meal listing
+#
+######################################################
+
+@pytest.mark.parametrize("query", ["min_price=nan", "max_price=inf", "min_price=-inf&max_price=10"])
+def test_list_meals_rejects_non_finite_prices(client, query):
+    """Test that a nan or infinite price bound is a 400 rather than an empty or unfiltered page."""
+    response = client.get(f"/api/meals?{query}")
+    assert response.status_code == 400
+    assert "Invalid price bound" in response.get_json()['error']
@@ -0,0 +1,210 @@
+import sqlite3
+import threading
+
+import pytest
+
+from meal_max.models import arena_store as arena_store_module
+from meal_max.models.arena_store import InMemoryArenaStore, SQLiteArenaStore, create_arena_store
+from meal_max.models.kitchen_model import Meal
+from meal_max.utils import sql_utils
+from meal_max.utils.migrations import apply_migrations
+
+######################################################
+#
+#    Fixtures
+#
+######################################################
+
+@pytest.fixture
+def sample_meal1():
+    return Meal(1, "Dumplings", "Chinese", 100, "LOW")
+
+@pytest.fixture
+def sample_meal2():
+    return Meal(2, "Steak", "American", 50, "MED")
+
+@pytest.fixture
+def arena_db(tmp_path, monkeypatch):
+    """Fixture pointing the pool at a migrated temporary database."""
+    db_path = str(tmp_path / "meal_max.db")
+    conn = sqlite3.connect(db_path)
+    with open("sql/create_meal_table.sql") as f:
+        conn.executescript(f.read())
+    apply_migrations(conn)
+    conn.close()
+    monkeypatch.setattr(sql_utils, "DB_PATH", db_path)
+    sql_utils.reset_pool()
+    yield db_path
+    sql_utils.reset_pool()
+
+@pytest.fixture(params=["memory", "sqlite"])
+def store(request):
+    """Fixture providing each kind of arena store."""
+    if request.param == "sqlite":
+        request.getfixturevalue("arena_db")
+        return SQLiteArenaStore()
+    return InMemoryArenaStore()
+
+######################################################
+#
+#    Tests shared by both stores
+#
+######################################################
+
+def test_arena_persists_combatants(store, sample_meal1):
+    """Test that combatants prepped in an arena are there next time."""
+    with store.arena("a") as battle_model:
+        battle_model.prep_combatant(sample_meal1)
+    with store.arena("a") as battle_model:
+        assert battle_model.combatants == [sample_meal1]
+
+def test_arenas_are_independent(store, sample_meal1, sample_meal2):
+    """Test that arenas do not share combatants."""
+    with store.arena("a") as battle_model:
+        battle_model.prep_combatant(sample_meal1)
+    with store.arena("b") as battle_model:
+        battle_model.prep_combatant(sample_meal2)
+    with store.arena("a") as battle_model:
+        assert battle_model.combatants == [sample_meal1]
+
+def test_arena_delete(store, sample_meal1):
+    """Test that a deleted arena starts over empty."""
+    with store.arena("a") as battle_model:
+        battle_model.prep_combatant(sample_meal1)
+    store.delete("a")
+    with store.arena("a") as battle_model:
+        assert battle_model.combatants == []
+
+def test_arena_count_combatants(store, sample_meal1, sample_meal2):
+    """Test counting combatants without creating missing arenas."""
+    assert store.count_combatants("a") == 0
+    with store.arena("a") as battle_model:
+        battle_model.prep_combatant(sample_meal1)
+        battle_model.prep_combatant(sample_meal2)
+    assert store.count_combatants("a") == 2
+
+def test_arena_invalid_id(store):
+    """Test error handling for an invalid arena ID."""
+    with pytest.raises(ValueError, match="Invalid arena ID"):
+        with store.arena("../etc"):
+            pass
+
+def test_arena_busy(store, monkeypatch):
+    """Test that a second holder waits, then gives up while the arena is held."""
+    monkeypatch.setattr(arena_store_module, "ARENA_LOCK_WAIT", 0.05)
+    held = threading.Event()
+    release = threading.Event()
+
+    def holder():
+        with store.arena("a"):
+            held.set()
+            release.wait(1)
+
+    thread = threading.Thread(target=holder)
+    thread.start()
+    held.wait(1)
+    try:
+        with pytest.raises(RuntimeError, match="Arena a is busy"):
+            with store.arena("a"):
+                pass
+    finally:
+        release.set()
+        thread.join()
+
+def test_arena_delete_while_waiting(store, sample_meal1):
+    """Test that a caller waiting on an arena that gets deleted still has it to itself."""
+    entered = threading.Event()
+    release = threading.Event()
+    holders = []
+
+    def holder():
+        with store.arena("a"):
+            entered.set()
+            release.wait(1)
+
+    def waiter():
+        with store.arena("a") as battle_model:
+            holders.append(battle_model)
+            battle_model.prep_combatant(sample_meal1)
+
+    first = threading.Thread(target=holder)
+    first.start()
+    entered.wait(1)
+    second = threading.Thread(target=waiter)
+    second.start()
+    deleter = threading.Thread(target=store.delete, args=("a",))
+    deleter.start()
+    release.set()
+    for thread in (first, second, deleter):
+        thread.join(2)
+    assert len(holders) == 1
+    # Whatever order the waiter and the delete ran in, a single lock was involved throughout
+    with store.arena("a") as battle_model:
+        assert battle_model.combatants in ([], [sample_meal1])
+
+def test_arena_idle_arenas_expire(store, sample_meal1, monkeypatch):
+    """Test that idle arenas are dropped when a new arena needs room."""
+    monkeypatch.setattr(arena_store_module, "ARENA_MAX_COUNT", 1)
+    with store.arena("a") as battle_model:
+        battle_model.prep_combatant(sample_meal1)
+    with pytest.raises(RuntimeError, match="Too many arenas"):
+        with store.arena("b"):
+            pass
+    assert store.count_combatants("a") == 1
+
+    monkeypatch.setattr(arena_store_module, "ARENA_IDLE_TTL", -1)
+    with store.arena("b"):
+        pass
+    assert store.count_combatants("a") == 0
+
+######################################################
+#
+#    Tests for InMemoryArenaStore
+#
+######################################################
+
+def test_memory_arena_retries_lock_discarded_by_delete(monkeypatch):
+    """Test that a caller who fetched an arena's lock just before a delete takes the new lock."""
+    store = InMemoryArenaStore()
+    stale_lock = store._arena_lock("a")
+    store.delete("a")
+
+    fetch_lock = store._arena_lock
+    stale = [stale_lock]
+    monkeypatch.setattr(store, "_arena_lock", lambda arena_id: stale.pop() if stale else fetch_lock(arena_id))
+
+    with store.arena("a"):
+        assert not stale_lock.locked()
+        assert store._locks["a"] is not stale_lock
+        assert store._locks["a"].locked()
+
+######################################################
+#
+#    Tests for SQLiteArenaStore
+#
+######################################################
+
+def test_sqlite_arena_error_keeps_previous_state(arena_db, sample_meal1, sample_meal2):
+    """Test that an error inside the block releases the arena without saving."""
+    store = SQLiteArenaStore()
+    with store.arena("a") as battle_model:
+        battle_model.prep_combatant(sample_meal1)
+    with pytest.raises(ValueError):
+        with store.arena("a") as battle_model:
+            battle_model.prep_combatant(sample_meal2)
+            raise ValueError("boom")
+    with store.arena("a") as battle_model:
+        assert battle_model.combatants == [sample_meal1]
+
+def test_sqlite_arena_expired_lease_is_taken_over(arena_db, monkeypatch):
+    """Test that a lease left behind by a dead holder expires."""
+    monkeypatch.setattr(arena_store_module, "ARENA_LOCK_TIMEOUT", -1)
+    store = SQLiteArenaStore()
+    store._acquire("a", "dead-holder")
+    with store.arena("a") as battle_model:
+        assert battle_model.combatants == []
+
+def test_create_arena_store_unknown():
+    """Test error handling for an unknown store name."""
+    with pytest.raises(ValueError, match="Unknown arena store"):
+        create_arena_store("redis")
@@ -0,0 +1,191 @@
+import asyncio
+import threading
+
+import httpx
+import pytest
+from flask import Flask
+
+from asgi import AsyncBattleApp, ThreadedWsgiApp
+from meal_max.models.arena_store import InMemoryArenaStore
+from meal_max.models.kitchen_model import Meal
+from meal_max.utils import metrics
+
+######################################################
+#
+#    Fixtures
+#
+######################################################
+
+@pytest.fixture
+def store():
+    """Fixture providing an arena store with two combatants in the default arena."""
+    store = InMemoryArenaStore()
+    with store.arena("default") as battle_model:
+        battle_model.combatants.extend([Meal(1, "Dumplings", "Chinese", 100, "LOW"),
+                                        Meal(2, "Steak", "American", 50, "MED")])
+    return store
+
+@pytest.fixture
+def mock_record_battle_result(mocker):
+    return mocker.patch("meal_max.models.battle_model.record_battle_result")
+
+@pytest.fixture
+def asgi_app(store):
+    """Fixture wrapping a one-route Flask app with the async battle routes."""
+    flask_app = Flask(__name__)
+
+    @flask_app.route('/api/health')
+    def health():
+        return {'status': 'healthy'}
+
+    return AsyncBattleApp(flask_app, store, random_provider_name="seeded")
+
+def request(app, method, path):
+    """Helper sending one request through the ASGI app between startup and shutdown."""
+    async def main():
+        await app.startup()
+        try:
+            transport = httpx.ASGITransport(app=app)
+            async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+                return await client.request(method, path)
+        finally:
+            await app.shutdown()
+    return asyncio.run(main())
+
+######################################################
+#
+#    Routes
+#
+######################################################
+
+def test_battle(asgi_app, store, mock_record_battle_result):
+    """Test a battle in the default arena through the async path."""
+    response = request(asgi_app, "GET", "/api/battle")
+
+    assert response.status_code == 200
+    assert response.json()['status'] == 'success'
+    winner = response.json()['winner']
+    assert winner in ("Dumplings", "Steak")
+    mock_record_battle_result.assert_called_once()
+    with store.arena("default") as battle_model:
+        assert [meal.meal for meal in battle_model.combatants] == [winner]
+
+def test_battle_in_named_arena_without_combatants(asgi_app, mock_record_battle_result, mocker):
+    """Test that an empty arena reports the same error as the Flask route without drawing a number."""
+    mock_get_random = mocker.patch("meal_max.utils.random_utils.SeededRandomProvider.get_random")
+    response = request(asgi_app, "GET", "/api/arenas/empty/battle")
+
+    assert response.status_code == 500
+    assert response.json() == {'error': 'Two combatants must be prepped for a battle.'}
+    mock_record_battle_result.assert_not_called()
+    mock_get_random.assert_not_called()
+
+def test_other_routes_fall_through_to_flask(asgi_app):
+    """Test that non-battle requests are served by the WSGI app."""
+    assert request(asgi_app, "GET", "/api/health").json() == {'status': 'healthy'}
+    assert request(asgi_app, "GET", "/api/arenas/bad id!/battle").status_code == 404
+
+def test_fallback_streams_request_body():
+    """Test that the WSGI app reads the body as it arrives rather than after buffering it."""
+    reads = []
+
+    def wsgi_app(environ, start_response):
+        stream = environ['wsgi.input']
+        for line in iter(stream.readline, b""):
+            reads.append(line)
+        start_response("200 OK", [("Content-Type", "text/plain")])
+        return [b"read ", str(len(reads)).encode()]
+
+    async def main():
+        chunks = [b"a\n", b"b\n", b"c\n"]
+        received = []
+
+        async def receive():
+            # Every chunk after the first is only handed over once the app has read the previous one
+            if received:
+                assert reads == chunks[:len(received)]
+            received.append(chunks[len(received)])
+            return {'type': 'http.request', 'body': received[-1], 'more_body': len(received) < len(chunks)}
+
+        sent = []
+
+        async def send(message):
+            sent.append(message)
+
+        scope = {'type': 'http', 'method': 'POST', 'path': '/upload', 'query_string': b"", 'headers': []}
+        await ThreadedWsgiApp(wsgi_app)(scope, receive, send)
+        return sent
+
+    sent = asyncio.run(main())
+    assert reads == [b"a\n", b"b\n", b"c\n"]
+    assert sent[0]['status'] == 200
+    assert b"".join(message.get('body', b"") for message in sent[1:]) == b"read 3"
+
+def test_fallback_serves_requests_concurrently():
+    """Test that one slow Flask request does not hold up the others."""
+    flask_app = Flask(__name__)
+    release = threading.Event()
+
+    @flask_app.route('/slow')
+    def slow():
+        release.wait(5)
+        return {'status': 'slow'}
+
+    @flask_app.route('/fast')
+    def fast():
+        release.set()
+        return {'status': 'fast'}
+
+    app = ThreadedWsgiApp(flask_app, max_workers=2)
+
+    async def main():
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+            return await asyncio.gather(client.get("/slow"), client.get("/fast"))
+
+    try:
+        slow_response, fast_response = asyncio.run(main())
+    finally:
+        app.shutdown()
+    assert release.is_set()
+    assert slow_response.json() == {'status': 'slow'}
+    assert fast_response.json() == {'status': 'fast'}
+
+def test_battle_before_startup(asgi_app):
+    """Test that battles are refused until lifespan startup has run."""
+    async def main():
+        transport = httpx.ASGITransport(app=asgi_app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+            return await client.get("/api/battle")
+
+    assert asyncio.run(main()).status_code == 503
+
+def test_lifespan(asgi_app):
+    """Test the lifespan protocol sets up and tears down the async resources."""
+    sent = []
+
+    async def main():
+        messages = asyncio.Queue()
+        for message_type in ("lifespan.startup", "lifespan.shutdown"):
+            messages.put_nowait({'type': message_type})
+
+        async def send(message):
+            sent.append(message['type'])
+            if message['type'] == 'lifespan.startup.complete':
+                assert asgi_app.random_provider is not None
+                assert asgi_app.executor is not None
+
+        await asgi_app({'type': 'lifespan'}, messages.get, send)
+
+    asyncio.run(main())
+    assert sent == ['lifespan.startup.complete', 'lifespan.shutdown.complete']
+
+def test_battle_latency_is_recorded(asgi_app, mock_record_battle_result):
+    """Test that async battles show up under the same route label as the Flask rule."""
+    metrics.registry.clear()
+    request(asgi_app, "GET", "/api/battle")
+    request(asgi_app, "GET", "/api/arenas/empty/battle")
+
+    series = metrics.http_request_duration.snapshot()
+    assert series[("GET", "/api/battle", "200")][2] == 1
+    assert series[("GET", "/api/arenas/<arena_id:arena_id>/battle", "500")][2] == 1
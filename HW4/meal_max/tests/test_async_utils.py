@@ -0,0 +1,59 @@
+import asyncio
+import threading
+import time
+
+import pytest
+
+from meal_max.utils.async_utils import BoundedExecutor
+
+
+def test_run_returns_result_from_worker_thread():
+    """Test that calls run in the pool and their results come back."""
+    executor = BoundedExecutor(max_workers=2, max_pending=4)
+
+    async def main():
+        return await executor.run(lambda a, b=0: (threading.current_thread().name, a + b), 1, b=2)
+
+    name, total = asyncio.run(main())
+    executor.shutdown()
+
+    assert total == 3
+    assert name.startswith("async-db")
+
+def test_run_propagates_exceptions():
+    """Test that an exception raised in the pool reaches the awaiting coroutine."""
+    executor = BoundedExecutor(max_workers=1, max_pending=1)
+
+    def fail():
+        raise ValueError("boom")
+
+    with pytest.raises(ValueError, match="boom"):
+        asyncio.run(executor.run(fail))
+    assert executor.pending == 0
+    executor.shutdown()
+
+def test_pending_is_bounded():
+    """Test that no more than max_pending calls are queued or running at once."""
+    executor = BoundedExecutor(max_workers=2, max_pending=3)
+    peak = 0
+
+    def work():
+        nonlocal peak
+        peak = max(peak, executor.pending)
+        time.sleep(0.01)
+
+    async def main():
+        await asyncio.gather(*(executor.run(work) for _ in range(20)))
+
+    asyncio.run(main())
+    executor.shutdown()
+
+    assert 1 <= peak <= 3
+    assert executor.pending == 0
+
+def test_invalid_sizes():
+    """Test that nonsensical pool sizes are rejected."""
+    with pytest.raises(ValueError, match="Invalid worker count: 0"):
+        BoundedExecutor(max_workers=0)
+    with pytest.raises(ValueError, match="Invalid max pending: 1"):
+        BoundedExecutor(max_workers=2, max_pending=1)
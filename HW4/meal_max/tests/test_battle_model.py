@@ -81,3 +81,15 @@ def test_battle_with_one_meal_battles(battle_model, sample_meal1):
     with pytest.raises(ValueError, match="Two combatants must be prepped for a battle."):
         battle_model.battle()
 
+def test_battle_records_result_once(battle_model, sample_meal1, sample_meal2, mocker):
+    """Test that a battle records both combatants' stats in a single call."""
+    mocker.patch("meal_max.models.battle_model.get_random", return_value=0.0)
+    mock_record = mocker.patch("meal_max.models.battle_model.record_battle_result")
+    battle_model.prep_combatant(sample_meal1)
+    battle_model.prep_combatant(sample_meal2)
+
+    winner = battle_model.battle()
+
+    assert winner == "Dumplings"
+    mock_record.assert_called_once_with(1, 2)
+    assert battle_model.combatants == [sample_meal1]
@@ -0,0 +1,62 @@
+import pytest
+
+from meal_max.utils.cache import LRUCache
+
+
+def test_cache_hit_and_miss():
+    """Test that stored values are returned and counted."""
+    cache = LRUCache(max_size=2)
+    assert cache.get("a") is None
+    cache.set("a", 1)
+    assert cache.get("a") == 1
+    stats = cache.stats()
+    assert stats['hits'] == 1
+    assert stats['misses'] == 1
+
+def test_cache_alias_lookup():
+    """Test that an entry can be found through an alias key."""
+    cache = LRUCache()
+    cache.set(("id", 1), "Pasta", aliases=[("name", "Pasta")])
+    assert cache.get(("name", "Pasta")) == "Pasta"
+
+def test_cache_invalidate_through_alias():
+    """Test that invalidating an alias drops the primary entry too."""
+    cache = LRUCache()
+    cache.set(("id", 1), "Pasta", aliases=[("name", "Pasta")])
+    cache.invalidate(("name", "Pasta"))
+    assert cache.get(("id", 1)) is None
+    assert cache.stats()['invalidations'] == 1
+
+def test_cache_evicts_least_recently_used():
+    """Test that the least recently used entry and its aliases are evicted."""
+    cache = LRUCache(max_size=2)
+    cache.set("a", 1, aliases=["alias-a"])
+    cache.set("b", 2)
+    cache.get("a")
+    cache.set("c", 3)
+    assert cache.get("b") is None
+    assert cache.get("a") == 1
+    assert cache.get("c") == 3
+    assert cache.stats()['evictions'] == 1
+    cache.set("d", 4)
+    assert cache.get("alias-a") is None
+
+def test_cache_expires_entries(mocker):
+    """Test that entries expire after the TTL."""
+    now = mocker.patch("meal_max.utils.cache.time.monotonic", return_value=100.0)
+    cache = LRUCache(ttl=10)
+    cache.set("a", 1)
+    now.return_value = 110.0
+    assert cache.get("a") is None
+    assert cache.stats()['expirations'] == 1
+
+def test_cache_disabled():
+    """Test that a zero-sized cache never stores anything."""
+    cache = LRUCache(max_size=0)
+    cache.set("a", 1)
+    assert cache.get("a") is None
+
+def test_cache_invalid_size():
+    """Test error handling for a negative cache size."""
+    with pytest.raises(ValueError, match="Invalid cache size"):
+        LRUCache(max_size=-1)
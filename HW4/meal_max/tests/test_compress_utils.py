@@ -0,0 +1,55 @@
+import gzip
+
+from flask import Response
+import pytest
+from werkzeug.http import parse_accept_header
+
+from meal_max.utils import compress_utils
+from meal_max.utils.compress_utils import compress, compress_response
+
+
+BODY = b'{"leaderboard": [' + b'{"meal": "Pasta", "wins": 3}, ' * 100 + b']}'
+
+
+def accept(header: str):
+    return parse_accept_header(header)
+
+
+def test_compress_gzip_round_trip():
+    """Test that gzip output decompresses to the input and is reproducible."""
+    assert gzip.decompress(compress(BODY, "gzip")) == BODY
+    assert compress(BODY, "gzip") == compress(BODY, "gzip")
+
+def test_compress_unsupported(monkeypatch):
+    """Test error handling for an encoding that is not available."""
+    monkeypatch.setattr(compress_utils, "brotli", None)
+    with pytest.raises(ValueError, match="Unsupported content encoding: br"):
+        compress(BODY, "br")
+
+def test_compress_response_gzip(monkeypatch):
+    """Test that a large JSON body is gzipped for a client that accepts it."""
+    monkeypatch.setattr(compress_utils, "brotli", None)
+    response = compress_response(Response(BODY, mimetype="application/json"), accept("br, gzip"), min_size=100)
+    assert response.headers['Content-Encoding'] == "gzip"
+    assert response.content_length < len(BODY)
+    assert gzip.decompress(response.get_data()) == BODY
+    assert 'Accept-Encoding' in response.vary
+
+def test_compress_response_respects_accept_encoding():
+    """Test that the body is left alone, but Vary still set, when the client refuses compression."""
+    response = compress_response(Response(BODY, mimetype="application/json"), accept("identity, gzip;q=0"),
+                                 min_size=100)
+    assert 'Content-Encoding' not in response.headers
+    assert response.get_data() == BODY
+    assert 'Accept-Encoding' in response.vary
+
+@pytest.mark.parametrize("response", [
+    Response(b"{}", mimetype="application/json"),
+    Response(BODY, mimetype="image/png"),
+    Response(BODY, status=500, mimetype="application/json"),
+    Response(iter([BODY]), mimetype="application/x-ndjson"),
+], ids=["small", "binary", "error", "streamed"])
+def test_compress_response_skips(response):
+    """Test that small, binary, failed and streamed responses are not compressed."""
+    compressed = compress_response(response, accept("gzip"), min_size=100)
+    assert 'Content-Encoding' not in compressed.headers
@@ -0,0 +1,54 @@
+from dataclasses import FrozenInstanceError, asdict, dataclass
+import pickle
+
+import pytest
+
+from meal_max.utils.dataclass_utils import _add_slots, slotted_dataclass
+
+
+@slotted_dataclass()
+class Point:
+    x: int
+    y: int = 0
+
+
+@slotted_dataclass(frozen=True)
+class FrozenPoint:
+    x: int
+    y: int = 0
+
+
+# What the decorator builds on Python 3.9, where dataclass() has no slots option
+class LegacyFrozenPoint:
+    x: int
+    y: int = 0
+
+
+LegacyFrozenPoint = _add_slots(dataclass(frozen=True)(LegacyFrozenPoint), True)
+
+
+@pytest.mark.parametrize("cls", [Point, FrozenPoint, LegacyFrozenPoint])
+def test_slotted_dataclass(cls):
+    """Test that instances use slots and keep the dataclass behaviour."""
+    point = cls(1)
+    assert not hasattr(point, '__dict__')
+    assert cls.__slots__ == ('x', 'y')
+    assert point == cls(1, 0)
+    assert asdict(point) == {'x': 1, 'y': 0}
+
+def test_slotted_dataclass_mutable():
+    """Test that a non-frozen slotted dataclass allows updates but no new attributes."""
+    point = Point(1, 2)
+    point.y = 3
+    assert point.y == 3
+    with pytest.raises(AttributeError):
+        point.z = 4
+
+@pytest.mark.parametrize("cls", [FrozenPoint, LegacyFrozenPoint])
+def test_slotted_dataclass_frozen(cls):
+    """Test that a frozen slotted dataclass refuses updates, is hashable and round-trips through pickle."""
+    point = cls(1, 2)
+    with pytest.raises(FrozenInstanceError):
+        point.x = 3
+    assert hash(point) == hash(cls(1, 2))
+    assert pickle.loads(pickle.dumps(point)) == point
@@ -0,0 +1,48 @@
+import pytest
+
+from meal_max.utils.ingest_utils import encode_csv, encode_ndjson, iter_csv, iter_ndjson, join_chunks
+
+
+def test_iter_ndjson():
+    """Test parsing newline-delimited JSON, skipping blank lines."""
+    lines = ['{"meal": "Pasta"}\n', '\n', '{"meal": "Tacos"}\n']
+    assert list(iter_ndjson(lines)) == [{'meal': "Pasta"}, {'meal': "Tacos"}]
+
+def test_iter_ndjson_invalid_line():
+    """Test error handling for a line that is not valid JSON."""
+    rows = iter_ndjson(['{"meal": "Pasta"}\n', '{"meal": \n'])
+    assert next(rows) == {'meal': "Pasta"}
+    with pytest.raises(ValueError, match="Invalid JSON on line 2"):
+        next(rows)
+
+def test_iter_csv():
+    """Test parsing CSV records keyed by the header row."""
+    lines = ["meal, cuisine, price, difficulty\n", "Pasta, Italian, 12.99, MED\n"]
+    assert list(iter_csv(lines)) == [
+        {'meal': "Pasta", 'cuisine': "Italian", 'price': "12.99", 'difficulty': "MED"}
+    ]
+
+def test_iter_csv_too_many_fields():
+    """Test error handling for a record with more fields than the header."""
+    lines = ["meal,cuisine\n", "Pasta,Italian,12.99\n"]
+    with pytest.raises(ValueError, match="Too many fields on line 2"):
+        list(iter_csv(lines))
+
+def test_encode_ndjson():
+    """Test serializing records as one compact JSON object per line."""
+    records = [{'meal': "Pasta", 'price': 12.99}, {'meal': "Tacos", 'price': 8.5}]
+    assert list(encode_ndjson(records)) == ['{"meal":"Pasta","price":12.99}\n', '{"meal":"Tacos","price":8.5}\n']
+    assert list(iter_ndjson(encode_ndjson(records))) == records
+
+def test_encode_csv():
+    """Test serializing records as CSV in the given column order, quoting where needed."""
+    records = [{'meal': "Pasta, fresh", 'cuisine': "Italian", 'wins': 3}]
+    assert "".join(encode_csv(records, ['meal', 'wins'])) == 'meal,wins\r\n"Pasta, fresh",3\r\n'
+
+def test_join_chunks():
+    """Test grouping small strings into larger pieces without losing any."""
+    chunks = [f"line {i}\n" for i in range(100)]
+    joined = list(join_chunks(chunks, size=50))
+    assert "".join(joined) == "".join(chunks)
+    assert all(len(piece) >= 50 for piece in joined[:-1])
+    assert len(joined) < len(chunks)
@@ -0,0 +1,85 @@
+from datetime import datetime, timezone
+import json
+
+from flask import Flask
+import pytest
+
+from meal_max.models.kitchen_model import Meal
+from meal_max.utils import json_utils
+from meal_max.utils.json_utils import OrjsonJSONProvider, StdlibJSONProvider, create_json_provider, serialize_default
+
+
+@pytest.fixture
+def app():
+    """Fixture providing a bare Flask app to attach providers to."""
+    return Flask(__name__)
+
+
+PAYLOAD = {
+    'status': 'success',
+    'meal': Meal(1, "Pasta", "Italian", 12.99, "MED", 88.93),
+    'leaderboard': [{'id': 2, 'meal': "Tacos", 'cuisine': "Mexican", 'price': 8.5, 'difficulty': "LOW",
+                     'battles': 4, 'wins': 3, 'win_pct': 75.0}],
+    'at': datetime(2024, 1, 2, 3, 4, 5, tzinfo=timezone.utc),
+}
+
+
+# What Flask's own provider should produce for PAYLOAD: Meal.battle_score is left out
+FLASK_PAYLOAD = {**PAYLOAD, 'meal': {'id': 1, 'meal': "Pasta", 'cuisine': "Italian", 'price': 12.99,
+                                     'difficulty': "MED"}}
+
+
+def test_serialize_default_meal():
+    """Test that a Meal becomes a dict of its fields, without the internal battle score."""
+    assert serialize_default(Meal(1, "Pasta", "Italian", 12.99, "MED", 88.93)) == {
+        'id': 1, 'meal': "Pasta", 'cuisine': "Italian", 'price': 12.99, 'difficulty': "MED"}
+
+def test_serialize_default_unsupported():
+    """Test that unknown types still raise TypeError."""
+    with pytest.raises(TypeError):
+        serialize_default(object())
+
+def test_stdlib_matches_flask(app):
+    """Test that the stdlib provider's response body is byte for byte Flask's, less the battle score."""
+    with app.app_context():
+        expected = app.json.response(FLASK_PAYLOAD).get_data()
+        response = StdlibJSONProvider(app).response(PAYLOAD)
+    assert response.mimetype == "application/json"
+    assert response.get_data() == expected
+
+def test_orjson_matches_flask(app):
+    """Test that the orjson provider encodes the same document, compactly and with sorted keys."""
+    with app.app_context():
+        expected = app.json.response(FLASK_PAYLOAD).get_data()
+        response = OrjsonJSONProvider(app).response(PAYLOAD)
+    body = response.get_data()
+    assert response.mimetype == "application/json"
+    assert json.loads(body) == json.loads(expected)
+    assert body.startswith(b'{"at":"Tue, 02 Jan 2024 03:04:05 GMT","leaderboard":[{"battles":4,')
+    assert b'"meal":{"cuisine":"Italian","difficulty":"MED","id":1,' in body
+    assert b'battle_score' not in body
+    assert body.endswith(b'}\n') and b'\n' not in body[:-1]
+
+def test_orjson_indents_in_debug(app):
+    """Test that responses are indented in debug mode, as with Flask's provider."""
+    app.debug = True
+    with app.app_context():
+        body = OrjsonJSONProvider(app).response({'b': 1, 'a': [1]}).get_data()
+    assert json.loads(body) == {'a': [1], 'b': 1}
+    assert b'\n  "a"' in body
+
+def test_orjson_loads_invalid(app):
+    """Test that invalid JSON raises a ValueError, which Flask reports as a 400."""
+    with pytest.raises(ValueError):
+        OrjsonJSONProvider(app).loads(b'{"meal": ')
+
+def test_create_json_provider(app, monkeypatch):
+    """Test choosing a provider by name, falling back to stdlib when orjson is missing."""
+    assert isinstance(create_json_provider(app, "auto"), OrjsonJSONProvider)
+    assert isinstance(create_json_provider(app, "stdlib"), StdlibJSONProvider)
+    monkeypatch.setattr(json_utils, "orjson", None)
+    assert isinstance(create_json_provider(app, "auto"), StdlibJSONProvider)
+    with pytest.raises(ValueError, match="orjson package is not installed"):
+        create_json_provider(app, "orjson")
+    with pytest.raises(ValueError, match="Unknown JSON provider"):
+        create_json_provider(app, "ujson")
@@ -2,7 +2,9 @@ import pytest
 from contextlib import contextmanager
 import re
 import sqlite3
-from meal_max.models.kitchen_model import Meal, create_meal, delete_meal, get_leaderboard, get_meal_by_id, get_meal_by_name, update_meal_stats
+from meal_max.models import kitchen_model
+from meal_max.models.kitchen_model import Meal, compute_battle_score, create_meal, create_meals, delete_meal, find_close_opponents, get_data_version, get_leaderboard, get_meal_by_id, get_meal_by_name, get_meals_by_ids, get_meals_by_names, iter_leaderboard, list_meals, meal_cache, meal_row_factory, record_battle_result, record_battle_results, update_meal_stats
+from meal_max.utils.stats_buffer import StatsBuffer
 
 ######################################################
 #
@@ -34,6 +36,49 @@ def mock_cursor(mocker):
     mocker.patch("meal_max.models.kitchen_model.get_db_connection", mock_get_db_connection)
     return mock_cursor
 
+######################################################
+#
+#    Tests for Meal
+#
+######################################################
+
+def test_meal_validation():
+    """Test that constructing a Meal checks the price and difficulty."""
+    with pytest.raises(ValueError, match="Price must be a positive value"):
+        Meal(1, "Pasta", "Italian", -1, "MED")
+    with pytest.raises(ValueError, match="Difficulty must be"):
+        Meal(1, "Pasta", "Italian", 12.99, "EASY")
+
+def test_meal_is_slotted():
+    """Test that Meal instances carry no per-instance __dict__."""
+    meal = Meal(1, "Pasta", "Italian", 12.99, "MED")
+    assert not hasattr(meal, '__dict__')
+    assert Meal.__slots__ == ('id', 'meal', 'cuisine', 'price', 'difficulty', 'battle_score')
+
+def test_meal_from_row():
+    """Test building a Meal from a database row, ignoring extra columns."""
+    meal = Meal.from_row((1, "Pasta", "Italian", 12.99, "MED", 88.93, 0))
+    assert meal == Meal(id=1, meal="Pasta", cuisine="Italian", price=12.99, difficulty="MED")
+    assert meal.battle_score == 88.93
+
+def test_compute_battle_score():
+    """Test the battle score formula and that it matches the SQL backfill."""
+    assert compute_battle_score(12.99, "Italian", "MED") == 12.99 * 7 - 2
+    conn = sqlite3.connect(":memory:")
+    backfilled = conn.execute("SELECT 12.99 * length('Italian') - CASE 'MED' WHEN 'HIGH' THEN 1 WHEN 'MED' THEN 2 "
+                              "WHEN 'LOW' THEN 3 END").fetchone()[0]
+    conn.close()
+    assert compute_battle_score(12.99, "Italian", "MED") == backfilled
+
+def test_meal_row_factory():
+    """Test that the row factory yields Meals straight from the cursor."""
+    conn = sqlite3.connect(":memory:")
+    cursor = conn.cursor()
+    cursor.row_factory = meal_row_factory
+    cursor.execute("SELECT 1, 'Pasta', 'Italian', 12.99, 'MED', 88.93 UNION ALL SELECT 2, 'Tacos', 'Mexican', 8.5, 'LOW', 56.5")
+    assert cursor.fetchall() == [Meal(1, "Pasta", "Italian", 12.99, "MED"), Meal(2, "Tacos", "Mexican", 8.5, "LOW")]
+    conn.close()
+
 ######################################################
 #
 #    Tests for create_meal
@@ -44,12 +89,12 @@ def test_create_meal(mock_cursor):
     """Test creating a new meal entry."""
     create_meal("Pasta", "Italian", 12.99, "MED")
     expected_query = normalize_whitespace("""
-        INSERT INTO meals (meal, cuisine, price, difficulty)
-        VALUES (?, ?, ?, ?)
+        INSERT INTO meals (meal, cuisine, price, difficulty, battle_score)
+        VALUES (?, ?, ?, ?, ?)
     """)
     actual_query = normalize_whitespace(mock_cursor.execute.call_args[0][0])
     assert actual_query == expected_query, "The SQL query did not match the expected structure."
-    expected_args = ("Pasta", "Italian", 12.99, "MED")
+    expected_args = ("Pasta", "Italian", 12.99, "MED", 12.99 * 7 - 2)
     actual_args = mock_cursor.execute.call_args[0][1]
     assert actual_args == expected_args, f"Expected {expected_args}, got {actual_args}"
 
@@ -69,6 +114,61 @@ def test_create_meal_invalid_difficulty():
     with pytest.raises(ValueError, match="Invalid difficulty level"):
         create_meal("Pasta", "Italian", 12.99, "INVALID")
 
+######################################################
+#
+#    Tests for create_meals
+#
+######################################################
+
+def test_create_meals(mock_cursor):
+    """Test bulk creation with executemany."""
+    create_meals([
+        {'meal': "Pasta", 'cuisine': "Italian", 'price': 12.99, 'difficulty': "MED"},
+        {'meal': "Tacos", 'cuisine': "Mexican", 'price': "8.5", 'difficulty': "LOW"},
+    ])
+    expected_query = normalize_whitespace("""
+        INSERT INTO meals (meal, cuisine, price, difficulty, battle_score)
+        VALUES (?, ?, ?, ?, ?)
+    """)
+    actual_query = normalize_whitespace(mock_cursor.executemany.call_args[0][0])
+    assert actual_query == expected_query
+    assert mock_cursor.executemany.call_args[0][1] == [
+        ("Pasta", "Italian", 12.99, "MED", 12.99 * 7 - 2), ("Tacos", "Mexican", 8.5, "LOW", 8.5 * 7 - 3)
+    ]
+
+def test_create_meals_reports_duplicates(mock_cursor):
+    """Test that existing names and repeats within the input are reported per row."""
+    mock_cursor.fetchall.return_value = [("Pasta",)]
+    result = create_meals([
+        {'meal': "Pasta", 'cuisine': "Italian", 'price': 12.99, 'difficulty': "MED"},
+        {'meal': "Tacos", 'cuisine': "Mexican", 'price': 8.5, 'difficulty': "LOW"},
+        {'meal': "Tacos", 'cuisine': "Mexican", 'price': 9, 'difficulty': "LOW"},
+    ])
+    assert result == {
+        'created': 1,
+        'duplicates': [{'row': 0, 'meal': "Pasta"}, {'row': 2, 'meal': "Tacos"}],
+        'errors': [],
+    }
+
+def test_create_meals_reports_invalid_rows(mock_cursor):
+    """Test that invalid rows are skipped and reported per row."""
+    result = create_meals([
+        {'meal': "Pasta", 'cuisine': "Italian", 'price': -1, 'difficulty': "MED"},
+        {'meal': "Tacos", 'cuisine': "Mexican", 'price': 8.5, 'difficulty': "EASY"},
+        "not a meal",
+    ])
+    assert result['created'] == 0
+    assert [error['row'] for error in result['errors']] == [0, 1, 2]
+    assert "Invalid price" in result['errors'][0]['error']
+    assert "Invalid difficulty level" in result['errors'][1]['error']
+
+def test_create_meals_batches(mock_cursor):
+    """Test that rows are inserted in batches of batch_size."""
+    rows = [{'meal': f"Meal {i}", 'cuisine': "Thai", 'price': 5, 'difficulty': "LOW"} for i in range(5)]
+    result = create_meals(rows, batch_size=2)
+    assert result['created'] == 5
+    assert mock_cursor.executemany.call_count == 3
+
 ######################################################
 #
 #    Tests for delete_meal
@@ -115,11 +215,64 @@ def test_get_leaderboard(mock_cursor):
     ]
     assert leaderboard == expected_result
 
+def test_get_leaderboard_paged(mock_cursor):
+    """Test that limit and offset are pushed down to the query."""
+    get_leaderboard("wins", limit=10, offset=20)
+    expected_query = normalize_whitespace("""
+        SELECT id, meal, cuisine, price, difficulty, battles, wins, (wins * 1.0 / battles) AS win_pct
+        FROM meals WHERE deleted = 0 AND battles > 0
+        ORDER BY wins DESC, id LIMIT ? OFFSET ?
+    """)
+    actual_query = normalize_whitespace(mock_cursor.execute.call_args[0][0])
+    assert actual_query == expected_query
+    assert mock_cursor.execute.call_args[0][1] == (10, 20)
+
+def test_get_leaderboard_invalid_limit(mock_cursor):
+    """Test error handling for a non-positive limit."""
+    with pytest.raises(ValueError, match="Invalid limit"):
+        get_leaderboard("wins", limit=0)
+
 def test_get_leaderboard_invalid_sort(mock_cursor):
     """Test error handling for invalid leaderboard sorting."""
     with pytest.raises(ValueError, match="Invalid sort_by parameter"):
         get_leaderboard("invalid_sort")
 
+def test_iter_leaderboard(mock_cursor):
+    """Test streaming the leaderboard in fetchmany batches."""
+    mock_cursor.fetchmany.side_effect = [
+        [(1, "Pasta", "Italian", 12.99, "MED", 5, 3, 0.6), (2, "Tacos", "Mexican", 8.5, "LOW", 4, 2, 0.5)],
+        [(3, "Pho", "Vietnamese", 10.0, "LOW", 2, 0, 0.0)],
+        [],
+    ]
+    leaderboard = list(iter_leaderboard("wins", batch_size=2))
+    assert [entry['meal'] for entry in leaderboard] == ["Pasta", "Tacos", "Pho"]
+    assert leaderboard[0] == {'id': 1, 'meal': "Pasta", 'cuisine': "Italian", 'price': 12.99, 'difficulty': "MED",
+                              'battles': 5, 'wins': 3, 'win_pct': 0.6}
+    mock_cursor.fetchmany.assert_called_with(2)
+
+def test_iter_leaderboard_filtered(mock_cursor):
+    """Test that cuisine and difficulty filters are pushed down to the query."""
+    mock_cursor.fetchmany.return_value = []
+    list(iter_leaderboard("win_pct", cuisine="Italian", difficulty="MED"))
+    expected_query = normalize_whitespace("""
+        SELECT id, meal, cuisine, price, difficulty, battles, wins, (wins * 1.0 / battles) AS win_pct
+        FROM meals WHERE deleted = 0 AND battles > 0 AND cuisine = ? AND difficulty = ?
+        ORDER BY win_pct DESC, id
+    """)
+    actual_query = normalize_whitespace(mock_cursor.execute.call_args[0][0])
+    assert actual_query == expected_query
+    assert mock_cursor.execute.call_args[0][1] == ["Italian", "MED"]
+
+def test_iter_leaderboard_invalid_arguments(mock_cursor):
+    """Test that invalid arguments are rejected before any query runs."""
+    with pytest.raises(ValueError, match="Invalid difficulty level"):
+        iter_leaderboard("wins", difficulty="EASY")
+    with pytest.raises(ValueError, match="Invalid batch size"):
+        iter_leaderboard("wins", batch_size=0)
+    with pytest.raises(ValueError, match="Invalid sort_by parameter"):
+        iter_leaderboard("battles")
+    mock_cursor.execute.assert_not_called()
+
 ######################################################
 #
 #    Tests for get_meal_by_id
@@ -128,7 +281,7 @@ def test_get_leaderboard_invalid_sort(mock_cursor):
 
 def test_get_meal_by_id(mock_cursor):
     """Test retrieving a meal by ID."""
-    mock_cursor.fetchone.return_value = (1, "Pasta", "Italian", 12.99, "MED", False)
+    mock_cursor.fetchone.return_value = (1, "Pasta", "Italian", 12.99, "MED", 88.93, False)
     meal = get_meal_by_id(1)
     expected_meal = Meal(id=1, meal="Pasta", cuisine="Italian", price=12.99, difficulty="MED")
     assert meal == expected_meal
@@ -141,10 +294,27 @@ def test_get_meal_by_id_not_found(mock_cursor):
 
 def test_get_meal_by_id_deleted(mock_cursor):
     """Test error handling for deleted meal retrieval by ID."""
-    mock_cursor.fetchone.return_value = (1, "Pasta", "Italian", 12.99, "MED", True)
+    mock_cursor.fetchone.return_value = (1, "Pasta", "Italian", 12.99, "MED", 88.93, True)
     with pytest.raises(ValueError, match="Meal with ID 1 has been deleted"):
         get_meal_by_id(1)
 
+def test_find_close_opponents(mock_cursor):
+    """Test that candidates above and below the meal's score are merged by distance."""
+    mock_cursor.fetchone.return_value = (1, "Pasta", "Italian", 12.99, "MED", 50.0, False)
+    mock_cursor.fetchall.side_effect = [
+        [Meal(2, "Tacos", "Mexican", 8.5, "LOW", 51.0), Meal(3, "Sushi", "Japanese", 9.0, "MED", 60.0)],
+        [Meal(4, "Pho", "Vietnamese", 5.0, "HIGH", 49.5), Meal(5, "Toast", "British", 7.0, "LOW", 39.0)],
+    ]
+    opponents = find_close_opponents(1, limit=2)
+    assert [opponent.id for opponent in opponents] == [4, 2]
+    assert mock_cursor.execute.call_args_list[1][0][1] == (50.0, 1, 2)
+    assert mock_cursor.execute.call_args_list[2][0][1] == (50.0, 2)
+
+def test_find_close_opponents_invalid_limit(mock_cursor):
+    """Test error handling for a non-positive limit."""
+    with pytest.raises(ValueError, match="Invalid limit"):
+        find_close_opponents(1, limit=0)
+
 ######################################################
 #
 #    Tests for get_meal_by_name
@@ -153,7 +323,7 @@ def test_get_meal_by_id_deleted(mock_cursor):
 
 def test_get_meal_by_name(mock_cursor):
     """Test retrieving a meal by name."""
-    mock_cursor.fetchone.return_value = (1, "Pasta", "Italian", 12.99, "MED", False)
+    mock_cursor.fetchone.return_value = (1, "Pasta", "Italian", 12.99, "MED", 88.93, False)
     meal = get_meal_by_name("Pasta")
     expected_meal = Meal(id=1, meal="Pasta", cuisine="Italian", price=12.99, difficulty="MED")
     assert meal == expected_meal
@@ -166,7 +336,137 @@ def test_get_meal_by_name_not_found(mock_cursor):
 
 def test_get_meal_by_name_deleted(mock_cursor):
     """Test error handling for deleted meal retrieval by name."""
-    mock_cursor.fetchone.return_value = (1, "Pasta", "Italian", 12.99, "MED", True)
+    mock_cursor.fetchone.return_value = (1, "Pasta", "Italian", 12.99, "MED", 88.93, True)
+    with pytest.raises(ValueError, match="Meal with name Pasta has been deleted"):
+        get_meal_by_name("Pasta")
+
+######################################################
+#
+#    Tests for list_meals
+#
+######################################################
+
+def test_list_meals(mock_cursor):
+    """Test the first page of active meals and its cursor."""
+    mock_cursor.fetchall.return_value = [
+        (1, "Pasta", "Italian", 12.99, "MED", 0, 0, 0),
+        (4, "Tacos", "Mexican", 8.5, "LOW", 3, 1, 0),
+        (7, "Pho", "Vietnamese", 10.0, "HIGH", 0, 0, 0),
+    ]
+    page = list_meals(limit=2)
+    expected_query = normalize_whitespace("""
+        SELECT id, meal, cuisine, price, difficulty, battles, wins, deleted FROM meals
+        WHERE id > ? AND deleted = ? ORDER BY id LIMIT ?
+    """)
+    assert normalize_whitespace(mock_cursor.execute.call_args[0][0]) == expected_query
+    assert mock_cursor.execute.call_args[0][1] == [0, 0, 3]
+    assert [meal['id'] for meal in page['meals']] == [1, 4]
+    assert page['meals'][1] == {'id': 4, 'meal': "Tacos", 'cuisine': "Mexican", 'price': 8.5, 'difficulty': "LOW",
+                                'battles': 3, 'wins': 1, 'deleted': False}
+    assert page['next_cursor'] == 4
+
+def test_list_meals_filtered_last_page(mock_cursor):
+    """Test that every filter is applied and the last page has no cursor."""
+    mock_cursor.fetchall.return_value = [(9, "Pizza", "Italian", 11.0, "LOW", 0, 0, 1)]
+    page = list_meals(cuisine="Italian", difficulty="LOW", min_price=5, max_price=20, deleted=None, after=4)
+    query = normalize_whitespace(mock_cursor.execute.call_args[0][0])
+    assert query.endswith("WHERE id > ? AND cuisine = ? AND difficulty = ? AND price >= ? AND price <= ? "
+                          "ORDER BY id LIMIT ?")
+    assert mock_cursor.execute.call_args[0][1] == [4, "Italian", "LOW", 5, 20, 51]
+    assert page['meals'][0]['deleted'] is True
+    assert page['next_cursor'] is None
+
+@pytest.mark.parametrize("kwargs, message", [
+    ({'limit': 0}, "Invalid limit"),
+    ({'limit': 1001}, "Invalid limit"),
+    ({'after': -1}, "Invalid cursor"),
+    ({'min_price': 10, 'max_price': 5}, "Invalid price range"),
+    ({'min_price': float('nan')}, "Invalid price bound"),
+    ({'max_price': float('inf')}, "Invalid price bound"),
+    ({'difficulty': "EASY"}, "Invalid difficulty level"),
+])
+def test_list_meals_invalid_arguments(mock_cursor, kwargs, message):
+    """Test error handling for invalid listing parameters."""
+    with pytest.raises(ValueError, match=message):
+        list_meals(**kwargs)
+
+######################################################
+#
+#    Tests for get_meals_by_ids and get_meals_by_names
+#
+######################################################
+
+def test_get_meals_by_ids(mock_cursor):
+    """Test that meals come back in request order, with missing and deleted IDs reported."""
+    mock_cursor.fetchall.return_value = [
+        (3, "Tacos", "Mexican", 8.5, "LOW", 56.5, False),
+        (1, "Pasta", "Italian", 12.99, "MED", 88.93, False),
+        (2, "Pho", "Vietnamese", 10.0, "HIGH", 99.0, True),
+    ]
+    result = get_meals_by_ids([1, 2, 3, 4, 1])
+    assert [meal.id for meal in result['meals']] == [1, 3]
+    assert result['not_found'] == [4]
+    assert result['deleted'] == [2]
+    assert normalize_whitespace(mock_cursor.execute.call_args[0][0]).endswith("WHERE id IN (?, ?, ?, ?)")
+    assert mock_cursor.execute.call_args[0][1] == [1, 2, 3, 4]
+
+def test_get_meals_by_ids_chunks(mock_cursor):
+    """Test that the IDs are split into one query per chunk."""
+    get_meals_by_ids(range(1, 6), chunk_size=2)
+    assert [call[0][1] for call in mock_cursor.execute.call_args_list] == [[1, 2], [3, 4], [5]]
+
+def test_get_meals_by_ids_uses_cache(mock_cursor):
+    """Test that cached meals are not queried again, and found meals are cached."""
+    mock_cursor.fetchone.return_value = (1, "Pasta", "Italian", 12.99, "MED", 88.93, False)
+    get_meal_by_id(1)
+    mock_cursor.fetchall.return_value = [(2, "Tacos", "Mexican", 8.5, "LOW", 56.5, False)]
+    result = get_meals_by_ids([1, 2])
+    assert [meal.id for meal in result['meals']] == [1, 2]
+    assert mock_cursor.execute.call_args[0][1] == [2]
+    assert get_meal_by_name("Tacos").id == 2
+    assert mock_cursor.execute.call_count == 2
+
+def test_get_meals_by_names(mock_cursor):
+    """Test looking meals up by name."""
+    mock_cursor.fetchall.return_value = [(1, "Pasta", "Italian", 12.99, "MED", 88.93, False)]
+    result = get_meals_by_names(["Pasta", "Sushi"])
+    assert result == {'meals': [Meal(1, "Pasta", "Italian", 12.99, "MED")], 'not_found': ["Sushi"], 'deleted': []}
+    assert normalize_whitespace(mock_cursor.execute.call_args[0][0]).endswith("WHERE meal IN (?, ?)")
+
+def test_get_meals_by_ids_invalid_chunk_size(mock_cursor):
+    """Test error handling for a non-positive chunk size."""
+    with pytest.raises(ValueError, match="Invalid chunk size"):
+        get_meals_by_ids([1], chunk_size=0)
+
+######################################################
+#
+#    Tests for the meal cache
+#
+######################################################
+
+def test_get_meal_by_id_cached(mock_cursor):
+    """Test that a second lookup by ID is served from the cache."""
+    mock_cursor.fetchone.return_value = (1, "Pasta", "Italian", 12.99, "MED", 88.93, False)
+    first = get_meal_by_id(1)
+    second = get_meal_by_id(1)
+    assert first == second
+    assert mock_cursor.execute.call_count == 1
+    assert meal_cache.stats()['hits'] >= 1
+
+def test_get_meal_by_name_uses_id_lookup_cache(mock_cursor):
+    """Test that a lookup by ID also caches the meal under its name."""
+    mock_cursor.fetchone.return_value = (1, "Pasta", "Italian", 12.99, "MED", 88.93, False)
+    get_meal_by_id(1)
+    assert get_meal_by_name("Pasta") == Meal(id=1, meal="Pasta", cuisine="Italian", price=12.99, difficulty="MED")
+    assert mock_cursor.execute.call_count == 1
+
+def test_delete_meal_invalidates_cache(mock_cursor):
+    """Test that deleting a meal drops it from the cache under both keys."""
+    mock_cursor.fetchone.return_value = (1, "Pasta", "Italian", 12.99, "MED", 88.93, False)
+    get_meal_by_name("Pasta")
+    mock_cursor.fetchone.return_value = [False]
+    delete_meal(1)
+    mock_cursor.fetchone.return_value = (1, "Pasta", "Italian", 12.99, "MED", 88.93, True)
     with pytest.raises(ValueError, match="Meal with name Pasta has been deleted"):
         get_meal_by_name("Pasta")
 
@@ -202,4 +502,199 @@ def test_update_meal_stats_deleted_meal(mock_cursor):
     """Test error handling for updating stats of a deleted meal."""
     mock_cursor.fetchone.return_value = [True]
     with pytest.raises(ValueError, match="Meal with ID 1 has been deleted"):
-        update_meal_stats(1, "win")
\ No newline at end of file
+        update_meal_stats(1, "win")
+
+######################################################
+#
+#    Tests for record_battle_result
+#
+######################################################
+
+def test_record_battle_result(mock_cursor):
+    """Test recording both sides of a battle in one statement."""
+    mock_cursor.rowcount = 2
+    record_battle_result(1, 2)
+    expected_query = normalize_whitespace("""
+        UPDATE meals SET battles = battles + 1, wins = wins + (id = ?)
+        WHERE id IN (?, ?) AND deleted = FALSE
+    """)
+    assert mock_cursor.execute.call_count == 1
+    actual_query = normalize_whitespace(mock_cursor.execute.call_args[0][0])
+    assert actual_query == expected_query
+    assert mock_cursor.execute.call_args[0][1] == (1, 1, 2)
+
+def test_record_battle_result_deleted_meal(mock_cursor):
+    """Test error handling when one of the meals has been deleted."""
+    mock_cursor.rowcount = 1
+    mock_cursor.fetchall.return_value = [(1, False), (2, True)]
+    with pytest.raises(ValueError, match="Meal with ID 2 has been deleted"):
+        record_battle_result(1, 2)
+
+def test_record_battle_result_meal_not_found(mock_cursor):
+    """Test error handling when one of the meals does not exist."""
+    mock_cursor.rowcount = 1
+    mock_cursor.fetchall.return_value = [(2, False)]
+    with pytest.raises(ValueError, match="Meal with ID 1 not found"):
+        record_battle_result(1, 2)
+
+def test_record_battle_result_same_meal(mock_cursor):
+    """Test that a meal prepped twice gets one win and two battles."""
+    mock_cursor.rowcount = 1
+    record_battle_result(1, 1)
+    assert mock_cursor.executemany.call_args[0][1] == [(2, 1, 1)]
+
+def test_record_battle_results(mock_cursor):
+    """Test that many results are folded into one increment per meal."""
+    mock_cursor.rowcount = 3
+    record_battle_results([(1, 2), (1, 3), (2, 3)])
+    expected_query = normalize_whitespace("""
+        UPDATE meals SET battles = battles + ?, wins = wins + ?
+        WHERE id = ? AND deleted = FALSE
+    """)
+    actual_query = normalize_whitespace(mock_cursor.executemany.call_args[0][0])
+    assert actual_query == expected_query
+    assert sorted(mock_cursor.executemany.call_args[0][1], key=lambda args: args[2]) == [
+        (2, 2, 1), (2, 1, 2), (2, 0, 3)
+    ]
+
+def test_record_battle_results_deleted_meal(mock_cursor):
+    """Test that nothing is recorded when one meal has been deleted."""
+    mock_cursor.rowcount = 1
+    mock_cursor.fetchall.return_value = [(1, False), (2, True)]
+    with pytest.raises(ValueError, match="Meal with ID 2 has been deleted"):
+        record_battle_results([(1, 2)])
+
+######################################################
+#
+#    Tests for change counters
+#
+######################################################
+
+@pytest.fixture
+def bump_versions(mocker):
+    """Fixture recording which change counters each write bumps."""
+    return mocker.patch("meal_max.models.kitchen_model._bump_versions")
+
+def test_writes_bump_change_counters(mock_cursor, bump_versions):
+    """Test that catalog writes bump 'meals' and stats writes bump 'meal_stats'."""
+    create_meal("Pasta", "Italian", 12.99, "MED")
+    mock_cursor.fetchone.return_value = [False]
+    delete_meal(1)
+    update_meal_stats(1, "win")
+    mock_cursor.rowcount = 2
+    record_battle_result(1, 2)
+    assert [call[0][1:] for call in bump_versions.call_args_list] == [
+        ('meals',), ('meals',), ('meal_stats',), ('meal_stats',)]
+
+def test_failed_write_does_not_bump(mock_cursor, bump_versions):
+    """Test that a rejected write leaves the counters alone."""
+    mock_cursor.fetchone.return_value = [True]
+    with pytest.raises(ValueError):
+        delete_meal(1)
+    bump_versions.assert_not_called()
+
+def test_get_data_version(mock_cursor):
+    """Test that the tag joins the requested counters and Last-Modified is the latest change."""
+    mock_cursor.fetchall.return_value = [("meal_stats", 7, 200.0), ("meals", 3, 100.0)]
+    assert get_data_version(("meals", "meal_stats")) == ("meals.3-meal_stats.7", 200.0)
+
+def test_get_data_version_cached_until_bumped(mock_cursor, mocker):
+    """Test that counters are read once, and read again after this process bumps them."""
+    mock_cursor.fetchall.return_value = [("meals", 3, 100.0)]
+    assert get_data_version(("meals",))[0] == "meals.3"
+    mock_cursor.fetchall.return_value = [("meals", 4, 101.0)]
+    assert get_data_version(("meals",))[0] == "meals.3"
+    assert mock_cursor.execute.call_count == 1
+
+    kitchen_model._bump_versions(mocker.Mock(), "meals")
+    assert get_data_version(("meals",))[0] == "meals.4"
+
+def test_get_data_version_unknown_name(mock_cursor):
+    """Test error handling for a name without a change counter."""
+    with pytest.raises(ValueError, match="No change counter for meals"):
+        get_data_version(("meals",))
+
+######################################################
+#
+#    Tests for write-behind stats
+#
+######################################################
+
+@pytest.fixture
+def write_behind(monkeypatch):
+    """Fixture enabling write-behind stats with an unjournaled buffer; returns the flushed batches."""
+    flushed = []
+    monkeypatch.setattr(kitchen_model, "STATS_WRITE_BEHIND", True)
+    monkeypatch.setattr(kitchen_model, "stats_buffer",
+                        StatsBuffer(lambda deltas, journal_ids: flushed.append(deltas), flush_interval=60))
+    yield flushed
+    kitchen_model.stats_buffer.close()
+
+def test_record_battle_result_write_behind(mock_cursor, write_behind):
+    """Test that battle results are buffered instead of written."""
+    record_battle_result(1, 2)
+    record_battle_result(1, 1)
+    record_battle_results([(2, 3)])
+    update_meal_stats(3, "win")
+    mock_cursor.execute.assert_not_called()
+    mock_cursor.executemany.assert_not_called()
+    assert kitchen_model.stats_buffer.pending() == {1: [3, 2], 2: [2, 1], 3: [2, 1]}
+
+def test_update_meal_stats_write_behind_invalid_result(mock_cursor, write_behind):
+    """Test that an invalid result is still rejected when stats are buffered."""
+    with pytest.raises(ValueError, match="Invalid result"):
+        update_meal_stats(1, "draw")
+    assert kitchen_model.stats_buffer.pending() == {}
+
+def test_get_leaderboard_merges_pending_stats(mock_cursor, write_behind):
+    """Test that buffered results are ranked into the leaderboard page."""
+    record_battle_results([(2, 3), (2, 1)])
+    mock_cursor.fetchall.side_effect = [
+        [(1, "Pasta", "Italian", 12.99, "MED", 4, 3, 0.75), (2, "Tacos", "Mexican", 8.5, "LOW", 4, 2, 0.5)],
+        [(2, "Tacos", "Mexican", 8.5, "LOW", 4, 2, None), (3, "Pho", "Vietnamese", 10.0, "LOW", 0, 0, None),
+         (1, "Pasta", "Italian", 12.99, "MED", 4, 3, None)],
+    ]
+    leaderboard = get_leaderboard("wins", limit=2)
+    assert mock_cursor.execute.call_args_list[0][0][1] == (2 + 3,)
+    assert [(entry['id'], entry['battles'], entry['wins']) for entry in leaderboard] == [(2, 6, 4), (1, 5, 3)]
+
+def test_get_data_version_includes_pending_stats(mock_cursor, write_behind):
+    """Test that buffered results change the leaderboard's tag before they are flushed."""
+    mock_cursor.fetchall.return_value = [("meals", 3, 100.0), ("meal_stats", 7, 200.0)]
+    before = get_data_version(("meals", "meal_stats"))[0]
+    record_battle_result(1, 2)
+    after = get_data_version(("meals", "meal_stats"))[0]
+    assert before == "meals.3-meal_stats.7"
+    assert after.startswith(before + "-pending.")
+    assert get_data_version(("meals",))[0] == "meals.3"
+
+def test_list_meals_includes_pending_stats(mock_cursor, write_behind):
+    """Test that buffered results are added to the listed battle stats."""
+    record_battle_result(1, 2)
+    mock_cursor.fetchall.return_value = [(1, "Pasta", "Italian", 12.99, "MED", 2, 1, 0)]
+    assert list_meals()['meals'][0]['battles'] == 3
+    assert list_meals()['meals'][0]['wins'] == 2
+
+def test_apply_stat_deltas_records_journals(mock_cursor):
+    """Test that journal IDs are recorded in the same transaction as the increments."""
+    mock_cursor.rowcount = 1
+    kitchen_model._apply_stat_deltas({1: [1, 1]}, ["stats-a.journal"])
+    first_call, second_call = mock_cursor.executemany.call_args_list
+    assert "INSERT OR IGNORE INTO applied_journals" in first_call[0][0]
+    assert [row[0] for row in first_call[0][1]] == ["stats-a.journal"]
+    assert "UPDATE meals" in second_call[0][0]
+
+def test_apply_stat_deltas_skips_applied_journals(mock_cursor):
+    """Test that a journal already recorded as applied is not counted again."""
+    mock_cursor.rowcount = 0
+    kitchen_model._apply_stat_deltas({1: [1, 1]}, ["stats-a.journal"])
+    assert mock_cursor.executemany.call_count == 1
+    assert not any("UPDATE meals" in call[0][0] for call in mock_cursor.execute.call_args_list)
+
+def test_flush_drops_stats_of_deleted_meals(mock_cursor, mocker):
+    """Test that a flush writes the remaining meals when one has been deleted."""
+    apply = mocker.patch("meal_max.models.kitchen_model._apply_stat_deltas",
+                         side_effect=[ValueError("Meal with ID 2 has been deleted"), None])
+    mock_cursor.fetchall.return_value = [(1,)]
+    kitchen_model._flush_stat_deltas({1: [1, 1], 2: [1, 0]})
+    assert apply.call_args[0][0] == {1: [1, 1]}
@@ -0,0 +1,53 @@
+import logging
+import threading
+
+import pytest
+
+from meal_max.utils import logger as logger_module
+from meal_max.utils.logger import ROOT_LOGGER, configure_logger, setup_logging
+
+
+def test_module_loggers_share_one_handler():
+    """Test that configuring meal_max loggers repeatedly never adds handlers."""
+    module_logger = logging.getLogger("meal_max.tests.example")
+    configure_logger(module_logger)
+    configure_logger(module_logger)
+
+    assert module_logger.handlers == []
+    assert logging.getLogger(ROOT_LOGGER).handlers.count(setup_logging()) == 1
+
+def test_outside_logger_gets_handler_once():
+    """Test that loggers outside meal_max get the shared handler exactly once."""
+    outside = logging.getLogger("tests.outside")
+    try:
+        configure_logger(outside)
+        configure_logger(outside)
+        assert outside.handlers == [setup_logging()]
+        assert outside.level == logging.getLevelName(logger_module.LOG_LEVEL)
+    finally:
+        outside.handlers.clear()
+
+def test_records_are_formatted_off_the_calling_thread(mocker):
+    """Test that the queue handler leaves formatting to the listener thread."""
+    if not logger_module.LOG_QUEUE:
+        pytest.skip("LOG_QUEUE is off")
+    formatted_on = []
+    done = threading.Event()
+
+    class Recording(logging.Handler):
+        def emit(self, record):
+            formatted_on.append((threading.current_thread(), self.format(record)))
+            done.set()
+
+    mocker.patch.object(logger_module._listener, "handlers", (Recording(),))
+    logging.getLogger("meal_max.tests.example").warning("value is %d", 42)
+
+    assert done.wait(timeout=2)
+    thread, message = formatted_on[0]
+    assert message == "value is 42"
+    assert thread is not threading.current_thread()
+
+def test_propagates_to_root_for_caplog(caplog):
+    """Test that records still reach the root logger, where pytest captures them."""
+    logging.getLogger("meal_max.tests.example").warning("captured")
+    assert "captured" in caplog.text
@@ -0,0 +1,123 @@
+import sqlite3
+
+import pytest
+
+from meal_max.utils import metrics
+from meal_max.utils.metrics import Histogram, MetricsRegistry, sql_operation, time_external_call
+from meal_max.utils.sql_utils import TimedConnection
+
+
+@pytest.fixture(autouse=True)
+def clear_metrics():
+    """Fixture to start every test with no recorded observations."""
+    metrics.registry.clear()
+    yield
+    metrics.registry.clear()
+
+######################################################
+#
+#    Histograms
+#
+######################################################
+
+def test_histogram_buckets_are_cumulative():
+    """Test that observations land in the right buckets and accumulate upwards."""
+    histogram = Histogram("test_seconds", "Test.", ("route",), buckets=(0.1, 1.0))
+    histogram.observe(0.05, "/a")
+    histogram.observe(0.1, "/a")
+    histogram.observe(0.5, "/a")
+    histogram.observe(5.0, "/a")
+
+    cumulative, total, count = histogram.snapshot()[("/a",)]
+    assert cumulative == [2, 3, 4]
+    assert total == pytest.approx(5.65)
+    assert count == 4
+
+def test_histogram_time_records_on_error():
+    """Test that the timer observes a block that raises."""
+    histogram = Histogram("test_seconds", "Test.")
+    with pytest.raises(ValueError):
+        with histogram.time():
+            raise ValueError("boom")
+    assert histogram.snapshot()[()][2] == 1
+
+def test_render_prometheus_format():
+    """Test the text exposition of histograms and callback metrics."""
+    registry = MetricsRegistry()
+    histogram = registry.histogram("test_seconds", "Test latency.", ("route",), buckets=(0.5,))
+    histogram.observe(0.25, 'say "hi"')
+    registry.callback("test_items", "Test items.", "gauge", ("state",), lambda: {("idle",): 3})
+    registry.callback("test_empty", "Nothing yet.", "counter", (), lambda: {})
+
+    assert registry.render() == (
+        '# HELP test_seconds Test latency.\n'
+        '# TYPE test_seconds histogram\n'
+        'test_seconds_bucket{route="say \\"hi\\"",le="0.5"} 1\n'
+        'test_seconds_bucket{route="say \\"hi\\"",le="+Inf"} 1\n'
+        'test_seconds_sum{route="say \\"hi\\""} 0.25\n'
+        'test_seconds_count{route="say \\"hi\\""} 1\n'
+        '# HELP test_items Test items.\n'
+        '# TYPE test_items gauge\n'
+        'test_items{state="idle"} 3\n'
+    )
+
+def test_registry_returns_existing_metric():
+    """Test that registering a name twice returns the first metric."""
+    registry = MetricsRegistry()
+    first = registry.histogram("test_seconds", "Test.")
+    assert registry.histogram("test_seconds", "Test.") is first
+
+def test_failing_callback_is_skipped():
+    """Test that a callback error does not break the scrape."""
+    registry = MetricsRegistry()
+
+    def broken():
+        raise RuntimeError("unavailable")
+
+    registry.callback("test_broken", "Broken.", "gauge", (), broken)
+    assert registry.render() == ""
+
+def test_callback_metric_rejects_unknown_kind():
+    with pytest.raises(ValueError, match="Invalid metric type: summary"):
+        MetricsRegistry().callback("test", "Test.", "summary", (), dict)
+
+######################################################
+#
+#    Timers
+#
+######################################################
+
+def test_time_external_call_labels_outcome():
+    """Test that external calls are labelled ok or error."""
+    with time_external_call("random_org"):
+        pass
+    with pytest.raises(RuntimeError):
+        with time_external_call("random_org"):
+            raise RuntimeError("timed out")
+
+    series = metrics.external_request_duration.snapshot()
+    assert series[("random_org", "ok")][2] == 1
+    assert series[("random_org", "error")][2] == 1
+
+@pytest.mark.parametrize("sql, operation", [
+    ("SELECT 1", "SELECT"),
+    ("\n    update meals SET wins = 1", "UPDATE"),
+    ("BEGIN IMMEDIATE;", "BEGIN"),
+    ("COMMIT;", "COMMIT"),
+    ("VACUUM", "OTHER"),
+    ("", "OTHER"),
+])
+def test_sql_operation(sql, operation):
+    assert sql_operation(sql) == operation
+
+def test_timed_connection_records_statements():
+    """Test that cursor and connection shortcuts are both timed."""
+    conn = sqlite3.connect(":memory:", factory=TimedConnection)
+    conn.executescript("CREATE TABLE t (v INTEGER);")
+    conn.executemany("INSERT INTO t VALUES (?)", [(1,), (2,)])
+    conn.execute("SELECT v FROM t").fetchall()
+    conn.cursor().execute("DELETE FROM t WHERE v = ?", (1,))
+    conn.close()
+
+    counts = {labels[0]: count for labels, (_, _, count) in metrics.db_query_duration.snapshot().items()}
+    assert counts == {'CREATE': 1, 'INSERT': 1, 'SELECT': 1, 'DELETE': 1}
@@ -0,0 +1,115 @@
+import sqlite3
+
+import pytest
+
+from meal_max.models import kitchen_model
+from meal_max.utils import sql_utils
+from meal_max.utils.migrations import apply_migrations, get_migrations, get_schema_version
+
+
+@pytest.fixture
+def conn():
+    conn = sqlite3.connect(":memory:")
+    with open("sql/create_meal_table.sql") as f:
+        conn.executescript(f.read())
+    yield conn
+    conn.close()
+
+@pytest.fixture
+def migrations_dir(tmp_path):
+    (tmp_path / "0001_first.sql").write_text("CREATE TABLE first (x INTEGER);")
+    (tmp_path / "0002_second.sql").write_text("CREATE TABLE second (x INTEGER);")
+    (tmp_path / "README.md").write_text("not a migration")
+    return str(tmp_path)
+
+@pytest.fixture
+def migrated_db(tmp_path, monkeypatch):
+    """Fixture pointing kitchen_model at a temporary database with every migration applied."""
+    db_path = str(tmp_path / "meal_max.db")
+    conn = sqlite3.connect(db_path)
+    with open("sql/create_meal_table.sql") as f:
+        conn.executescript(f.read())
+    apply_migrations(conn)
+    conn.close()
+    monkeypatch.setattr(sql_utils, "DB_PATH", db_path)
+    monkeypatch.setenv("SQL_CREATE_TABLE_PATH", "sql/create_meal_table.sql")
+    sql_utils.reset_pool()
+    yield db_path
+    sql_utils.reset_pool()
+
+
+def test_get_migrations_in_order(migrations_dir):
+    """Test that migration scripts are listed by version and other files ignored."""
+    assert [(version, name) for version, name, _ in get_migrations(migrations_dir)] == [(1, "first"), (2, "second")]
+
+def test_apply_migrations(conn, migrations_dir):
+    """Test that pending migrations run and the schema version is recorded."""
+    assert apply_migrations(conn, migrations_dir) == 2
+    assert get_schema_version(conn) == 2
+    conn.execute("SELECT * FROM second")
+
+def test_apply_migrations_is_idempotent(conn, migrations_dir):
+    """Test that already-applied migrations are skipped."""
+    apply_migrations(conn, migrations_dir)
+    assert apply_migrations(conn, migrations_dir) == 2
+
+def test_apply_migrations_failure_rolls_back(conn, migrations_dir, tmp_path):
+    """Test that a failing migration leaves the previous schema version in place."""
+    (tmp_path / "0003_broken.sql").write_text("CREATE TABLE third (x INTEGER); SELECT * FROM missing;")
+    with pytest.raises(sqlite3.Error):
+        apply_migrations(conn, migrations_dir)
+    assert get_schema_version(conn) == 2
+    with pytest.raises(sqlite3.OperationalError):
+        conn.execute("SELECT * FROM third")
+
+def test_repo_migrations_apply_to_fresh_schema(conn):
+    """Test that the shipped migrations apply cleanly to the base schema."""
+    version = apply_migrations(conn)
+    assert version == get_migrations()[-1][0]
+
+def test_apply_migrations_skips_existing_columns(conn, tmp_path):
+    """Test that a re-run migration skips a column it already added and runs the rest."""
+    (tmp_path / "0001_add_column.sql").write_text(
+        "CREATE TABLE IF NOT EXISTS things (x INTEGER);\n"
+        "ALTER TABLE things ADD COLUMN y INTEGER NOT NULL DEFAULT 0;\n"
+        "UPDATE things SET y = 1 WHERE y = 0;\n")
+    apply_migrations(conn, str(tmp_path))
+    conn.execute("PRAGMA user_version = 0;")
+    assert apply_migrations(conn, str(tmp_path)) == 1
+    assert [row[1] for row in conn.execute("PRAGMA table_info(things);")] == ["x", "y"]
+
+def test_clear_meals_twice_on_migrated_database(migrated_db):
+    """Test that clearing a fully migrated database, twice, leaves a working schema."""
+    kitchen_model.clear_meals()
+    kitchen_model.clear_meals()
+
+    kitchen_model.create_meal("Pasta", "Italian", 12.5, "MED")
+    assert kitchen_model.get_meal_by_id(1).battle_score == kitchen_model.compute_battle_score(12.5, "Italian", "MED")
+    with sqlite3.connect(migrated_db) as conn:
+        assert get_schema_version(conn) == get_migrations()[-1][0]
+        assert "last_used" in [row[1] for row in conn.execute("PRAGMA table_info(arenas);")]
+
+def meals_schema(conn):
+    return (conn.execute("PRAGMA table_info(meals);").fetchall(),
+            conn.execute("SELECT name, sql FROM sqlite_master WHERE tbl_name = 'meals' ORDER BY name;").fetchall())
+
+def test_clear_meals_only_recreates_meals(migrated_db):
+    """Test that the schema script yields the migrated meals table and leaves the other tables alone."""
+    with sqlite3.connect(migrated_db) as conn:
+        migrated = meals_schema(conn)
+        with open("sql/create_meal_table.sql") as f:
+            conn.executescript(f.read())
+        assert get_schema_version(conn) == get_migrations()[-1][0]
+        assert meals_schema(conn) == migrated
+        conn.execute("INSERT INTO arenas (arena_id, last_used) VALUES ('default', 1.0);")
+
+    kitchen_model.create_meal("Pasta", "Italian", 12.5, "MED")
+    with sqlite3.connect(migrated_db) as conn:
+        version = conn.execute("SELECT version FROM table_versions WHERE name = 'meals';").fetchone()[0]
+    kitchen_model.clear_meals()
+
+    with sqlite3.connect(migrated_db) as conn:
+        assert meals_schema(conn) == migrated
+        assert conn.execute("SELECT COUNT(*) FROM meals;").fetchone()[0] == 0
+        assert conn.execute("SELECT last_used FROM arenas;").fetchall() == [(1.0,)]
+        assert conn.execute("SELECT version FROM table_versions WHERE name = 'meals';").fetchone()[0] > version
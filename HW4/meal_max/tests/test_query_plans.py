@@ -0,0 +1,149 @@
+import inspect
+import re
+import sqlite3
+
+import pytest
+
+from meal_max.models import kitchen_model
+from meal_max.utils import sql_utils
+from meal_max.utils.migrations import apply_migrations
+
+######################################################
+#
+#    Fixtures
+#
+######################################################
+
+SCHEMA_PATH = "sql/create_meal_table.sql"
+
+# A plan step that reads every row of meals without an index.
+FULL_SCAN = re.compile(r"^SCAN meals$")
+
+# Every public kitchen_model function must be exercised here, so new queries are audited.
+NOT_AUDITED = {
+    'clear_meals',  # recreates the table; no hot queries
+    'compute_battle_score',  # pure formula; runs no queries
+    'get_active_meals',  # bulk load of the whole catalog; a full scan by design
+    'meal_row_factory',  # builds Meals from rows; runs no queries
+}
+
+
+@pytest.fixture
+def traced_db(tmp_path, monkeypatch):
+    """Fixture providing a migrated temporary database that records every statement run."""
+    db_path = str(tmp_path / "meal_max.db")
+    conn = sqlite3.connect(db_path)
+    with open(SCHEMA_PATH) as f:
+        conn.executescript(f.read())
+    apply_migrations(conn)
+    conn.executemany(
+        "INSERT INTO meals (meal, cuisine, price, difficulty, battles, wins) VALUES (?, ?, ?, ?, ?, ?)",
+        [(f"Meal {i}", "Italian" if i % 2 else "Thai", 10 + i, ["LOW", "MED", "HIGH"][i % 3], i % 4, i % 3)
+         for i in range(50)])
+    conn.commit()
+    conn.close()
+
+    monkeypatch.setattr(sql_utils, "DB_PATH", db_path)
+    monkeypatch.setattr(sql_utils, "DB_POOL_SIZE", 1)
+    monkeypatch.setattr(kitchen_model.meal_cache, "max_size", 0)
+    sql_utils.reset_pool()
+
+    statements = []
+    with sql_utils.get_db_connection() as conn:
+        conn.set_trace_callback(statements.append)
+    yield statements
+    sql_utils.reset_pool()
+
+
+def run_quietly(func, *args, **kwargs):
+    try:
+        func(*args, **kwargs)
+    except ValueError:
+        pass
+
+
+HOT_CALLS = {
+    'create_meal': [lambda: kitchen_model.create_meal("Audit", "Thai", 9.5, "LOW")],
+    'create_meals': [lambda: kitchen_model.create_meals(
+        [{'meal': "Audit 2", 'cuisine': "Thai", 'price': 9.5, 'difficulty': "LOW"}])],
+    'get_meal_by_id': [lambda: kitchen_model.get_meal_by_id(3)],
+    'get_meal_by_name': [lambda: kitchen_model.get_meal_by_name("Meal 3")],
+    'get_meals_by_ids': [lambda: kitchen_model.get_meals_by_ids(range(1, 40), chunk_size=16)],
+    'get_meals_by_names': [lambda: kitchen_model.get_meals_by_names([f"Meal {i}" for i in range(40)])],
+    'get_leaderboard': [
+        lambda: kitchen_model.get_leaderboard("wins", limit=10),
+        lambda: kitchen_model.get_leaderboard("win_pct", limit=10, offset=5),
+    ],
+    'find_close_opponents': [
+        lambda: kitchen_model.find_close_opponents(3),
+        lambda: kitchen_model.find_close_opponents(10, limit=5),
+    ],
+    'iter_leaderboard': [
+        lambda: list(kitchen_model.iter_leaderboard("wins")),
+        lambda: list(kitchen_model.iter_leaderboard("win_pct", cuisine="Thai", difficulty="LOW", batch_size=7)),
+    ],
+    'record_battle_results': [
+        lambda: kitchen_model.record_battle_results([(3, 4), (4, 6), (6, 3)]),
+        lambda: run_quietly(kitchen_model.record_battle_results, [(3, 4), (4, 9999)]),
+    ],
+    'update_meal_stats': [lambda: kitchen_model.update_meal_stats(3, "win")],
+    'record_battle_result': [
+        lambda: kitchen_model.record_battle_result(3, 4),
+        lambda: run_quietly(kitchen_model.record_battle_result, 3, 9999),
+    ],
+    'delete_meal': [lambda: kitchen_model.delete_meal(5)],
+    'list_meals': [
+        lambda: kitchen_model.list_meals(limit=10),
+        lambda: kitchen_model.list_meals(cuisine="Thai", after=10, limit=5),
+        lambda: kitchen_model.list_meals(difficulty="LOW", deleted=None, after=3),
+        lambda: kitchen_model.list_meals(cuisine="Italian", difficulty="MED", min_price=12, max_price=40),
+    ],
+    'get_data_version': [lambda: kitchen_model.get_data_version(('meals', 'meal_stats'))],
+}
+
+######################################################
+#
+#    Query plan audit
+#
+######################################################
+
+def test_every_kitchen_model_function_is_audited():
+    """Test that the audit covers every public kitchen_model function."""
+    functions = {
+        name for name, func in inspect.getmembers(kitchen_model, inspect.isfunction)
+        if func.__module__ == kitchen_model.__name__ and not name.startswith('_')
+    }
+    assert functions - NOT_AUDITED == set(HOT_CALLS)
+
+@pytest.mark.parametrize("name", sorted(HOT_CALLS))
+def test_no_full_table_scans(traced_db, name):
+    """Test that no statement issued by a kitchen_model function scans the whole meals table."""
+    for call in HOT_CALLS[name]:
+        call()
+    queries = [sql for sql in traced_db if re.match(r"\s*(SELECT|INSERT|UPDATE|DELETE)", sql, re.IGNORECASE)]
+    assert queries, f"{name} issued no queries"
+
+    conn = sqlite3.connect(sql_utils.DB_PATH)
+    try:
+        for sql in queries:
+            plan = [row[3] for row in conn.execute(f"EXPLAIN QUERY PLAN {sql}")]
+            scans = [step for step in plan if FULL_SCAN.match(step)]
+            assert not scans, f"{name} does a full table scan:\n{sql}\n{plan}"
+    finally:
+        conn.close()
+
+def test_catalog_pages_need_no_sort(traced_db):
+    """Test that every list_meals filter combination reads its page in ID order straight off an index."""
+    for cuisine in (None, "Thai"):
+        for difficulty in (None, "LOW"):
+            kitchen_model.list_meals(cuisine=cuisine, difficulty=difficulty, min_price=12, after=5, limit=5)
+    queries = [sql for sql in traced_db if sql.lstrip().startswith("SELECT id, meal")]
+    assert len(queries) == 4
+
+    conn = sqlite3.connect(sql_utils.DB_PATH)
+    try:
+        for sql in queries:
+            plan = [row[3] for row in conn.execute(f"EXPLAIN QUERY PLAN {sql}")]
+            assert not any("TEMP B-TREE" in step for step in plan), f"list_meals sorts its rows:\n{sql}\n{plan}"
+    finally:
+        conn.close()
@@ -1,7 +1,23 @@
+import asyncio
+import threading
+
+import httpx
 import pytest
 import requests
 
-from meal_max.utils.random_utils import get_random
+from meal_max.utils import random_utils
+from meal_max.utils.random_utils import (
+    AsyncRandomOrgProvider,
+    LocalRandomProvider,
+    PrefetchingRandomProvider,
+    RandomOrgProvider,
+    SeededRandomProvider,
+    SyncRandomAdapter,
+    create_async_random_provider,
+    create_random_provider,
+    get_random,
+    set_random_provider,
+)
 
 # Define the mock values
 RANDOM_NUMBER = 0.45
@@ -16,6 +32,13 @@ def mock_random_org(mocker):
     mocker.patch("requests.get", return_value=mock_response)
     return mock_response
 
+@pytest.fixture(autouse=True)
+def reset_provider():
+    """Fixture to rebuild the process-wide provider for each test."""
+    set_random_provider(None)
+    yield
+    set_random_provider(None)
+
 def test_get_random(mock_random_org):
     """Test retrieving a random decimal number from random.org."""
     result = get_random()
@@ -50,4 +73,187 @@ def test_get_random_invalid_response(mock_random_org):
     mock_random_org.text = "invalid_response"
 
     with pytest.raises(ValueError, match="Invalid response from random.org: invalid_response"):
-        get_random()
\ No newline at end of file
+        get_random()
+
+######################################################
+#
+#    Tests for the random providers
+#
+######################################################
+
+def test_random_org_fetch_bulk(mock_random_org):
+    """Test fetching several numbers from random.org in one request."""
+    mock_random_org.text = "0.12\n0.5\n0.99\n"
+    result = RandomOrgProvider().fetch(3)
+    assert result == [0.12, 0.5, 0.99]
+    requests.get.assert_called_once_with(
+        "https://www.random.org/decimal-fractions/?num=3&dec=2&col=1&format=plain&rnd=new", timeout=5
+    )
+
+def test_random_org_fetch_short_response(mock_random_org):
+    """Test handling of a bulk response with fewer numbers than requested."""
+    mock_random_org.text = "0.12\n"
+    with pytest.raises(ValueError, match="Invalid response from random.org"):
+        RandomOrgProvider().fetch(3)
+
+def test_local_provider_range():
+    """Test that the local provider returns two-decimal numbers in [0, 1)."""
+    provider = LocalRandomProvider()
+    for value in provider.fetch(200):
+        assert 0 <= value < 1
+        assert round(value, 2) == value
+
+def test_seeded_provider_is_replayable():
+    """Test that two seeded providers with the same seed agree."""
+    assert SeededRandomProvider(42).fetch(20) == SeededRandomProvider(42).fetch(20)
+
+def test_get_random_uses_configured_provider():
+    """Test that get_random delegates to the process-wide provider."""
+    set_random_provider(SeededRandomProvider(7))
+    assert get_random() == SeededRandomProvider(7).get_random()
+
+def test_create_random_provider_unknown():
+    """Test error handling for an unknown provider name."""
+    with pytest.raises(ValueError, match="Unknown random provider"):
+        create_random_provider("dice")
+
+def test_prefetching_provider_serves_from_buffer(mocker):
+    """Test that the prefetching provider fetches in bulk and serves from its buffer."""
+    source = mocker.Mock(side_effect=lambda count: [0.25] * count)
+    provider = PrefetchingRandomProvider(source, batch_size=10, low_water=0)
+    try:
+        values = [provider.get_random() for _ in range(5)]
+    finally:
+        provider.close()
+    assert values == [0.25] * 5
+    assert all(call.args == (10,) for call in source.call_args_list)
+    assert source.call_count <= 2
+
+def test_prefetching_provider_fetch_drains_buffer_then_calls_source_once():
+    """Test that a bulk fetch uses the buffer and makes at most one synchronous source call."""
+    callers = []
+
+    def source(count):
+        callers.append((threading.current_thread().name, count))
+        return [0.5] * count
+
+    provider = PrefetchingRandomProvider(source, batch_size=10, low_water=0)
+    try:
+        values = provider.fetch(25)
+    finally:
+        provider.close()
+    assert values == [0.5] * 25
+    synchronous = [count for name, count in callers if name != "random-prefetch"]
+    assert len(synchronous) <= 1
+    assert all(count >= 15 for count in synchronous)
+
+def test_prefetching_provider_raises_source_error():
+    """Test that source errors surface once the buffer is empty."""
+    def failing_source(count):
+        raise RuntimeError("Request to random.org timed out.")
+
+    provider = PrefetchingRandomProvider(failing_source, batch_size=10)
+    try:
+        with pytest.raises(RuntimeError, match="timed out"):
+            provider.get_random()
+    finally:
+        provider.close()
+
+def test_prefetching_provider_refills_in_background():
+    """Test that draining to the low-water mark triggers a background refill."""
+    refilled = threading.Event()
+    batches = []
+
+    def source(count):
+        batches.append(count)
+        if len(batches) > 1:
+            refilled.set()
+        return [0.5] * count
+
+    provider = PrefetchingRandomProvider(source, batch_size=4, low_water=2)
+    try:
+        for _ in range(3):
+            provider.get_random()
+        assert refilled.wait(1)
+    finally:
+        provider.close()
+
+######################################################
+#
+#    Async providers
+#
+######################################################
+
+def make_async_client(handler):
+    """Helper returning an httpx client whose requests are answered by handler."""
+    return httpx.AsyncClient(transport=httpx.MockTransport(handler))
+
+def test_async_random_org_provider():
+    """Test fetching a random number through the shared async client."""
+    requested = []
+
+    def handler(request):
+        requested.append(str(request.url))
+        return httpx.Response(200, text=f"{RANDOM_NUMBER}\n")
+
+    async def draw():
+        async with make_async_client(handler) as client:
+            provider = AsyncRandomOrgProvider(client)
+            return [await provider.get_random(), await provider.get_random()]
+
+    assert asyncio.run(draw()) == [RANDOM_NUMBER, RANDOM_NUMBER]
+    assert requested == ["https://www.random.org/decimal-fractions/?num=1&dec=2&col=1&format=plain&rnd=new"] * 2
+
+def test_async_random_org_provider_errors():
+    """Test that the async provider raises the same errors as the sync one."""
+    def invalid(request):
+        return httpx.Response(200, text="invalid_response")
+
+    def failing(request):
+        raise httpx.ConnectError("Connection error")
+
+    def slow(request):
+        raise httpx.ReadTimeout("timed out")
+
+    async def draw(handler):
+        async with make_async_client(handler) as client:
+            return await AsyncRandomOrgProvider(client).get_random()
+
+    with pytest.raises(ValueError, match="Invalid response from random.org: invalid_response"):
+        asyncio.run(draw(invalid))
+    with pytest.raises(RuntimeError, match="Request to random.org failed: Connection error"):
+        asyncio.run(draw(failing))
+    with pytest.raises(RuntimeError, match="Request to random.org timed out."):
+        asyncio.run(draw(slow))
+
+def test_create_async_random_provider(mocker):
+    """Test that non-network providers are wrapped and random_org goes native."""
+    client = mocker.Mock()
+    assert isinstance(create_async_random_provider("random_org", client), AsyncRandomOrgProvider)
+
+    async def draw():
+        provider = create_async_random_provider("seeded", client)
+        values = [await provider.get_random() for _ in range(5)]
+        await provider.aclose()
+        return values
+
+    seeded = SeededRandomProvider(random_utils.RANDOM_SEED)
+    assert asyncio.run(draw()) == [seeded.get_random() for _ in range(5)]
+
+    with pytest.raises(ValueError, match="Unknown random provider"):
+        create_async_random_provider("dice", client)
+
+def test_sync_random_adapter_blocking():
+    """Test that a blocking provider is called off the event loop thread."""
+    threads = []
+
+    class Recording(LocalRandomProvider):
+        def get_random(self):
+            threads.append(threading.current_thread())
+            return super().get_random()
+
+    async def draw():
+        return await SyncRandomAdapter(Recording(), blocking=True).get_random()
+
+    assert 0 <= asyncio.run(draw()) < 1
+    assert threads and threads[0] is not threading.main_thread()
@@ -0,0 +1,88 @@
+import numpy as np
+import pytest
+
+from meal_max.models.battle_model import BattleModel
+from meal_max.models.kitchen_model import Meal
+from meal_max.models.simulation_model import SimulationModel
+
+
+@pytest.fixture
+def meals():
+    return [
+        Meal(1, "Dumplings", "Chinese", 100, "LOW"),
+        Meal(2, "Steak", "American", 50, "MED"),
+        Meal(3, "Spagetti", "Italian", 150, "HIGH"),
+        Meal(4, "Toast", "British", 1, "LOW"),
+    ]
+
+@pytest.fixture
+def simulation_model(meals):
+    return SimulationModel(meals)
+
+
+def test_scores_match_battle_model(simulation_model, meals):
+    """Test that vectorized scores agree with BattleModel.get_battle_score."""
+    expected = [BattleModel().get_battle_score(meal) for meal in meals]
+    assert simulation_model.scores.tolist() == expected
+
+def test_scores_use_stored_battle_score(meals):
+    """Test that a stored battle score wins over the formula, as in BattleModel."""
+    meals[0].battle_score = 42.0
+    assert SimulationModel(meals).scores[0] == 42.0
+
+def test_win_probability_discrete_draws():
+    """Test the closed form against draws in {0.00, ..., 0.99}."""
+    deltas = np.array([0.0, 0.005, 0.5, 0.505, 0.99, 1.5])
+    assert SimulationModel.win_probability(deltas).tolist() == [0.0, 0.01, 0.5, 0.51, 0.99, 1.0]
+
+def test_win_probability_matrix(simulation_model):
+    """Test that the matrix is symmetric, bounded and zero on the diagonal."""
+    matrix = simulation_model.win_probability_matrix()
+    assert matrix.shape == (4, 4)
+    assert np.allclose(matrix, matrix.T)
+    assert np.all(np.diag(matrix) == 0)
+    assert np.all((matrix >= 0) & (matrix <= 1))
+
+def test_win_probability_matrix_subset(simulation_model):
+    """Test selecting meals by ID."""
+    matrix = simulation_model.win_probability_matrix([1, 2])
+    gap = abs(simulation_model.scores[0] - simulation_model.scores[1]) / 100
+    assert matrix[0, 1] == SimulationModel.win_probability(np.array([gap]))[0]
+
+def test_simulate_matches_closed_form(meals):
+    """Test that simulated win rates converge on the closed-form probability."""
+    model = SimulationModel(meals[:2])
+    result = model.simulate(200000, seed=1)
+    assert result['battles'].sum() == 400000
+    assert result['wins'].sum() == 200000
+    # Both meals are listed first half the time, so each wins about half its battles.
+    assert abs(result['wins'][0] / result['battles'][0] - 0.5) < 0.01
+
+def test_simulate_is_replayable(simulation_model):
+    """Test that a seed makes the simulation deterministic."""
+    first = simulation_model.simulate(1000, seed=7)
+    second = simulation_model.simulate(1000, seed=7)
+    assert first['wins'].tolist() == second['wins'].tolist()
+
+def test_simulate_unknown_meal(simulation_model):
+    """Test error handling for a meal that is not loaded."""
+    with pytest.raises(ValueError, match="Meal with ID 99 not found"):
+        simulation_model.simulate(10, meal_ids=[1, 99])
+
+def test_simulate_duplicate_meal(simulation_model):
+    """Test error handling for a meal listed twice."""
+    with pytest.raises(ValueError, match="only appear once"):
+        simulation_model.simulate(10, meal_ids=[1, 2, 1])
+
+def test_simulate_too_many_battles(simulation_model, monkeypatch):
+    """Test that simulations above the battle cap are refused."""
+    monkeypatch.setattr("meal_max.models.simulation_model.MAX_SIMULATED_BATTLES", 100)
+    simulation_model.simulate(100)
+    with pytest.raises(ValueError, match="Invalid number of battles"):
+        simulation_model.simulate(101)
+
+def test_summarize_ranked(simulation_model):
+    """Test that the summary is ranked by win rate."""
+    rows = simulation_model.summarize(10000, seed=3)
+    rates = [row['win_rate'] for row in rows]
+    assert rates == sorted(rates, reverse=True)
@@ -0,0 +1,252 @@
+import sqlite3
+import threading
+
+import pytest
+
+from meal_max.utils import sql_utils
+from meal_max.utils.sql_utils import (
+    ConnectionPool,
+    StorageProfile,
+    get_db_connection,
+    get_pool_stats,
+    get_storage_profile,
+    reset_pool,
+    retry_on_busy,
+)
+
+######################################################
+#
+#    Fixtures
+#
+######################################################
+
+@pytest.fixture
+def db_path(tmp_path):
+    return str(tmp_path / "meal_max.db")
+
+@pytest.fixture
+def pool(db_path):
+    pool = ConnectionPool(db_path, max_size=2, timeout=0.2)
+    yield pool
+    pool.close()
+
+@pytest.fixture
+def module_pool(db_path, monkeypatch):
+    """Point the process-wide pool at a temporary database."""
+    monkeypatch.setattr(sql_utils, "DB_PATH", db_path)
+    reset_pool()
+    yield
+    reset_pool()
+
+######################################################
+#
+#    Tests for ConnectionPool
+#
+######################################################
+
+def test_pool_reuses_connection(pool):
+    """Test that a released connection is handed out again."""
+    with pool.connection() as conn1:
+        pass
+    with pool.connection() as conn2:
+        pass
+    assert conn1 is conn2
+    stats = pool.stats()
+    assert stats['checkouts'] == 2
+    assert stats['connections_created'] == 1
+    assert stats['size'] == 1
+    assert stats['idle'] == 1
+
+def test_pool_nested_checkout_same_thread(pool):
+    """Test that nested checkouts on one thread share the held connection."""
+    with pool.connection() as outer:
+        with pool.connection() as inner:
+            assert inner is outer
+    assert pool.stats()['checkouts'] == 1
+
+def test_pool_nested_commit_keeps_outer_transaction(pool):
+    """Test that a nested block's commit and rollback do not end the outer transaction."""
+    with pool.connection() as conn:
+        conn.execute("CREATE TABLE t (x INTEGER)")
+        conn.commit()
+
+    with pool.connection() as outer:
+        outer.execute("INSERT INTO t VALUES (1)")
+        with pool.connection() as inner:
+            inner.execute("INSERT INTO t VALUES (2)")
+            inner.commit()
+        with pool.connection() as inner:
+            inner.execute("INSERT INTO t VALUES (3)")
+            inner.rollback()
+        with pytest.raises(RuntimeError):
+            with pool.connection() as inner:
+                inner.execute("INSERT INTO t VALUES (4)")
+                raise RuntimeError("helper failed")
+        assert outer.in_transaction
+        outer.rollback()
+
+    with pool.connection() as conn:
+        assert conn.execute("SELECT COUNT(*) FROM t").fetchone()[0] == 0
+        conn.execute("INSERT INTO t VALUES (1)")
+        with pool.connection() as inner:
+            inner.execute("INSERT INTO t VALUES (2)")
+            inner.commit()
+        with pool.connection() as inner:
+            inner.execute("INSERT INTO t VALUES (3)")
+            inner.rollback()
+        conn.commit()
+        assert [row[0] for row in conn.execute("SELECT x FROM t ORDER BY x")] == [1, 2]
+
+def test_pool_grows_to_max_size(pool):
+    """Test that concurrent checkouts from different threads get distinct connections."""
+    held = []
+    ready = threading.Event()
+    release = threading.Event()
+
+    def worker():
+        with pool.connection() as conn:
+            held.append(conn)
+            ready.set()
+            release.wait(1)
+
+    thread = threading.Thread(target=worker)
+    thread.start()
+    ready.wait(1)
+    with pool.connection() as conn:
+        assert conn is not held[0]
+        assert pool.stats()['in_use'] == 2
+    release.set()
+    thread.join()
+
+def test_pool_timeout_when_exhausted(db_path):
+    """Test that a checkout fails once the pool is exhausted for longer than the timeout."""
+    pool = ConnectionPool(db_path, max_size=1, timeout=0.05)
+    ready = threading.Event()
+    release = threading.Event()
+
+    def worker():
+        with pool.connection():
+            ready.set()
+            release.wait(1)
+
+    thread = threading.Thread(target=worker)
+    thread.start()
+    ready.wait(1)
+    try:
+        with pytest.raises(sqlite3.OperationalError, match="Timed out"):
+            with pool.connection():
+                pass
+    finally:
+        release.set()
+        thread.join()
+        pool.close()
+
+def test_pool_rolls_back_uncommitted_work(pool):
+    """Test that uncommitted writes are not leaked to the next borrower."""
+    with pool.connection() as conn:
+        conn.execute("CREATE TABLE t (x INTEGER)")
+        conn.commit()
+        conn.execute("INSERT INTO t VALUES (1)")
+    with pool.connection() as conn:
+        assert conn.execute("SELECT COUNT(*) FROM t").fetchone()[0] == 0
+
+def test_pool_replaces_unhealthy_connection(db_path):
+    """Test that a connection failing its health check is discarded."""
+    pool = ConnectionPool(db_path, max_size=1, health_check_interval=0)
+    with pool.connection() as conn1:
+        pass
+    conn1.close()
+    with pool.connection() as conn2:
+        assert conn2 is not conn1
+        conn2.execute("SELECT 1")
+    stats = pool.stats()
+    assert stats['health_check_failures'] == 1
+    assert stats['size'] == 1
+    pool.close()
+
+def test_pool_invalid_size(db_path):
+    """Test error handling for an invalid pool size."""
+    with pytest.raises(ValueError, match="Invalid pool size"):
+        ConnectionPool(db_path, max_size=0)
+
+######################################################
+#
+#    Tests for get_db_connection
+#
+######################################################
+
+def test_get_db_connection_uses_pool(module_pool):
+    """Test that get_db_connection checks connections out of the shared pool."""
+    with get_db_connection() as conn1:
+        conn1.execute("SELECT 1")
+    with get_db_connection() as conn2:
+        pass
+    assert conn1 is conn2
+    assert get_pool_stats()['checkouts'] == 2
+
+######################################################
+#
+#    Tests for storage profiles
+#
+######################################################
+
+def test_get_storage_profile_env_override(monkeypatch):
+    """Test that DB_* environment variables override the named profile."""
+    monkeypatch.setenv("DB_SYNCHRONOUS", "FULL")
+    monkeypatch.setenv("DB_BUSY_TIMEOUT", "250")
+    profile = get_storage_profile("wal")
+    assert profile.journal_mode == "WAL"
+    assert profile.synchronous == "FULL"
+    assert profile.busy_timeout == 250
+
+def test_get_storage_profile_unknown():
+    """Test error handling for an unknown storage profile."""
+    with pytest.raises(ValueError, match="Unknown storage profile"):
+        get_storage_profile("turbo")
+
+def test_storage_profile_invalid_pragma():
+    """Test that pragma values are validated before reaching SQL."""
+    with pytest.raises(ValueError, match="Invalid synchronous level"):
+        StorageProfile(synchronous="NORMAL; DROP TABLE meals")
+
+def test_pool_applies_storage_profile(db_path):
+    """Test that new pooled connections have the profile's pragmas applied."""
+    pool = ConnectionPool(db_path, profile=StorageProfile(synchronous="OFF", busy_timeout=1234))
+    with pool.connection() as conn:
+        assert conn.execute("PRAGMA journal_mode").fetchone()[0] == "wal"
+        assert conn.execute("PRAGMA synchronous").fetchone()[0] == 0
+        assert conn.execute("PRAGMA busy_timeout").fetchone()[0] == 1234
+        assert conn.isolation_level == "IMMEDIATE"
+    pool.close()
+
+######################################################
+#
+#    Tests for retry_on_busy
+#
+######################################################
+
+def test_retry_on_busy_retries_until_success(mocker):
+    """Test that SQLITE_BUSY failures are retried with backoff."""
+    mocker.patch("meal_max.utils.sql_utils.time.sleep")
+    operation = mocker.Mock(side_effect=[sqlite3.OperationalError("database is locked"), "done"])
+    operation.__name__ = "operation"
+    assert retry_on_busy(operation)() == "done"
+    assert operation.call_count == 2
+
+def test_retry_on_busy_gives_up(mocker, monkeypatch):
+    """Test that the busy error is raised once the retries are exhausted."""
+    mocker.patch("meal_max.utils.sql_utils.time.sleep")
+    monkeypatch.setattr(sql_utils, "DB_BUSY_RETRIES", 2)
+    operation = mocker.Mock(side_effect=sqlite3.OperationalError("database is locked"))
+    operation.__name__ = "operation"
+    with pytest.raises(sqlite3.OperationalError, match="database is locked"):
+        retry_on_busy(operation)()
+    assert operation.call_count == 3
+
+def test_retry_on_busy_ignores_other_errors(mocker):
+    """Test that errors other than SQLITE_BUSY are not retried."""
+    operation = mocker.Mock(side_effect=sqlite3.OperationalError("no such table: meals"))
+    operation.__name__ = "operation"
+    with pytest.raises(sqlite3.OperationalError, match="no such table"):
+        retry_on_busy(operation)()
+    assert operation.call_count == 1
@@ -0,0 +1,171 @@
+import fcntl
+import os
+import time
+
+import pytest
+
+from meal_max.utils.stats_buffer import StatsBuffer, read_journal
+
+
+@pytest.fixture
+def flushed():
+    """Fixture collecting every batch handed to the flush function."""
+    return []
+
+
+@pytest.fixture
+def flushed_journals():
+    """Fixture collecting the journal IDs handed to the flush function with each batch."""
+    return []
+
+
+@pytest.fixture
+def buffer(flushed, flushed_journals, tmp_path):
+    """Fixture providing a journaled buffer that flushes into the flushed list."""
+    def flush(deltas, journal_ids):
+        flushed.append(deltas)
+        flushed_journals.append(journal_ids)
+
+    stats_buffer = StatsBuffer(flush, max_pending=3, flush_interval=60, journal_dir=str(tmp_path))
+    yield stats_buffer
+    stats_buffer.close()
+
+
+def journals(tmp_path):
+    return sorted(path.name for path in tmp_path.glob("stats-*.journal"))
+
+
+def test_add_sums_per_meal(buffer, flushed):
+    """Test that increments are summed per meal and kept until flushed."""
+    buffer.add(1, 1, 1)
+    buffer.add_many({1: [1, 0], 2: [1, 1]})
+    assert buffer.pending() == {1: [2, 1], 2: [1, 1]}
+    assert flushed == []
+    assert buffer.flush() == 2
+    assert flushed == [{1: [2, 1], 2: [1, 1]}]
+    assert buffer.pending() == {}
+
+def test_flush_when_full(buffer, flushed):
+    """Test that the add reaching max_pending results flushes the batch."""
+    for _ in range(3):
+        buffer.add(1, 1, 0)
+    assert flushed == [{1: [3, 0]}]
+
+def test_background_flush(flushed, tmp_path):
+    """Test that pending increments are flushed every flush_interval seconds."""
+    stats_buffer = StatsBuffer(lambda deltas, journal_ids: flushed.append(deltas), flush_interval=0.01,
+                               journal_dir=str(tmp_path))
+    stats_buffer.add(1, 1, 1)
+    deadline = time.monotonic() + 2
+    while not flushed and time.monotonic() < deadline:
+        time.sleep(0.01)
+    stats_buffer.close()
+    assert flushed == [{1: [1, 1]}]
+
+def test_failed_flush_keeps_increments(tmp_path):
+    """Test that a failed flush puts the batch back for the next attempt."""
+    calls = []
+
+    def flaky(deltas, journal_ids):
+        calls.append(dict(deltas))
+        if len(calls) == 1:
+            raise RuntimeError("database is locked")
+
+    stats_buffer = StatsBuffer(flaky, flush_interval=60, journal_dir=str(tmp_path))
+    stats_buffer.add(1, 1, 1)
+    with pytest.raises(RuntimeError):
+        stats_buffer.flush()
+    stats_buffer.add(1, 1, 0)
+    assert stats_buffer.pending() == {1: [2, 1]}
+    stats_buffer.flush()
+    assert calls[-1] == {1: [2, 1]}
+    stats_buffer.close()
+    assert journals(tmp_path) == []
+
+def test_journal_tracks_unflushed_results(buffer, tmp_path):
+    """Test that each result is journaled until its batch is written."""
+    buffer.add(1, 1, 1)
+    buffer.add(2, 1, 0)
+    [journal] = journals(tmp_path)
+    assert read_journal(str(tmp_path / journal)) == {1: [1, 1], 2: [1, 0]}
+    buffer.flush()
+    assert all(read_journal(str(tmp_path / name)) == {} for name in journals(tmp_path))
+
+def test_close_flushes_and_removes_journal(buffer, flushed, tmp_path):
+    """Test that close drains the buffer and leaves no journal behind."""
+    buffer.add(1, 1, 1)
+    buffer.close()
+    assert flushed == [{1: [1, 1]}]
+    assert journals(tmp_path) == []
+
+def test_discard(buffer, flushed, tmp_path):
+    """Test that discarded increments are never flushed or replayed."""
+    buffer.add(1, 1, 1)
+    buffer.discard()
+    assert buffer.pending() == {}
+    buffer.close()
+    assert flushed == []
+    assert journals(tmp_path) == []
+
+def test_changes(buffer):
+    """Test that the generation moves with every add and is reported only while increments are pending."""
+    assert buffer.changes() is None
+    buffer.add(1, 1, 1)
+    generation, updated_at = buffer.changes()
+    buffer.add_many({1: [1, 0]})
+    assert buffer.changes()[0] == generation + 1
+    assert buffer.changes()[1] >= updated_at
+    buffer.flush()
+    assert buffer.changes() is None
+
+def test_read_journal_skips_torn_line(tmp_path):
+    """Test that a line cut short by a crash is skipped."""
+    path = tmp_path / "stats-1-1.journal"
+    path.write_text("1 1 1\n2 1 0\n1 1 1\n2 1")
+    assert read_journal(str(path)) == {1: [2, 2], 2: [1, 0]}
+
+def test_recover_replays_dead_journals(buffer, flushed, flushed_journals, tmp_path):
+    """Test that journals of dead processes are applied under their IDs and deleted, and live ones left alone."""
+    (tmp_path / "stats-dead.journal").write_text("1 1 1\n1 1 0\n")
+    with open(tmp_path / "stats-live.journal", "w") as live:
+        live.write("2 1 1\n")
+        live.flush()
+        fcntl.flock(live, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        buffer.add(3, 1, 1)
+        [own] = [name for name in journals(tmp_path) if name not in ("stats-dead.journal", "stats-live.journal")]
+
+        assert buffer.recover() == 1
+        assert flushed == [{1: [2, 1]}]
+        assert flushed_journals == [["stats-dead.journal"]]
+        assert journals(tmp_path) == sorted(["stats-live.journal", own])
+        assert buffer.pending() == {3: [1, 1]}
+
+def test_flush_passes_sealed_journal_ids(buffer, flushed_journals, tmp_path):
+    """Test that a batch carries the IDs of exactly the journals holding its results."""
+    buffer.add(1, 1, 1)
+    [first] = journals(tmp_path)
+    buffer.flush()
+    assert flushed_journals == [[first]]
+    assert first not in journals(tmp_path)
+
+def test_journal_names_are_unique(buffer, tmp_path, monkeypatch):
+    """Test that journals get random names and never reopen an existing file."""
+    buffer.add(1, 1, 1)
+    buffer.flush()
+    buffer.add(1, 1, 1)
+    names = journals(tmp_path)
+    assert len(names) == 1
+    assert all(name != f"stats-{os.getpid()}-1.journal" for name in names)
+
+    taken = names[0][len("stats-"):-len(".journal")]
+    monkeypatch.setattr("meal_max.utils.stats_buffer.uuid.uuid4", lambda: type("UUID", (), {'hex': taken})())
+    with pytest.raises(FileExistsError):
+        buffer.flush()
+    assert buffer.pending() == {1: [1, 1]}
+
+def test_invalid_settings():
+    """Test error handling for invalid buffer settings."""
+    with pytest.raises(ValueError, match="Invalid max pending"):
+        StatsBuffer(lambda deltas, journal_ids: None, max_pending=0)
+    with pytest.raises(ValueError, match="Invalid flush interval"):
+        StatsBuffer(lambda deltas, journal_ids: None, flush_interval=0)
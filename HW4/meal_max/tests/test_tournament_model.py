@@ -0,0 +1,103 @@
+import pytest
+
+from meal_max.models.kitchen_model import Meal
+from meal_max.models.tournament_model import TournamentModel
+from meal_max.utils.random_utils import SeededRandomProvider
+
+
+@pytest.fixture
+def meals():
+    """Fixture providing eight meals with distinct battle scores."""
+    return {i: Meal(i, f"Meal {i}", "Italian", 10 * i, "MED") for i in range(1, 9)}
+
+@pytest.fixture
+def tournament_model(mocker, meals):
+    """Fixture providing a TournamentModel with stubbed storage and deterministic randomness."""
+    mocker.patch("meal_max.models.tournament_model.get_meals_by_ids", side_effect=lambda meal_ids: {
+        'meals': [meals[meal_id] for meal_id in meal_ids if meal_id in meals],
+        'not_found': [meal_id for meal_id in meal_ids if meal_id not in meals], 'deleted': []})
+    mocker.patch("meal_max.models.tournament_model.get_random_provider", return_value=SeededRandomProvider(1))
+    return TournamentModel()
+
+@pytest.fixture
+def mock_record(mocker):
+    return mocker.patch("meal_max.models.tournament_model.record_battle_results")
+
+
+def test_single_elimination(tournament_model, mock_record):
+    """Test that single elimination plays n - 1 bouts and commits them once."""
+    result = tournament_model.run_tournament(list(range(1, 9)))
+    assert result['bouts'] == 7
+    mock_record.assert_called_once()
+    assert len(mock_record.call_args[0][0]) == 7
+    champion = next(row for row in result['standings'] if row['meal'] == result['champion'])
+    assert champion['wins'] == 3 and champion['losses'] == 0
+
+def test_single_elimination_with_bye(tournament_model, mock_record):
+    """Test that an odd field gives a bye instead of failing."""
+    result = tournament_model.run_tournament([1, 2, 3, 4, 5])
+    assert result['bouts'] == 4
+
+def test_round_robin(tournament_model, mock_record):
+    """Test that round robin plays every pair exactly once."""
+    result = tournament_model.run_tournament([1, 2, 3, 4], format="round_robin")
+    assert result['bouts'] == 6
+    pairs = {frozenset(pair) for pair in mock_record.call_args[0][0]}
+    assert len(pairs) == 6
+    assert all(row['wins'] + row['losses'] == 3 for row in result['standings'])
+
+def test_swiss(tournament_model, mock_record):
+    """Test that Swiss plays the requested rounds without rematches when avoidable."""
+    result = tournament_model.run_tournament(list(range(1, 9)), format="swiss", rounds=3)
+    assert result['bouts'] == 12
+    pairs = [frozenset(pair) for pair in mock_record.call_args[0][0]]
+    assert len(set(pairs)) == len(pairs)
+
+def test_standings_sorted(tournament_model, mock_record):
+    """Test that standings are ordered by wins."""
+    result = tournament_model.run_tournament(list(range(1, 9)), format="round_robin")
+    wins = [row['wins'] for row in result['standings']]
+    assert wins == sorted(wins, reverse=True)
+
+def test_invalid_format(tournament_model):
+    """Test error handling for an unknown tournament format."""
+    with pytest.raises(ValueError, match="Invalid tournament format"):
+        tournament_model.run_tournament([1, 2], format="ladder")
+
+def test_too_few_meals(tournament_model):
+    """Test error handling for a tournament with a single meal."""
+    with pytest.raises(ValueError, match="at least two meals"):
+        tournament_model.run_tournament([1])
+
+def test_duplicate_meals(tournament_model):
+    """Test error handling for a meal entered twice."""
+    with pytest.raises(ValueError, match="only enter a tournament once"):
+        tournament_model.run_tournament([1, 1, 2])
+
+def test_round_robin_too_many_meals(tournament_model, mock_record, monkeypatch):
+    """Test that an oversized round robin is refused before any bout is played."""
+    monkeypatch.setattr("meal_max.models.tournament_model.MAX_ROUND_ROBIN_MEALS", 4)
+    with pytest.raises(ValueError, match="at most 4 meals"):
+        tournament_model.run_tournament(list(range(1, 6)), format="round_robin")
+    mock_record.assert_not_called()
+    assert tournament_model.run_tournament(list(range(1, 9)))['bouts'] == 7
+
+def test_tournaments_do_not_share_state(tournament_model, mock_record):
+    """Test that a model keeps no per-run state, so runs cannot mix results."""
+    first = tournament_model.run_tournament([1, 2, 3, 4], format="round_robin")
+    second = tournament_model.run_tournament([5, 6], format="round_robin")
+    assert first['bouts'] == 6
+    assert second['bouts'] == 1
+    assert mock_record.call_args_list[1].args[0] in ([(5, 6)], [(6, 5)])
+    assert not hasattr(tournament_model, '_results')
+
+def test_rounds_only_for_swiss(tournament_model):
+    """Test error handling for rounds given to a non-Swiss format."""
+    with pytest.raises(ValueError, match="Invalid rounds"):
+        tournament_model.run_tournament([1, 2], format="round_robin", rounds=2)
+
+def test_meal_not_found(tournament_model, mock_record):
+    """Test that a missing meal stops the tournament before any bout is played."""
+    with pytest.raises(ValueError, match="Meal with ID 99 not found"):
+        tournament_model.run_tournament([1, 99])
+    mock_record.assert_not_called()